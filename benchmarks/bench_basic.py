@@ -0,0 +1,189 @@
+"""Benchmarks of the BASIC planning pipeline on synthetic designs.
+
+Each design alternates single-variant linker modules with part modules of
+up to max_variants variants, sized so that it has exactly the requested
+number of unique constructs. Every stage of planning is timed and
+memory-profiled in turn, each working on the previous stage's output:
+
+    construct       Construct build and update_construct
+    unique          get_unique_constructs, fully iterated
+    clips_df        Basic._create_clips_df
+    final_assembly  Basic._gen_final_assembly_dict
+    setup_layout    Setup of the CLIP wells and their Layout csv
+    render          batching and rendering of the four OT-2 scripts
+
+Run from the directory above the repo, eg.
+
+    python -m script_gen_pipeline.benchmarks.bench_basic --sizes 8 96 384 1536 --out basic.json
+"""
+
+import argparse
+import os
+import tempfile
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+from script_gen_pipeline.benchmarks.harness import StageResult, measure, write_results
+from script_gen_pipeline.designs.construct import Construct, Variant
+from script_gen_pipeline.labware.containers import Layout, Well
+from script_gen_pipeline.labware.mix import Mix
+from script_gen_pipeline.protocol.basic import Basic, CLIP_VOL, DEFAULT_PART_VOL
+from script_gen_pipeline.protocol.batches import (
+    BASIC_TEMPLATES, DEFAULT_PARAMETERS, batch_kwargs, plan_batches)
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+from script_gen_pipeline.protocol.protocol import Protocol, final_well
+from script_gen_pipeline.protocol.steps import Setup
+from script_gen_pipeline.protocol.templates import TEMPLATE_DIR, render_script
+
+SIZES = [8, 96, 384, 1536]
+"""Numbers of unique constructs benchmarked by default."""
+
+MAX_VARIANTS = 8
+MIN_PARTS = 2
+"""BASIC spotting volumes are defined for constructs of 2 to 7 parts."""
+
+BENCH_MIX = Mix(
+    {Reagent("Promega T4 DNA Ligase buffer, 10X"): 3,
+     Reagent("NEB BsaI-HFv2"): 1,
+     Reagent("Promega T4 DNA Ligase"): 0.5,
+     Variant: DEFAULT_PART_VOL},
+    fill_with=Reagent("water"), fill_to=CLIP_VOL,
+)
+"""CLIP reaction mix over the synthetic designs' Variants."""
+
+
+def variants_per_module(constructs: int, max_variants: int = MAX_VARIANTS) -> List[int]:
+    """Split a number of constructs into variant counts per part module,
+    each at most max_variants, largest first. Eg. 96 -> [8, 6, 2]."""
+
+    counts = []
+    remaining = constructs
+    while remaining > 1:
+        factor = next((f for f in range(max_variants, 1, -1) if remaining % f == 0), None)
+        if factor is None:
+            raise ValueError(
+                f"{constructs} constructs can't be made from modules of at most {max_variants} variants")
+        counts.append(factor)
+        remaining //= factor
+    return counts or [1]
+
+
+def synthetic_components(constructs: int, max_variants: int = MAX_VARIANTS) -> List:
+    """Construct input with a linker before and after every part module."""
+
+    counts = variants_per_module(constructs, max_variants)
+    counts += [1] * (MIN_PARTS - len(counts))
+
+    components: List = []
+    for module, count in enumerate(counts):
+        components.append(f"L{module}")
+        components.append([f"P{module}_{v}" for v in range(count)])
+    components.append("L_end")
+    return components
+
+
+def build_construct(components: List) -> Construct:
+    construct = Construct(components)
+    for order_idx, module in enumerate(construct.modules):
+        if order_idx % 2 == 0:
+            for part in module.parts:
+                part.set_role("Linker")
+    return construct.update_construct()
+
+
+def clip_wells(basic: Basic) -> List[List[Well]]:
+    """One well per CLIP reaction, mixed by BENCH_MIX."""
+
+    clips = basic.clips_df
+    contents, volumes, offsets = BENCH_MIX.batch(
+        [prefix, part, suffix]
+        for prefix, part, suffix, number in zip(
+            clips["prefixes"], clips["parts"], clips["suffixes"], clips["number"])
+        for _ in range(number))
+    return [[Well(contents[start:end], volumes=volumes[start:end])
+             for start, end in zip(offsets, offsets[1:])]]
+
+
+def setup_layout(wells: List[List[Well]]) -> str:
+    protocol = Protocol()
+    Setup(wells)(protocol)
+    return Layout(protocol.containers, log_volume=True).to_csv()
+
+
+def render(constructs_list, out_dir: str) -> int:
+    """Batch the constructs to fit a deck and render every batch's scripts."""
+
+    clips = [list(zip(*(map(str, c[column]) for column in ("prefixes", "parts", "suffixes"))))
+             for c in constructs_list]
+    names = sorted({name for construct in clips for clip in construct for name in clip})
+    deck = DEFAULT_PARAMETERS["SOURCE_DECK_POS"]
+    sources_dict = {name: (final_well(i % 96 + 1), "", deck[i // 96 % len(deck)])
+                    for i, name in enumerate(names)}
+
+    scripts = 0
+    for batch in plan_batches(clips):
+        for script, kwargs in batch_kwargs(batch, sources_dict).items():
+            render_script(
+                os.path.join(out_dir, f"{batch.index}_{script}"),
+                os.path.join(TEMPLATE_DIR, BASIC_TEMPLATES[script]),
+                **kwargs)
+            scripts += 1
+    return scripts
+
+
+def bench_design(constructs: int, max_variants: int = MAX_VARIANTS,
+                 repeat: int = 3) -> List[StageResult]:
+    """Run every stage on one synthetic design."""
+
+    params = {"constructs": constructs, "max_variants": max_variants}
+    results: List[StageResult] = []
+
+    def stage(name: str, fn):
+        result, times, peak = measure(fn, repeat)
+        results.append(StageResult(name, params, times, peak))
+        return result
+
+    components = synthetic_components(constructs, max_variants)
+    construct = stage("construct", lambda: build_construct(components))
+    space = stage("unique", lambda: list(construct.get_unique_constructs()))
+
+    # Basic's constructor builds its subprotocols too, only its planning
+    # methods are benchmarked here, on the unique constructs
+    basic = Basic.__new__(Basic)
+    basic.constructs = [SimpleNamespace(modules=list(unique)) for unique in space]
+    basic.clips_df, basic.master_mix, basic.constructs_list = stage(
+        "clips_df", basic._create_clips_df)
+    stage("final_assembly", basic._gen_final_assembly_dict)
+
+    wells = clip_wells(basic)
+    stage("setup_layout", lambda: setup_layout(wells))
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        stage("render", lambda: render(basic.constructs_list, out_dir))
+    return results
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="numbers of unique constructs per design")
+    parser.add_argument("--max-variants", type=int, default=MAX_VARIANTS,
+                        help="max variants per part module")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage")
+    parser.add_argument("--out", default="", help="JSON file to write the results to")
+    args = parser.parse_args(argv)
+
+    results: List[StageResult] = []
+    for size in args.sizes:
+        design_results = bench_design(size, args.max_variants, args.repeat)
+        for result in design_results:
+            print(result)
+        results.extend(design_results)
+
+    if args.out:
+        write_results(args.out, results, benchmark="basic")
+    return results
+
+
+if __name__ == "__main__":
+    main()
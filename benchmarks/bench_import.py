@@ -0,0 +1,95 @@
+"""Import-time budget of the pipeline's modules.
+
+Each module is imported in a fresh interpreter, so nothing is cached
+between them, and timed from before its import to after. The run fails
+if a module takes longer than the budget or pulls in a heavy dependency
+(numpy, pandas) that should only be imported by the stage that needs it.
+
+Run from the directory above the repo, eg.
+
+    python -m script_gen_pipeline.benchmarks.bench_import --budget 1.0 --out import.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import List
+
+from script_gen_pipeline.benchmarks.harness import StageResult, write_results
+
+MODULES = [
+    "script_gen_pipeline.designs.construct",
+    "script_gen_pipeline.labware.containers",
+    "script_gen_pipeline.protocol.protocol",
+    "script_gen_pipeline.protocol.basic",
+    "script_gen_pipeline.protocol.batches",
+    "script_gen_pipeline.examples.example_basic_test",
+]
+"""Modules imported by the entry points. test.py is left out: importing it
+runs a whole protocol, so it measures a run rather than startup."""
+
+HEAVY_MODULES = ["numpy", "pandas"]
+"""Dependencies that must not be imported at startup."""
+
+BUDGET = 1.0
+"""Max seconds to import each module in a fresh interpreter."""
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy": heavy}}))
+"""
+
+
+def import_time(module: str, heavy: List[str] = HEAVY_MODULES) -> dict:
+    """Import module in a fresh interpreter.
+
+    Returns:
+        The seconds taken and which of heavy were imported along with it
+    """
+
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=heavy)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=MODULES, help="modules to import")
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help="max seconds to import each module")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh imports per module")
+    parser.add_argument("--out", default="", help="JSON file to write the results to")
+    args = parser.parse_args(argv)
+
+    results: List[StageResult] = []
+    failures = []
+    for module in args.modules:
+        runs = [import_time(module) for _ in range(args.repeat)]
+        result = StageResult(
+            "import", {"module": module}, [run["seconds"] for run in runs], 0.0
+        )
+        results.append(result)
+        print(result)
+
+        heavy = sorted({name for run in runs for name in run["heavy"]})
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+        if result.best > args.budget:
+            failures.append(f"{module} took {result.best:.3f}s, over {args.budget}s")
+
+    if args.out:
+        write_results(args.out, results, benchmark="import", budget=args.budget)
+    for failure in failures:
+        print(f"[import] {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Timing and memory measurement for local benchmark runs.
+
+Each stage is timed over a few repeats (keeping the best and mean) and
+then run once more under tracemalloc for its peak allocation, so memory
+tracing never inflates the timings. Results are written to JSON alongside
+the environment they were measured in, so runs can be compared between
+releases.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class StageResult:
+    """Measurements of one benchmark stage.
+
+    Attributes:
+        stage: name of the stage
+        params: parameters of the run, eg. number of constructs
+        times: seconds taken by each repeat
+        peak_kib: peak memory allocated during the stage in KiB
+    """
+
+    def __init__(self, stage: str, params: Dict[str, Any], times: List[float], peak_kib: float):
+        self.stage = stage
+        self.params = params
+        self.times = times
+        self.peak_kib = peak_kib
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    @property
+    def mean(self) -> float:
+        return sum(self.times) / len(self.times)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            **self.params,
+            "seconds": self.best,
+            "mean_seconds": self.mean,
+            "repeat": len(self.times),
+            "peak_kib": round(self.peak_kib, 1),
+        }
+
+    def __str__(self):
+        params = " ".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.stage:<24} {params:<32} {self.best * 1000:>10.2f} ms {self.peak_kib:>12.1f} KiB"
+
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> Tuple[Any, List[float], float]:
+    """Time fn over repeat calls, then trace one more call's memory.
+
+    Returns:
+        The result of the last call, the seconds of each timed call and
+        the peak memory of the traced call in KiB
+    """
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    if not tracing:
+        tracemalloc.stop()
+    return result, times, peak / 1024
+
+
+def git_revision() -> str:
+    """Return the current commit of the repo, or '' outside a checkout."""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def environment() -> Dict[str, Any]:
+    """Describe where the benchmarks ran."""
+
+    env = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    for module in ("numpy", "pandas"):
+        if module in sys.modules:
+            env[module] = getattr(sys.modules[module], "__version__", "")
+    return env
+
+
+def write_results(path: str, results: List[StageResult], **extra):
+    """Write the results and environment of a run to a JSON file."""
+
+    with open(path, "w") as results_file:
+        json.dump(
+            {"environment": environment(), **extra,
+             "results": [result.to_dict() for result in results]},
+            results_file,
+            indent=2,
+        )
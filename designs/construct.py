@@ -15,9 +15,12 @@ suffix linkers, scars)
 from typing import List, Tuple
 from warnings import warn
 from itertools import product
-import numpy as np
+import logging
+import math
 from uuid import uuid4
 
+logger = logging.getLogger(__name__)
+
 
 class Variant:
     """ Equivalent to a part on SynBioHub or Parts Registry.
@@ -33,11 +36,14 @@ class Variant:
         suffix: BASIC linker that comes after a part (Module) in construct
         uri: Equivalent to SBOL URI
     """
+    __slots__ = ('component', 'id', 'short_id', 'name', 'module_id', 'module_order_idx',
+                 'uri', 'sequence', 'annotations', 'role', 'prefix', 'suffix')
+
     def __init__(self, component):
         self.component = component
 
         self.id = uuid4()
-        self.short_id = str(uuid4())[0:6]
+        self.short_id = str(self.id)[0:6]
         self.name = self.get_name()
         self.module_id = None  # we probs don't need both
         self.module_order_idx = None
@@ -51,21 +57,21 @@ class Variant:
         self.suffix = None
         
     def get_name(self):
-        print("[Variant] NotImplem: get SBOL part name")
+        logger.debug("[Variant] NotImplem: get SBOL part name")
         # name = pysbol.get_part(self.component)
         return f'BBA_fake_{self.component}'  # str(self.id)[0:3]
 
     def get_uri(self):
-        print("[Variant] NotImplem: get SBOL uri")
+        logger.debug("[Variant] NotImplem: get SBOL uri")
         # uri = pysbol.get_uri(self.component)
         return 0
 
     def get_seq(self):
-        print("[Variant] NotImplem: get SBOL DNA sequence. Watch out for internal references.")
+        logger.debug("[Variant] NotImplem: get SBOL DNA sequence. Watch out for internal references.")
         return 0
 
     def get_annotations(self):
-        print("[Variant] NotImplem: get SBOL annotations")
+        logger.debug("[Variant] NotImplem: get SBOL annotations")
         return 0
 
     def is_linker(self):
@@ -86,19 +92,26 @@ class Part:
 
     Attributes:
         comb_variants: all combinatorial variations on this part
+        variants: views over this part's rows of its VariantTable
         role: same as SBOL role (promoter, DNA, RBS...), but
             includes linkers (and assembly specific parts)
         module_id: the unique id of a Module that the Part is in
         range: sequence information (relation)
     """
-    def __init__(self, component):
-        print("[Part init] Parse component into constituent Variant")
+    def __init__(self, component, table=None):
+        logger.debug("[Part init] Parse component into constituent Variant")
+        # variant_table imports Variant from here, so import it on use
+        from script_gen_pipeline.designs.variant_table import VariantTable
+
         self.role = self.get_role(component)
-        self.variants: List(Variant) = self.make_variants(component)
+        self.table = VariantTable() if table is None else table
+        """ Table holding this part's variants, shared by a Construct's parts """
+        self.rows: range = self.make_variants(component)
+        self._variants: List[Variant] = None
         self.module_id = None  # Set once Modules are made
         self.id = uuid4()
 
-        print("NotImplem: define roles ('Linker') through ids not strs")
+        logger.debug("NotImplem: define roles ('Linker') through ids not strs")
         if self.role != "Linker":
             self.prefix = None  # self.module_id
             self.suffix = None
@@ -106,55 +119,64 @@ class Part:
         # self.range = self.get_range()
 
     def get_role(self, component):
-        print("[Part get_role] NotImplem: get component role SBOL style")
+        logger.debug("[Part get_role] NotImplem: get component role SBOL style")
         role = 'Yuh'
         return role
 
     def set_role(self, role):
         """ Set the role of the part and propagate to all variants """
         self.role = role
-        for i, _var_ in enumerate(self.variants):
-            self.variants[i].role = role
+        self.table.set_rows_role(self.rows, role)
 
     def is_linker(self):
         """ Check if this part's role is 'Linker' """
-        print("[Part is_linker] make sure is_linker() matches the same fxn in Variant")
+        logger.debug("[Part is_linker] make sure is_linker() matches the same fxn in Variant")
         return (self.role == 'Linker')
 
     def get_module_id(self):
         pass
 
-    def make_variants(self, component):
-        variants: List(Variant) = []
+    @property
+    def variants(self) -> List[Variant]:
+        """ Views over this part's rows, made on first access. They read
+        the table live, so later role or module changes show through. """
+        if self._variants is None:
+            from script_gen_pipeline.designs.variant_table import VariantView
+
+            self._variants = [VariantView(self.table, row) for row in self.rows]
+        return self._variants
+
+    def make_variants(self, component) -> range:
+        """ Add a row to the table per combinatorial variant, named as
+        Variant.get_name, and return the rows """
+        from script_gen_pipeline.designs.variant_table import NO_MODULE
+
+        components: List = []
         comb_ders = self.unpack_comb_ders(component)
 
         for comb_def in comb_ders:
             # make single_comb_def iterable
             comb_def = comb_def if isinstance(comb_def, list) else [comb_def]
-            for single_comb_def in comb_def:
-                variant = Variant(single_comb_def)
-                variant.role = self.role
-                variants.append(variant)
-        return variants
+            components.extend(comb_def)
+        names = [f'BBA_fake_{single_comb_def}' for single_comb_def in components]
+        return self.table.extend(names, self.role, NO_MODULE, components)
 
     def unpack_comb_ders(self, component):
         """ Enumerate each combinatorial design in this part; 
         refer to Ming's combinatorial derivation code"""
         comb_ders = component
-        print(f"NotImplem: from the root component {component} get child variant components")
+        logger.debug("NotImplem: from the root component %s get child variant components", component)
         return [comb_ders]
 
-    def set_module_info(self, module_id, **kwargs):
+    def set_module_info(self, module_id, module_order_idx):
         """ Set the module id of the current part and its variants """
         self.module_id = module_id
         # propagate to variants
-        for i, _var_ in enumerate(self.variants):
-            self.variants[i].module_id = module_id
-            for key, value in kwargs.items():
-                setattr(self.variants[i], key, value)  # set property 'key' to value
+        self.table.module_ids[module_order_idx] = module_id
+        self.table.set_rows_module(self.rows, module_order_idx)
 
     def __len__(self):
-        print(f"Using the length of Part {self.role}: {self.id}")
+        logger.debug("Using the length of Part %s: %s", self.role, self.id)
         return 1
 
     def __repr__(self):
@@ -179,10 +201,66 @@ class Module():
         for i, _part_ in enumerate(parts):
             parts[i].set_module_info(module_id=self.id, 
                 module_order_idx=self.order_idx)
-        print('[make_parts_list] parts[0].variants[0].module_order_idx', parts[0].variants[0].module_order_idx)
+        logger.debug("[make_parts_list] parts[0].variants[0].module_order_idx %s",
+                     parts[0].variants[0].module_order_idx)
         return parts
 
 
+class CombinatorialSpace:
+    """ Lazy stand-in for list(product(*variant_lists)). Nothing is
+    enumerated up front: each unique construct is decoded from its
+    integer index on demand, so a design with 8 modules of 10 variants
+    costs 8 lists rather than 10^8 tuples.
+
+    Ordering is the same as itertools.product, ie. the last variant
+    list varies fastest.
+
+    Attributes:
+        variant_lists: one list of Variants per position in the construct
+        indices: the range of product indices covered by this space.
+            Slicing returns a new space over a sub-range.
+    """
+    def __init__(self, variant_lists: List[List[Variant]], indices: range = None):
+        self.variant_lists: List[List[Variant]] = [list(v) for v in variant_lists]
+        self.radices: List[int] = [len(v) for v in self.variant_lists]
+
+        self.size = 1
+        for radix in self.radices:
+            self.size *= radix
+        self.indices: range = range(self.size) if indices is None else indices
+
+    def decode(self, index: int) -> Tuple[Variant]:
+        """ Mixed-radix decode of a product index into its Variants """
+        construct: List[Variant] = [None] * len(self.radices)
+        for pos in range(len(self.radices) - 1, -1, -1):
+            index, digit = divmod(index, self.radices[pos])
+            construct[pos] = self.variant_lists[pos][digit]
+        return tuple(construct)
+
+    def chunks(self, size: int):
+        """ Yield consecutive sub-spaces of at most size constructs,
+        eg. one per plate or robot run """
+        for start in range(0, len(self), size):
+            yield self[start:start + size]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CombinatorialSpace(self.variant_lists, self.indices[key])
+        return self.decode(self.indices[key])
+
+    def __iter__(self):
+        if self.indices == range(self.size):
+            # Whole space: product is already lazy and cheaper per item
+            return product(*self.variant_lists)
+        return (self.decode(index) for index in self.indices)
+
+    def __repr__(self):
+        return f"CombinatorialSpace({' x '.join(str(r) for r in self.radices)}, {len(self)} constructs)"
+
+
 class Construct():
     """ Highest level of design. A construct is the full plasmid
     including all parts and variations. Takes in the output of the 
@@ -194,22 +272,27 @@ class Construct():
             parts and translating them into buildeable units. Ordered
             by index of creation starting at 0.
         parts: List of all parts in construct without Module hierarchy
+        table: VariantTable holding the Variants of all parts, one row each
         unique_constructs: construct hierarchy of modules > parts > variants
             is flattened to the Variant level. Each entry in list corresponds
             to one unique construct.
     """
     def __init__(self, sbol_input):
 
+        # variant_table imports Variant from here, so import it on use
+        from script_gen_pipeline.designs.variant_table import VariantTable
+
         self.id = uuid4()
+        self.table = VariantTable()
         # self.sbol_input = sbol_input
-        print("\n\n[Construct init] should be making modules now")
+        logger.debug("[Construct init] should be making modules now")
         self.modules: List[Module] = self.make_modules(sbol_input)
         """ Might be able to make modules right away from sbol_input
         depending on output of SBOL Designer """
         self.parts: List[Part] = self.make_parts()
         self.simp_modules: List[str] = self._simplify_modules()
         """ Modules in order of construct assembly """
-        self.unique_constructs: List[List[Variant]] = None        
+        self.unique_constructs: CombinatorialSpace = None
 
     def make_modules(self, sbol_input):
         """ Return all the parts within the final construct
@@ -219,7 +302,7 @@ class Construct():
         components = self.get_components(sbol_input)
 
         for component in components:
-            part = Part(component)
+            part = Part(component, self.table)
             parts.append(part)
 
         modules: List[Module] = []
@@ -274,8 +357,8 @@ class Construct():
         return Module(order_idx, [module_1.parts, module_2.parts])
 
     def check_adjacent(self, num1, num2):
-        num1 = int(np.floor(num1))
-        num2 = int(np.floor(num2))
+        num1 = math.floor(num1)
+        num2 = math.floor(num2)
         is_adjacent = num1 < (num2+1) and num1 > (num2-1)
         return is_adjacent
 
@@ -289,25 +372,27 @@ class Construct():
 
     # TESTED: 23.07.20
     def get_unique_constructs(self, 
-                remove_modules: List = None) -> List[Tuple[Variant]]:
+                remove_modules: List = None) -> CombinatorialSpace:
         """ List each unique, full construct possible by flattening the
         construct by Variants in order of assembly. Optionally use the 
         remove_modules argument to remove specific modules.
+
+        Returns a lazy CombinatorialSpace: len() is O(1) and constructs
+        are decoded by index, slice or iteration as they are needed.
         """
 
         all_variant_lists = []
+        debug = logger.isEnabledFor(logging.DEBUG)
         # Loop long for: all_variant_lists.append(modules[all].parts[all].variants)
         for module in self.modules:
             for part in module.parts:
                 all_variant_lists.append(part.variants)
-                for variant in part.variants:
-                    print('[get_unique_constructs] variant.role', variant.role)
+                if debug:
+                    for variant in part.variants:
+                        logger.debug("[get_unique_constructs] variant.role %s", variant.role)
 
-        unique_constructs = list(product(*all_variant_lists)) 
-        # while unique_constructs not isinstance(unique_constructs, list)
-        # self.unique_constructs = unique_constructs
-        
-        print("""NotImplem: [get_unique_constructs] Maybe set self.unique_constructs too?""")
+        unique_constructs = CombinatorialSpace(all_variant_lists)
+        self.unique_constructs = unique_constructs
         return unique_constructs
 
     # TESTED: 23.07.20
@@ -315,22 +400,7 @@ class Construct():
         """ Set the prefix and suffix of each variant as the module id.
         Propagate the module id of linker prefix and suffixes to 
         the parts they are flanking """
-        print('\n\n\nset_pref_suff: type(self.modules[0]) \n\n\n', type(self.modules[0]))
-
-        for mod_idx, module in enumerate(self.modules):  # keep things diagonal :)  
-            for part_idx, part in enumerate(module.parts):
-                for var_idx, variant in enumerate(part.variants):
-                    if variant.is_linker():
-                        continue
-                    else:
-                        if mod_idx != 0:
-                            if self.modules[mod_idx-1].parts[0].is_linker():
-                                variant.prefix = self.modules[mod_idx-1].order_idx
-                            if mod_idx != (len(self.modules)-1):
-                                if self.modules[mod_idx+1].parts[0].is_linker():
-                                    variant.suffix = self.modules[mod_idx+1].order_idx
-                    # Update
-                    self.modules[mod_idx].parts[part_idx].variants[var_idx] = variant
+        self.table.set_pref_suff()
         return self
 
     def _simplify_modules(self):
@@ -0,0 +1,277 @@
+""" Columnar storage of Variants. Instead of one Variant object (and its
+uuids, SBOL lookups and __dict__) per variant, a VariantTable keeps one
+typed array per attribute. Row i across all columns is one variant.
+Lightweight VariantViews over a row are handed out to code that still
+wants objects. Construct keeps the Variants of all its Parts in one table.
+"""
+
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterator, List, Sequence
+from uuid import uuid4
+
+from script_gen_pipeline.designs.construct import Variant
+
+if TYPE_CHECKING:
+    from script_gen_pipeline.designs.construct import Construct
+
+LINKER_ROLE = 'Linker'
+NO_LINKER = -1
+""" Value of the prefix/suffix columns when a variant has no flanking linker """
+NO_MODULE = -1
+""" Value of the module column before a variant's Part is put in a Module """
+
+
+class VariantView(Variant):
+    """ Read-only, Variant-like view over one row of a VariantTable.
+    Has every Variant attribute, and is a Variant so Mixes and Layouts
+    treat it as one. Like Variant it has __slots__, so a view is two
+    references and no __dict__. """
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table: "VariantTable", row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def component(self):
+        return self.table.components[self.row]
+
+    @property
+    def id(self) -> str:
+        return f'{self.table.id}:{self.row}'
+
+    @property
+    def short_id(self) -> str:
+        return f'{self.table.short_id}:{self.row}'
+
+    @property
+    def name(self) -> str:
+        return self.table.names[self.row]
+
+    @property
+    def role(self) -> str:
+        return self.table.roles[self.table.role_codes[self.row]]
+
+    @property
+    def module_id(self):
+        return self.table.module_ids.get(self.table.module_idx[self.row])
+
+    @property
+    def module_order_idx(self) -> int:
+        idx = self.table.module_idx[self.row]
+        return None if idx == NO_MODULE else idx
+
+    @property
+    def prefix(self):
+        prefix = self.table.prefixes[self.row]
+        return None if prefix == NO_LINKER else prefix
+
+    @property
+    def suffix(self):
+        suffix = self.table.suffixes[self.row]
+        return None if suffix == NO_LINKER else suffix
+
+    @property
+    def uri(self):
+        return self.get_uri()
+
+    @property
+    def sequence(self):
+        """ The sequence, or Variant.get_seq's placeholder if it has none """
+        return self.table.sequence(self.row) or self.get_seq()
+
+    @property
+    def annotations(self):
+        return self.get_annotations()
+
+    def is_linker(self):
+        return self.role == LINKER_ROLE
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VariantView) and \
+            self.table is other.table and self.row == other.row
+
+    def __hash__(self):
+        return hash((id(self.table), self.row))
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return self.name
+
+
+class VariantTable:
+    """ Array-backed table of Variants.
+
+    Attributes:
+        id: unique id of the table, the views' ids are this and their row
+        components: component each variant was made from
+        names: part name of each variant (eg. BBa_K10002)
+        roles: role names, indexed by role_codes
+        role_codes: role of each variant as an index into roles
+        module_idx: order index of the Module each variant is in
+        module_ids: unique id of each Module, by order index
+        prefixes: module order index of the prefix linker, or NO_LINKER
+        suffixes: module order index of the suffix linker, or NO_LINKER
+        seq_offsets: variant i's sequence is the slice
+            seq_offsets[i]:seq_offsets[i+1] of one concatenated buffer
+    """
+    def __init__(self):
+        self.id = uuid4()
+        self.short_id = str(self.id)[0:6]
+        self.components: List = []
+        self.names: List[str] = []
+        self.roles: List[str] = []
+        self._role_to_code: Dict[str, int] = {}
+        self.role_codes = array('h')
+        self.module_idx = array('l')
+        self.module_ids: Dict[int, object] = {}
+        self.prefixes = array('l')
+        self.suffixes = array('l')
+        self.seq_offsets = array('q', [0])
+
+        self._seq_chunks: List[str] = []
+        self._seq_buffer = ''
+
+    @classmethod
+    def from_components(cls, components: List, roles: Sequence[str] = None) -> "VariantTable":
+        """ Build a table straight from the same input Construct takes:
+        one entry per Module, a list entry holding combinatorial variants.
+        Skips building the Construct > Module > Part graph.
+
+        Args:
+            components: one entry per module
+            roles: role of each module's variants (default: {None for all}) """
+        if roles is not None and len(roles) != len(components):
+            raise ValueError(f"{len(roles)} roles given for {len(components)} modules")
+        table = cls()
+        for order_idx, component in enumerate(components):
+            component = component if isinstance(component, list) else [component]
+            table.extend(
+                [f'BBA_fake_{c}' for c in component],
+                roles[order_idx] if roles is not None else None, order_idx, component)
+        return table
+
+    @classmethod
+    def from_construct(cls, construct: "Construct") -> "VariantTable":
+        """ Flatten an existing Construct into a table """
+        table = cls()
+        for module in construct.modules:
+            for part in module.parts:
+                for variant in part.variants:
+                    sequence = variant.sequence
+                    table.append(
+                        variant.name, variant.role, module.order_idx,
+                        prefix=variant.prefix, suffix=variant.suffix,
+                        sequence=str(sequence) if sequence else '',
+                        component=variant.component)
+        return table
+
+    def role_code(self, role: str) -> int:
+        """ Return the code of role, registering it if new """
+        code = self._role_to_code.get(role)
+        if code is None:
+            code = len(self.roles)
+            self.roles.append(role)
+            self._role_to_code[role] = code
+        return code
+
+    def append(self, name: str, role: str, module_idx: int,
+               prefix: int = None, suffix: int = None, sequence: str = '',
+               component=None) -> int:
+        """ Add a single variant, return its row """
+        self.components.append(component)
+        self.names.append(name)
+        self.role_codes.append(self.role_code(role))
+        self.module_idx.append(module_idx)
+        self.prefixes.append(NO_LINKER if prefix is None else prefix)
+        self.suffixes.append(NO_LINKER if suffix is None else suffix)
+        self._append_sequence(sequence)
+        return len(self.names) - 1
+
+    def extend(self, names: List[str], role: str, module_idx: int,
+               components: List = None) -> range:
+        """ Add all variants of one Module at once, return their rows """
+        start = len(self.names)
+        count = len(names)
+        self.components.extend(components if components is not None else [None] * count)
+        self.names.extend(names)
+        self.role_codes.extend([self.role_code(role)] * count)
+        self.module_idx.extend([module_idx] * count)
+        self.prefixes.extend([NO_LINKER] * count)
+        self.suffixes.extend([NO_LINKER] * count)
+        self.seq_offsets.extend([self.seq_offsets[-1]] * count)
+        return range(start, start + count)
+
+    def _append_sequence(self, sequence: str):
+        if sequence:
+            self._seq_chunks.append(sequence)
+        self.seq_offsets.append(self.seq_offsets[-1] + len(sequence))
+
+    def sequence(self, row: int) -> str:
+        """ Return the sequence of the variant in row """
+        if len(self._seq_buffer) != self.seq_offsets[-1]:
+            self._seq_buffer = ''.join(self._seq_chunks)
+        return self._seq_buffer[self.seq_offsets[row]:self.seq_offsets[row + 1]]
+
+    def set_role(self, module_idx: int, role: str):
+        """ Set the role of every variant in a module, as Part.set_role """
+        self.set_rows_role(
+            [row for row, idx in enumerate(self.module_idx) if idx == module_idx], role)
+
+    def set_rows_role(self, rows: Iterator[int], role: str):
+        """ Set the role of the variants in rows """
+        code = self.role_code(role)
+        for row in rows:
+            self.role_codes[row] = code
+
+    def set_rows_module(self, rows: Iterator[int], module_idx: int):
+        """ Put the variants in rows in the Module of order index module_idx """
+        for row in rows:
+            self.module_idx[row] = module_idx
+
+    def linker_modules(self) -> Dict[int, bool]:
+        """ Map each module index to whether it is a linker module """
+        linker_code = self._role_to_code.get(LINKER_ROLE)
+        is_linker: Dict[int, bool] = {}
+        for idx, code in zip(self.module_idx, self.role_codes):
+            is_linker[idx] = is_linker.get(idx, False) or code == linker_code
+        return is_linker
+
+    def set_pref_suff(self) -> "VariantTable":
+        """ Same rule as Construct._set_pref_suff, applied column-wise:
+        non-linker variants take the order index of flanking linker
+        modules as their prefix / suffix. """
+        is_linker = self.linker_modules()
+        last_idx = max(is_linker) if is_linker else 0
+        linker_code = self._role_to_code.get(LINKER_ROLE)
+        for row, idx in enumerate(self.module_idx):
+            if self.role_codes[row] == linker_code or idx == 0:
+                continue
+            if is_linker.get(idx - 1):
+                self.prefixes[row] = idx - 1
+            if idx != last_idx and is_linker.get(idx + 1):
+                self.suffixes[row] = idx + 1
+        return self
+
+    def variant_lists(self) -> List[List[VariantView]]:
+        """ One list of views per module in module order, eg. for
+        CombinatorialSpace """
+        modules: Dict[int, List[VariantView]] = {}
+        for row, idx in enumerate(self.module_idx):
+            modules.setdefault(idx, []).append(VariantView(self, row))
+        return [modules[idx] for idx in sorted(modules)]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, row: int) -> VariantView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return VariantView(self, row)
+
+    def __iter__(self) -> Iterator[VariantView]:
+        return (VariantView(self, row) for row in range(len(self)))
@@ -9,17 +9,20 @@ metadata = {'apiLevel': '2.2',
 
 
 def run(protocol: protocol_api.ProtocolContext):
-    def final_assembly(final_assembly_dict, tiprack_num, tiprack_type='opentrons_96_tiprack_10ul'):
+    def final_assembly(final_assembly_dict, tiprack_slots, multichannel_transfers=None,
+                       tiprack_type='opentrons_96_tiprack_10ul'):
         """Implements final assembly reactions using an opentrons OT-2.
 
         Args:
         final_assembly_dict (dict): Dictionary with keys and values corresponding to destination and associated linker-ligated part wells, respectively.
-        tiprack_num (int): Number of tipracks required during run.
+        tiprack_slots (list of str): Slots of the tipracks used during run.
+        multichannel_transfers (dict): Planned transfers of each part, whole columns of which
+            are made with a p10_multi, or None to use the p10_single only.
 
         """
         # Constants
-        CANDIDATE_TIPRACK_SLOTS = ['3', '6', '9', '2', '5', '8', '11']
         PIPETTE_MOUNT = 'right'
+        MULTI_PIPETTE_MOUNT = 'left'
         MAG_PLATE_TYPE = 'biorad_96_wellplate_200ul_pcr'
         MAG_PLATE_POSITION = '1'
         TUBE_RACK_TYPE = 'opentrons_24_tuberack_nest_1.5ml_snapcap'
@@ -36,9 +39,8 @@ def run(protocol: protocol_api.ProtocolContext):
         if sample_number > 96:
             raise ValueError('Final assembly nummber cannot exceed 96.')
 
-        slots = CANDIDATE_TIPRACK_SLOTS[:tiprack_num]
         tipracks = [protocol.load_labware(tiprack_type, slot)
-                for slot in slots]
+                for slot in tiprack_slots]
         pipette = protocol.load_instrument('p10_single', PIPETTE_MOUNT, tip_racks=tipracks)
 
         # Define Labware and set temperature
@@ -68,14 +70,30 @@ def run(protocol: protocol_api.ProtocolContext):
             pipette.drop_tip()
 
         # Part transfers
-        for key, values in list(final_assembly_dict.items()):
-            mag_bead_wells = [magbead_plate.wells_by_name()[value] for value in values]
-            pipette.transfer(PART_VOL, mag_bead_wells,
-                            destination_plate.wells_by_name()[key], mix_after=MIX_SETTINGS,
-                            new_tip='always')
+        if multichannel_transfers:
+            multi_pipette = protocol.load_instrument(
+                'p10_multi', MULTI_PIPETTE_MOUNT, tip_racks=tipracks)
+            for transfers in multichannel_transfers.values():
+                for transfer in transfers:
+                    # A whole column is addressed by its first well
+                    if len(transfer['dest_wells']) > 1:
+                        instrument = multi_pipette
+                    else:
+                        instrument = pipette
+                    instrument.transfer(transfer['volume'],
+                                    magbead_plate.wells_by_name()[transfer['source_wells'][0]],
+                                    destination_plate.wells_by_name()[transfer['dest_wells'][0]],
+                                    mix_after=MIX_SETTINGS)
+        else:
+            for key, values in list(final_assembly_dict.items()):
+                mag_bead_wells = [magbead_plate.wells_by_name()[value] for value in values]
+                pipette.transfer(PART_VOL, mag_bead_wells,
+                                destination_plate.wells_by_name()[key], mix_after=MIX_SETTINGS,
+                                new_tip='always')
 
         temp_mod.deactivate()
 
 
     final_assembly(final_assembly_dict=final_assembly_dict,
-               tiprack_num=tiprack_num)
\ No newline at end of file
+               tiprack_slots=tiprack_slots,
+               multichannel_transfers=multichannel_transfers)
\ No newline at end of file
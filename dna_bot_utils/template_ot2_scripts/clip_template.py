@@ -16,15 +16,24 @@ def run(protocol: protocol_api.ProtocolContext):
         parts_plates,
         parts_vols,
         water_vols,
+        tiprack_slots,
+        multichannel_transfers=None,
         tiprack_type='opentrons_96_tiprack_10ul'):
     
-        """Implements linker ligation reactions using an opentrons OT-2."""
+        """Implements linker ligation reactions using an opentrons OT-2.
+
+        Args:
+        tiprack_slots (list of str): Slots of the tipracks used during run.
+        multichannel_transfers (dict): Planned linker and part transfers by kind, whole
+            columns of which are made with a p10_multi, or None to use the p10_single only.
+
+        """
 
         # Constants
         INITIAL_TIP = 'A1'
-        CANDIDATE_TIPRACK_SLOTS = ['3', '6', '9']
         PIPETTE_TYPE = 'p10_single'
         PIPETTE_MOUNT = 'right'
+        MULTI_PIPETTE_MOUNT = 'left'
         SOURCE_PLATE_TYPE = 'biorad_96_wellplate_200ul_pcr'
         DESTINATION_PLATE_TYPE = 'biorad_96_wellplate_200ul_pcr'
         DESTINATION_PLATE_POSITION = '1'
@@ -37,29 +46,18 @@ def run(protocol: protocol_api.ProtocolContext):
         LINKER_MIX_SETTINGS = (1, 3)
         PART_MIX_SETTINGS = (4, 5)
 
-        # Tiprack slots
-        total_tips = 4 * len(parts_wells)
         letter_dict = {'A': 0, 'B': 1, 'C': 2,
                     'D': 3, 'E': 4, 'F': 5, 'G': 6, 'H': 7}
 
         initial_destination_well_index = letter_dict[INITIAL_DESTINATION_WELL[0]]*12 \
             + int(INITIAL_DESTINATION_WELL[1]) - 1
 
-        tiprack_1_tips = (
-            13 - int(INITIAL_TIP[1:])) * 8 - letter_dict[INITIAL_TIP[0]]
-        if total_tips > tiprack_1_tips:
-            tiprack_num = 1 + (total_tips - tiprack_1_tips) // 96 + \
-                (1 if (total_tips - tiprack_1_tips) % 96 > 0 else 0)
-        else:
-            tiprack_num = 1
-        slots = CANDIDATE_TIPRACK_SLOTS[:tiprack_num]
-
         source_plates = {}
         source_plates_keys = list(set((prefixes_plates + suffixes_plates + parts_plates)))
         for key in source_plates_keys:
             source_plates[key] = protocol.load_labware(SOURCE_PLATE_TYPE, key)
 
-        tipracks = [protocol.load_labware(tiprack_type, slot) for slot in slots]
+        tipracks = [protocol.load_labware(tiprack_type, slot) for slot in tiprack_slots]
         if PIPETTE_TYPE != 'p10_single':
             print('Define labware must be changed to use', PIPETTE_TYPE)
             exit()
@@ -83,12 +81,29 @@ def run(protocol: protocol_api.ProtocolContext):
         pipette.drop_tip()
         pipette.transfer(water_vols, water,
                         destination_wells, new_tip='always')
-        for clip_num in range(len(parts_wells)):
-            pipette.transfer(1, source_plates[prefixes_plates[clip_num]].wells(prefixes_wells[clip_num]),
-                            destination_wells[clip_num], mix_after=LINKER_MIX_SETTINGS)
-            pipette.transfer(1, source_plates[suffixes_plates[clip_num]].wells(suffixes_wells[clip_num]),
-                            destination_wells[clip_num], mix_after=LINKER_MIX_SETTINGS)
-            pipette.transfer(parts_vols[clip_num], source_plates[parts_plates[clip_num]].wells(parts_wells[clip_num]),
-                            destination_wells[clip_num], mix_after=PART_MIX_SETTINGS)
+        if multichannel_transfers:
+            multi_pipette = protocol.load_instrument(
+                'p10_multi', MULTI_PIPETTE_MOUNT, tip_racks=tipracks)
+            for kind, mix_settings in (('prefixes', LINKER_MIX_SETTINGS),
+                                       ('suffixes', LINKER_MIX_SETTINGS),
+                                       ('parts', PART_MIX_SETTINGS)):
+                for transfer in multichannel_transfers[kind]:
+                    # A whole column is addressed by its first well
+                    if len(transfer['dest_wells']) > 1:
+                        instrument = multi_pipette
+                    else:
+                        instrument = pipette
+                    instrument.transfer(transfer['volume'],
+                        source_plates[transfer['source_plate']].wells_by_name()[transfer['source_wells'][0]],
+                        destination_plate.wells_by_name()[transfer['dest_wells'][0]],
+                        mix_after=mix_settings)
+        else:
+            for clip_num in range(len(parts_wells)):
+                pipette.transfer(1, source_plates[prefixes_plates[clip_num]].wells(prefixes_wells[clip_num]),
+                                destination_wells[clip_num], mix_after=LINKER_MIX_SETTINGS)
+                pipette.transfer(1, source_plates[suffixes_plates[clip_num]].wells(suffixes_wells[clip_num]),
+                                destination_wells[clip_num], mix_after=LINKER_MIX_SETTINGS)
+                pipette.transfer(parts_vols[clip_num], source_plates[parts_plates[clip_num]].wells(parts_wells[clip_num]),
+                                destination_wells[clip_num], mix_after=PART_MIX_SETTINGS)
         
-    clip(**clips_dict)
\ No newline at end of file
+    clip(**clips_dict, tiprack_slots=tiprack_slots, multichannel_transfers=multichannel_transfers)
\ No newline at end of file
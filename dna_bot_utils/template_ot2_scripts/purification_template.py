@@ -12,6 +12,7 @@ def run(protocol: protocol_api.ProtocolContext):
         sample_number,
         ethanol_well,
         elution_buffer_well,
+        tiprack_slots,
         sample_volume=30,
         bead_ratio=1.8,
         elution_buffer_volume=40,
@@ -27,14 +28,13 @@ def run(protocol: protocol_api.ProtocolContext):
             ethanol_well (str): well in reagent container containing ethanol.
             elution_buffer_well (str): well in reagent container containing elution buffer.
             sample_offset (int): offset the intial sample column by the specified value.
+            tiprack_slots (list of str): slots of the tipracks used during run.
 
         """
 
         # Constants
         PIPETTE_ASPIRATE_RATE = 25
         PIPETTE_DISPENSE_RATE = 150
-        TIPS_PER_SAMPLE = 9
-        CANDIDATE_TIPRACK_SLOTS = ['3', '6', '9', '2', '5']
         MAGDECK_POSITION = '1'
         MIX_PLATE_TYPE = 'biorad_96_wellplate_200ul_pcr'
         MIX_PLATE_POSITION = '4'
@@ -63,11 +63,8 @@ def run(protocol: protocol_api.ProtocolContext):
             raise ValueError('sample number cannot exceed 48')
 
         # Tips and pipette
-        total_tips = sample_number * TIPS_PER_SAMPLE
-        tiprack_num = total_tips // 96 + (1 if total_tips % 96 > 0 else 0)
-        slots = CANDIDATE_TIPRACK_SLOTS[:tiprack_num]
         tipracks = [protocol.load_labware(tiprack_type, slot)
-                    for slot in slots]
+                    for slot in tiprack_slots]
         pipette = protocol.load_instrument('p300_multi', 'left', tip_racks=tipracks)
         pipette.flow_rate.aspirate = PIPETTE_ASPIRATE_RATE
         pipette.flow_rate.dispense = PIPETTE_DISPENSE_RATE
@@ -178,4 +175,5 @@ def run(protocol: protocol_api.ProtocolContext):
 
 
     magbead(sample_number=sample_number,
-            ethanol_well=ethanol_well, elution_buffer_well='A1')
+            ethanol_well=ethanol_well, elution_buffer_well='A1',
+            tiprack_slots=tiprack_slots)
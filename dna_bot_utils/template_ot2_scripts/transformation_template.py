@@ -1,6 +1,5 @@
 from opentrons import protocol_api
 from opentrons import legacy_api
-import numpy as np
 
 metadata = {'apiLevel': '2.2',
             'protocolName': 'Transformation Template v2',
@@ -26,35 +25,6 @@ def run(protocol: protocol_api.ProtocolContext):
             wells) if wells.index(well) == i]
         return transformation_wells
 
-        
-    def tiprack_slots(spotting_tuples, max_spot_vol=5):
-        """Calculates p10 and p300 tiprack slots required.
-
-        Args:
-        spotting_tuples (list): Sets of spotting reactions are given 
-            in the form: ((source wells), (target wells), (spotting volumes)). 
-            Each unique transformation well is resuspended once prior to spotting.
-        max_spot_vol (float): Maximum volume that is spotted per spot reaction.
-
-        """
-        # Reactions' number
-        transformation_reactions = len(
-            generate_transformation_wells(spotting_tuples))
-        spotting_reactions = 0
-        for spotting_tuple in spotting_tuples:
-            spots = np.array(spotting_tuple[2])/max_spot_vol
-            np.ceil(spots)
-            spotting_reactions = spotting_reactions + int(np.sum(spots))
-
-        # p10 tiprack slots
-        p10_tips = transformation_reactions + spotting_reactions
-        p10_tiprack_slots = p10_tips // 96 + 1 if p10_tips % 96 > 0 else p10_tips / 96
-
-        # p300 tiprack slots
-        p300_tips = transformation_reactions + spotting_reactions
-        p300_tiprack_slots = p300_tips // 96 + \
-            1 if p300_tips % 96 > 0 else p300_tips / 96
-        return int(p10_tiprack_slots), int(p300_tiprack_slots)
 
     
     def transformation_setup(transformation_wells):
@@ -261,8 +231,6 @@ def run(protocol: protocol_api.ProtocolContext):
     # Run protocol
 
     # Constants
-    CANDIDATE_P10_SLOTS = ['9', '2', '5']
-    CANDIDATE_P300_SLOTS = ['3', '6']
     P10_TIPRACK_TYPE = 'opentrons_96_tiprack_10ul'
     P300_TIPRACK_TYPE = 'opentrons_96_tiprack_300ul'
     P10_MOUNT = 'right'
@@ -279,18 +247,11 @@ def run(protocol: protocol_api.ProtocolContext):
     AGAR_PLATE_TYPE = 'axygen_1_reservoir_90ml'
     AGAR_PLATE_SLOT = '1'
 
-    # Tiprack slots
-    p10_p300_tiprack_slots = tiprack_slots(spotting_tuples)
-    p10_slots = CANDIDATE_P10_SLOTS[
-        :p10_p300_tiprack_slots[0]]
-    p300_slots = CANDIDATE_P300_SLOTS[
-        :p10_p300_tiprack_slots[1]]
-
     # Define labware
     p10_tipracks = [protocol.load_labware(P10_TIPRACK_TYPE, slot)
-                    for slot in p10_slots]
+                    for slot in p10_tiprack_slots]
     p300_tipracks = [protocol.load_labware(P300_TIPRACK_TYPE, slot)
-                    for slot in p300_slots]
+                    for slot in p300_tiprack_slots]
     p10_pipette = protocol.load_instrument('p10_single',
         P10_MOUNT, tip_racks=p10_tipracks)
     p300_pipette = protocol.load_instrument('p300_multi',
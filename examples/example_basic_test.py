@@ -6,6 +6,7 @@
 #  * @desc [description]
 #  */
 
+import logging
 import sys
 # Yes this is awful but it lets modules from sibling directories be imported  https://docs.python.org/3/tutorial/modules.html#the-module-search-path
 sys.path.insert(0,'../') # print('sys.path', sys.path)
@@ -22,6 +23,8 @@ from script_gen_pipeline.designs.construct import Construct
 from script_gen_pipeline.protocol.protocol import Basic
 
 if __name__ == "__main__":
+    # DEBUG shows the pipeline's diagnostics too
+    logging.basicConfig(level=logging.INFO)
 
     sbol_path_name = ""
     # sbol_input = sbol_path_name
@@ -1,8 +1,10 @@
 """Containers hold SeqRecords, Primers, Enzymes, etc."""
 
+import csv
+import io
 import math
 import string
-from typing import Dict, Iterable, List, Optional, Union, Tuple
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Union, Tuple
 from uuid import uuid4
 
 # from Bio.Restriction.Restriction import RestrictionType
@@ -12,12 +14,16 @@ from script_gen_pipeline.protocol.instructions import Instruction
 # from .primers import Primers
 from script_gen_pipeline.protocol.biochem_utils import Reagent, Species
 from script_gen_pipeline.designs.construct import Variant
+from script_gen_pipeline.labware.wells import COL_MAJOR, well_name
 
 Content = Union[Variant, Reagent, Species]
 """The content of a container can be a sequence, enzyme, or primers."""
 
 Primers = Union[List, Variant]
 
+CONTENT_RANKS: Dict[type, int] = {Variant: 0, Reagent: 1, Species: 2}
+"""Order of content types in a Layout, sequences first."""
+
 
 def content_id(content: Content) -> str:
     """Return a "unique" ID for each set of content.
@@ -35,7 +41,7 @@ def content_id(content: Content) -> str:
     if isinstance(content, Variant):
         if content.id != "<unknown id>":
             return content.short_id
-        return str(content.seq)
+        return _seq_id(content)
     # if isinstance(content, RestrictionType):
     #     return str(content)  # get enzyme cut seq
     # if isinstance(content, Primers):
@@ -47,6 +53,26 @@ def content_id(content: Content) -> str:
     raise TypeError(content)
 
 
+def _seq_id(content: Variant) -> str:
+    """The sequence of a content without an ID, as its ID.
+
+    Stringifying a long sequence is slow, so it is stored on the content
+    along with the sequence it came from, and recomputed if that changes.
+    """
+
+    seq = content.seq
+    cached = getattr(content, "_seq_id_cache", None)
+    if cached is not None and cached[0] is seq:
+        return cached[1]
+
+    cid = str(seq)
+    try:
+        content._seq_id_cache = (seq, cid)
+    except AttributeError:
+        pass  # eg. objects with __slots__, just recompute next time
+    return cid
+
+
 class Container:
     """A container with contents.
 
@@ -86,6 +112,12 @@ class Container:
         self.volumes = volumes if volumes else [-1] * len(self.contents)
         self.withdrawn = 0.0  # volume with withdraws during pipette sim
 
+        # content IDs of self.contents, built on first membership check
+        self._content_ids: Optional[Set[str]] = None
+        self._content_ids_of: Optional[List[Content]] = None
+        self._sort_key: Optional[Tuple[int, str]] = None
+        self._sort_key_of: Optional[List[Content]] = None
+
     def add(self, contents: Union[Content, List[Content]]):
         """Add more content to this container
 
@@ -97,6 +129,23 @@ class Container:
             self.contents.extend(contents)
         else:
             self.contents.append(contents)
+            contents = [contents]
+
+        self._sort_key = None
+        if self._content_ids is not None and self._content_ids_of is self.contents:
+            self._content_ids.update(content_id(c) for c in contents)
+
+    def content_ids(self) -> Set[str]:
+        """Return the set of content IDs in this container.
+
+        Kept up to date by add. Rebuilt if contents is reassigned (as
+        Fridge does), but not after mutating the contents list directly.
+        """
+
+        if self._content_ids is None or self._content_ids_of is not self.contents:
+            self._content_ids = {content_id(c) for c in self.contents}
+            self._content_ids_of = self.contents
+        return self._content_ids
 
     @classmethod
     def create(cls, contents: List[Content], **kwargs):
@@ -142,7 +191,7 @@ class Container:
     def __contains__(self, content: Content) -> bool:
         """Return whether the content is in this well."""
 
-        return content_id(content) in {content_id(c) for c in self.contents}
+        return content_id(content) in self.content_ids()
 
     def __iter__(self):
         """Iterate over the contents of the container."""
@@ -154,32 +203,39 @@ class Container:
 
         return self.contents[key]
 
-    def __lt__(self, other: "Container") -> bool:
-        """Return whether this container should come before the other."""
+    def sort_key(self) -> Tuple[int, str]:
+        """Return the key containers are ordered by: the rank of the
+        highest ranked content type (sequences, then reagents, then species)
+        and an ID made of the contents' IDs.
 
-        def min_rank_content(container: Container) -> int:
-            min_rank = 1000
-            for content in container:
-                if isinstance(content, SeqRecord):
-                    min_rank = min(0, min_rank)
-                elif isinstance(content, Reagent):
-                    min_rank = min(1, min_rank)
-                elif isinstance(content, Species):
-                    min_rank = min(2, min_rank)
-                elif isinstance(content, RestrictionType):
-                    min_rank = min(3, min_rank)
-            return min_rank
+        Computed once and cached until contents change through add or are
+        reassigned.
+        """
 
-        def container_id(container: Container) -> str:
-            container_records = [c for c in container if isinstance(c, SeqRecord)]
-            if container_records:
-                return "".join(content_id(c) for c in container_records)
-            return "".join(sorted(content_id(c) for c in container))
+        if self._sort_key is None or self._sort_key_of is not self.contents:
+            min_rank = 1000
+            records = []
+            for content in self.contents:
+                rank = CONTENT_RANKS.get(type(content))
+                if rank is None:
+                    rank = next((r for t, r in CONTENT_RANKS.items()
+                                 if isinstance(content, t)), 1000)
+                min_rank = min(rank, min_rank)
+                if rank == 0:
+                    records.append(content)
+
+            if records:
+                cid = "".join(content_id(c) for c in records)
+            else:
+                cid = "".join(sorted(content_id(c) for c in self.contents))
+            self._sort_key = (min_rank, cid)
+            self._sort_key_of = self.contents
+        return self._sort_key
 
-        if min_rank_content(self) < min_rank_content(other):
-            return True
+    def __lt__(self, other: "Container") -> bool:
+        """Return whether this container should come before the other."""
 
-        return container_id(self) < container_id(other)
+        return self.sort_key() < other.sort_key()
 
 
 class Well(Container):
@@ -264,26 +320,31 @@ class Layout:
         log_volume: bool = False,
         separate_reagents: bool = False,
     ):
-        self.containers = sorted(containers)
+        # keep order consistent, see Container.sort_key for sort method
+        self.containers = sorted(containers, key=Container.sort_key)
         self.existing_plates = existing_plates
         self.log_volume = log_volume
         self.separate_reagents = separate_reagents
 
-        def get_containers(containers: Optional[Iterable[Container]], ctype: type):
-            # keep order consistent, see Container.__lt__ for sort method
-            return sorted([c for c in (containers or []) if isinstance(c, ctype)])
-
-        # get reservoirs
-        src_reservoirs = get_containers(src_containers, Reservoir)
-        self.reservoirs = get_containers(self.containers, Reservoir)
-
-        # get the tubes
-        src_tubes = get_containers(src_containers, Tube)
-        self.tubes = get_containers(self.containers, Tube)
-
+        def split_containers(containers: List[Container]) -> Dict[type, List[Container]]:
+            # one pass over sorted containers, so each type stays sorted
+            by_type: Dict[type, List[Container]] = {Reservoir: [], Tube: [], Well: []}
+            for container in containers:
+                for ctype, of_type in by_type.items():
+                    if isinstance(container, ctype):
+                        of_type.append(container)
+                        break
+            return by_type
+
+        by_type = split_containers(self.containers)
+        self.reservoirs = by_type[Reservoir]
+        self.tubes = by_type[Tube]
         # only the wells go in plates
-        src_wells = get_containers(src_containers, Well)
-        self.wells = get_containers(self.containers, Well)
+        self.wells = by_type[Well]
+
+        src_wells = split_containers(
+            sorted(src_containers, key=Container.sort_key) if src_containers else []
+        )[Well]
 
         # pre-computed maps from container to plate name, well index, well name
         self.container_to_plate_name: Dict[Container, str] = {}
@@ -301,7 +362,6 @@ class Layout:
             dest_shift = (
                 self._plate_count(self.reservoirs, self.tubes, self.wells) * well_count
             )
-            src_wells = sorted(src_wells)
             self._set_well_meta(src_wells, 0)
         self._set_well_meta(self.wells, dest_shift)
 
@@ -332,11 +392,11 @@ class Layout:
         if not instruction.transfers:
             raise ValueError(f"instruction lacks transfers: {instruction}")
 
-        dest_wells = {t.dest for t in instruction.transfers}
+        dest_wells = instruction.transfers.dests()
         if src_containers:
             return cls(
                 dest_wells,
-                src_containers={t.src for t in instruction.transfers},
+                src_containers=instruction.transfers.srcs(),
                 existing_plates=existing_plates,
                 log_volume=log_volume,
                 separate_reagents=separate_reagents,
@@ -354,17 +414,32 @@ class Layout:
 
         If there are more wells than the max within a plate, multiple
         plates are returned within a row with the plate name to the top-left of each plate.
-        Each cells holds the ids of all well containers.
+        Each cells holds the ids of all well containers. Cells are written by
+        csv.writer, so ids with commas are quoted.
 
         Returns:
             A CSV representation of row of containers, usually wells in plates
         """
 
+        handle = io.StringIO()
+        self.write_csv(handle)
+        return handle.getvalue()
+
+    def write_csv(self, handle: TextIO, log_volume: Optional[bool] = None):
+        """Write self in CSV representation, as in to_csv, row by row to handle.
+
+        Args:
+            handle: the file to write to
+
+        Keyword Args:
+            log_volume: Whether to log each wells volume (default: {self.log_volume})
+        """
+
         if not self.wells:
-            return ""
+            return
 
         # initalize the cells with plates for the wells
-        cells = self._wells_to_cells()
+        cells = self._wells_to_cells(log_volume)
 
         if self.reservoirs:
             for i, reservoir in enumerate(self.reservoirs):
@@ -373,10 +448,8 @@ class Layout:
                 res_contents = "|".join(content_id(c) for c in reservoir)
                 cells[0] += ["", f"{res_name}", f"{res_contents}({res_volume})"]
 
-        plate_output = ""
-        for row in cells:
-            plate_output += ",".join(row) + "\n"
-        return plate_output + "\n"
+        csv.writer(handle, lineterminator="\n").writerows(cells)
+        handle.write("\n")
 
     def _set_well_meta(self, containers: List[Well], shift: int):
         """Save meta about a container: plate, well name and index."""
@@ -385,12 +458,7 @@ class Layout:
             return
 
         well = containers[0]
-        rows = well.rows
-        cols = well.cols
-
-        col_names = {n: str(n + 1) for n in range(cols + 1)}
-        row_names = string.ascii_uppercase[: rows + 1]
-        wells_per_plate = rows * cols
+        wells_per_plate = well.rows * well.cols
 
         def set_well_meta(wells: List[Well], well_shift: int):
             for i, container in enumerate(wells):
@@ -398,14 +466,13 @@ class Layout:
                 plate_index = math.floor(i / wells_per_plate)
                 plate_name = "Plate:" + str(plate_index + 1 + self.existing_plates)
 
-                well_index = i % wells_per_plate + 1  # 1-based well index: A2 == 2
-                row_name = row_names[i % rows]
-                col_name = col_names[math.floor(plate_index / rows)]
-                well_name = row_name + col_name
+                # wells fill down each column, 1-based well index: B1 == 2
+                well_index = i % wells_per_plate + 1
 
                 self.container_to_plate_name[container] = plate_name
                 self.container_to_well_index[container] = well_index
-                self.container_to_well_name[container] = well_name
+                self.container_to_well_name[container] = well_name(
+                    well_index - 1, wells_per_plate, COL_MAJOR)
 
         if self.separate_reagents:
             wells_reagents, wells_other = self._separate_reagents(containers)
@@ -417,13 +484,19 @@ class Layout:
         else:
             set_well_meta(containers, shift)
 
-    def _wells_to_cells(self) -> List[List[str]]:
+    def _wells_to_cells(self, log_volume: Optional[bool] = None) -> List[List[str]]:
         """Convert a list of wells to a list of list of strings for each well
 
+        Keyword Args:
+            log_volume: Whether to log each wells volume (default: {self.log_volume})
+
         Returns:
             A list of list of strings, each a cell in CSV worksheet
         """
 
+        if log_volume is None:
+            log_volume = self.log_volume
+
         well = self.wells[0]
         well_count = well.rows * well.cols
         rows = string.ascii_uppercase[: well.rows]
@@ -451,7 +524,7 @@ class Layout:
                 contents = "|".join(  # add contents to a well
                     [
                         content_id(c)
-                        if not self.log_volume
+                        if not log_volume
                         else content_id(c) + f"({round(container.volumes[k], 1)})"
                         for k, c in enumerate(container)
                     ]
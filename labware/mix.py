@@ -2,11 +2,13 @@
 
 import inspect
 import logging
-from typing import Dict, Iterable, List, Tuple, Set, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Set, Any
 
 from script_gen_pipeline.labware.containers import Content
 from script_gen_pipeline.protocol.biochem_utils import Reagent, Species
 
+logger = logging.getLogger(__name__)
+
 
 class Mix:
     """An assembly Mix to specify how Reagents/Species/SeqRecords should come together
@@ -55,68 +57,121 @@ class Mix:
         self.fill_with = fill_with
         self.fill_to = fill_to
 
-    def __call__(
-        self, contents: Iterable[Content]
-    ) -> Tuple[List[Content], List[float]]:
-        """Call Mix on a list of contents to generate container's contents/volumes
-
-        Figure out volume needed for each item in contents.
-        Return those contents plus the additional contents needed in the mix (self.mix)
-        Also return a second list with the volumes needed for each content in the
-        first returned list
-
-        Args:
-            contents: the contents of a well to add to a mix
-
-        Returns:
-            Tuple[List[Content], List[float]] -- list of container contents and
-                a list of volumes for each content item
-        """
+    @property
+    def mix(self) -> Dict[Any, float]:
+        return self._mix
+
+    @mix.setter
+    def mix(self, mix: Dict[Any, float]):
+        """Set the mix and reset the resolver compiled from it."""
+
+        self._mix = mix
+        self._class_keys = [t for t in mix.keys() if inspect.isclass(t)]
+        self._extras = [(c, v) for c, v in mix.items() if not inspect.isclass(c)]
+        self._type_to_key: Dict[type, Optional[type]] = {}
+
+    def _type_key(self, content_type: type) -> Optional[type]:
+        """Return the class key in the mix that content of this type falls
+        under, or None. Resolved once per type, then cached."""
+
+        try:
+            return self._type_to_key[content_type]
+        except KeyError:
+            pass
+
+        if content_type in self._mix:
+            # example is SeqRecord
+            key = content_type
+        else:
+            # example is RestrictionType class
+            key = next(
+                (t for t in self._class_keys if issubclass(content_type, t)), None
+            )
+        self._type_to_key[content_type] = key
+        return key
 
-        contents_out: List[Content] = []
-        volumes: List[float] = []
+    def _resolve(
+        self,
+        contents: Iterable[Content],
+        contents_out: List[Content],
+        volumes: List[float],
+    ):
+        """Append the contents and volumes of one container to the outputs."""
 
+        start = len(volumes)
         seen: Set[Any] = set()
 
         for content in contents:
             if (
                 isinstance(content, Reagent) or isinstance(content, Species)
-            ) and content in self.mix:
+            ) and content in self._mix:
                 # reagent was explicitly specified
                 contents_out.append(content)
-                volumes.append(self.mix[content])
+                volumes.append(self._mix[content])
                 seen.add(content)
-            elif type(content) in self.mix:
-                # example is SeqRecord
-                contents_out.append(content)
-                volumes.append(self.mix[type(content)])
-                seen.add(type(content))
-            elif any(
-                isinstance(content, t) for t in self.mix.keys() if inspect.isclass(t)
-            ):
-                # example is RestrictionType class
-                class_type = next(
-                    t
-                    for t in self.mix.keys()
-                    if inspect.isclass(t) and isinstance(content, t)
-                )
+                continue
+
+            key = self._type_key(type(content))
+            if key is not None:
                 contents_out.append(content)
-                volumes.append(self.mix[class_type])
-                seen.add(class_type)
+                volumes.append(self._mix[key])
+                seen.add(key)
             else:
-                logging.warning(f"Content {content} not found in mix")
+                logger.warning("Content %s not found in mix", content)
 
-        for content, volume in self.mix.items():
-            if content in seen or inspect.isclass(content):
+        for content, volume in self._extras:
+            if content in seen:
                 continue
 
             contents_out.append(content)
             volumes.append(volume)
 
         if self.fill_to and self.fill_with:
-            volume_total = sum(volumes)
+            volume_total = sum(volumes[start:])
             volume_remaining = max([self.fill_to - volume_total, 0.0])
             contents_out.append(self.fill_with)
             volumes.append(volume_remaining)
 
+    def batch(
+        self, contents_list: Iterable[Iterable[Content]]
+    ) -> Tuple[List[Content], List[float], List[int]]:
+        """Call Mix on the contents of many containers at once.
+
+        Args:
+            contents_list: the contents of each well to add to a mix
+
+        Returns:
+            Flat lists of all containers' contents and volumes, and offsets
+            where container i's contents/volumes are [offsets[i]:offsets[i + 1]]
+        """
+
+        contents_out: List[Content] = []
+        volumes: List[float] = []
+        offsets = [0]
+        for contents in contents_list:
+            self._resolve(contents, contents_out, volumes)
+            offsets.append(len(volumes))
+        return contents_out, volumes, offsets
+
+    def __call__(
+        self, contents: Iterable[Content]
+    ) -> Tuple[List[Content], List[float]]:
+        """Call Mix on a list of contents to generate container's contents/volumes
+
+        Figure out volume needed for each item in contents.
+        Return those contents plus the additional contents needed in the mix (self.mix)
+        Also return a second list with the volumes needed for each content in the
+        first returned list
+
+        Args:
+            contents: the contents of a well to add to a mix
+
+        Returns:
+            Tuple[List[Content], List[float]] -- list of container contents and
+                a list of volumes for each content item
+        """
+
+        contents_out: List[Content] = []
+        volumes: List[float] = []
+        self._resolve(contents, contents_out, volumes)
         return (contents_out, volumes)
@@ -0,0 +1,136 @@
+"""Well addresses: converting well names like 'B3' to and from indices.
+
+Indices are from 0 in row-major ('row': A1, A2 ... A12, B1) or
+column-major ('col': A1, B1 ... H1, A2) order, the order DNABot numbers
+its samples in. Lookup tables for each plate format and order are built
+once, on first use, so conversions are a table lookup whether for one
+well or, with well_names/well_indices, for whole arrays of them.
+"""
+
+import functools
+import re
+import string
+from typing import TYPE_CHECKING, Dict, Iterable, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PLATE_SHAPES: Dict[int, Tuple[int, int]] = {
+    24: (4, 6),
+    96: (8, 12),
+    384: (16, 24),
+    1536: (32, 48),
+}
+"""Rows and cols of each supported plate format, by number of wells."""
+
+ROW_MAJOR = "row"
+COL_MAJOR = "col"
+
+_WELL_NAME = re.compile(r"([A-Z]+)(\d+)$")
+
+
+def plate_shape(wells: int) -> Tuple[int, int]:
+    """Rows and cols of a plate format by its number of wells."""
+    try:
+        return PLATE_SHAPES[wells]
+    except KeyError:
+        raise ValueError(f"No {wells} well plate, expected one of {sorted(PLATE_SHAPES)}") from None
+
+
+def row_label(row: int) -> str:
+    """Letters of a plate row from 0: A to Z, then AA, AB.. (1536 wells)."""
+    label = string.ascii_uppercase[row % 26]
+    if row >= 26:
+        label = string.ascii_uppercase[row // 26 - 1] + label
+    return label
+
+
+def well_position(name: str) -> Tuple[int, int]:
+    """Row and column index of a well name, eg. 'B3' -> (1, 2)."""
+    match = _WELL_NAME.match(name)
+    if not match:
+        raise ValueError(f"Invalid well name {name!r}")
+    letters, col = match.groups()
+    row = string.ascii_uppercase.index(letters[-1])
+    if len(letters) > 1:
+        row += 26 * (string.ascii_uppercase.index(letters[0]) + 1)
+    return row, int(col) - 1
+
+
+@functools.lru_cache(maxsize=None)
+def _tables(wells: int, order: str) -> Tuple["np.ndarray", Dict[str, int]]:
+    """Names of a plate format's wells by index, and the reverse lookup."""
+    import numpy as np  # deferred, numpy is slow to import
+
+    rows, cols = plate_shape(wells)
+    if order == ROW_MAJOR:
+        positions = ((r, c) for r in range(rows) for c in range(cols))
+    elif order == COL_MAJOR:
+        positions = ((r, c) for c in range(cols) for r in range(rows))
+    else:
+        raise ValueError(f"Order must be {ROW_MAJOR!r} or {COL_MAJOR!r}, not {order!r}")
+
+    names = np.array([row_label(r) + str(c + 1) for r, c in positions])
+    names.flags.writeable = False
+    return names, {name: index for index, name in enumerate(names.tolist())}
+
+
+def well_name(index: int, wells: int = 96, order: str = ROW_MAJOR) -> str:
+    """Name of the well at an index, eg. 13 -> 'B2' (row-major, 96 wells)."""
+    if not 0 <= index < wells:
+        raise ValueError(f"No well {index} on a {wells} well plate")
+    return str(_tables(wells, order)[0][index])
+
+
+def well_index(name: str, wells: int = 96, order: str = ROW_MAJOR) -> int:
+    """Index of a well by name, eg. 'B2' -> 13 (row-major, 96 wells)."""
+    try:
+        return _tables(wells, order)[1][name]
+    except KeyError:
+        raise ValueError(f"No well {name} on a {wells} well plate") from None
+
+
+def well_names(indices: Iterable[int], wells: int = 96, order: str = ROW_MAJOR) -> "np.ndarray":
+    """Names of the wells at an array of indices."""
+    import numpy as np
+
+    indices = np.asarray(indices, dtype=np.intp)
+    if indices.size and (indices.min() < 0 or indices.max() >= wells):
+        raise ValueError(f"Well indices out of range of a {wells} well plate")
+    return _tables(wells, order)[0][indices]
+
+
+def well_indices(names: Iterable[str], wells: int = 96, order: str = ROW_MAJOR) -> "np.ndarray":
+    """Indices of an array of well names."""
+    import numpy as np
+
+    lookup = _tables(wells, order)[1]
+    try:
+        return np.fromiter((lookup[name] for name in names), dtype=np.intp)
+    except KeyError as error:
+        raise ValueError(f"No well {error.args[0]} on a {wells} well plate") from None
+
+
+def final_well(sample_number: int) -> str:
+    """Well of a DNABot sample number from 1, down each column of a
+    96 well plate, eg. 9 -> 'A2'. As in DNABot, numbers past 96 carry on
+    into columns 13 and up."""
+    if 0 < sample_number <= 96:
+        return well_name(sample_number - 1, order=COL_MAJOR)
+    if sample_number < 1:
+        raise ValueError(f"Sample numbers start from 1, not {sample_number}")
+    index = sample_number - 1
+    return string.ascii_uppercase[index % 8] + str(index // 8 + 1)
+
+
+def final_wells(sample_numbers: Iterable[int]) -> "np.ndarray":
+    """Wells of an array of DNABot sample numbers, see final_well."""
+    import numpy as np
+
+    indices = np.asarray(sample_numbers, dtype=np.intp) - 1
+    if not indices.size or indices.max() < 96:
+        return well_names(indices, order=COL_MAJOR)
+    if indices.min() < 0:
+        raise ValueError("Sample numbers start from 1")
+    rows = np.array(list(string.ascii_uppercase[:8]))
+    return np.char.add(rows[indices % 8], (indices // 8 + 1).astype(str))
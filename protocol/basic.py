@@ -1,9 +1,7 @@
 """BASIC assembly design process and steps."""
 
-from collections import defaultdict
+from collections import Counter, defaultdict
 from typing import Dict, List, Set, Tuple, Iterable, Optional
-import pandas as pd
-import numpy as np
 
 #from Bio.Restriction.Restriction import RestrictionType
 #from Bio.Restriction import BsaI
@@ -12,15 +10,18 @@ import numpy as np
 #from synbio.containers import Container, Well
 #from synbio.designs import Design
 #from synbio.instructions import Temperature
-from synbio.reagents import Reagent
+#from synbio.reagents import Reagent
 #from synbio.steps import Setup, Pipette, ThermoCycle, HeatShock
 #from synbio.protocol import Protocol
 
 from script_gen_pipeline.protocol.instructions import Instruction, instr_to_txt, Temperature
-from script_gen_pipeline.labware.containers import Container, Fridge, Well, Plate
+from script_gen_pipeline.labware.containers import Container, Fridge, Well
 from script_gen_pipeline.labware.mix import Mix
+from script_gen_pipeline.labware.wells import final_well, final_wells
 from script_gen_pipeline.designs.construct import Construct, Module, Part
-from script_gen_pipeline.protocol.protocol import Protocol, Step, Subprotocol
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+from script_gen_pipeline.protocol.protocol import Protocol, Step, Subprotocol, Plate
+from script_gen_pipeline.protocol import profiling
 
 # Constant floats/ints - from DNABot - move to parameters?
 CLIP_DEAD_VOL = 60
@@ -38,6 +39,14 @@ DEFAULT_PART_VOL = 1
 MAX_SOURCE_PLATES = 6
 SOURCE_VOL = 15 # dead vol of 10-15 uL recommended for each part/linker
 
+DEFAULT_PARAMETERS = {
+    'SPOTTING_VOLS_DICT': {2: 5, 3: 5, 4: 5, 5: 5, 6: 5, 7: 5},
+    'SOURCE_DECK_POS': ['2', '5', '8', '7', '10', '11'],
+    'ethanol_well_for_stage_2': "A11",
+    'multichannel': False,
+}
+""" Parameters of a BASIC run, see Basic and batches.generate_batches """
+
 CLIP_OUT_PATH = '1_clip.ot2.py'
 MAGBEAD_OUT_PATH = '2_purification.ot2.py'
 F_ASSEMBLY_OUT_PATH = '3_assembly.ot2.py'
@@ -65,36 +74,43 @@ class Basic(Protocol):
         each part and a backbone. Sites are cut using BsaI restriction enzyme. 
 
         Inspired by synbio and DNABot. 
+
+        Works from Construct objects that fit one deck. Designs read from
+        a constructs csv, of any size, are split into deck-sized batches
+        and scripted by batches.generate_batches instead.
     """
     
     def __init__(self, 
-        constructs: List[Construct] = [Construct()],
+        constructs: List[Construct] = None,
         name: str = "",
         #source_wells: Dict[str] = [], 
     ):
-        super().__init__(name=name, constructs=constructs)
+        super().__init__(constructs=constructs)
+        self.name = name
         self.mix = basic_mix
         #self.source_wells = source_wells
-        self.parameters = {
-            'SPOTTING_VOLS_DICT': {2: 5, 3: 5, 4: 5, 5: 5, 6: 5, 7: 5},
-            'SOURCE_DECK_POS': ['2', '5', '8', '7', '10', '11'],
-            'ethanol_well_for_stage_2': "A11"
-        }
+        self.parameters = dict(DEFAULT_PARAMETERS)
         self.scripts = [CLIP_OUT_PATH, MAGBEAD_OUT_PATH, F_ASSEMBLY_OUT_PATH, TRANS_SPOT_OUT_PATH]
-        self.subprotocols = [Subprotocol(str(script), script, self.constructs, self.parameters) for script in self.scripts]
+        self.subprotocols = [Subprotocol(str(script), self.parameters) for script in self.scripts]
 
     def run(self):
-        self.clips_df, self.master_mix, self.constructs_list = self._create_clips_df()
-        self.source_plate, self.source_info = self._create_source_plate()
-        self.mixed_wells = self._create_mixed_wells()
-        self.final_assembly_dict = self._gen_final_assembly_dict()
+        with profiling.span("create_clips_df", count=len(self.constructs)) as span:
+            self.clips_df, self.master_mix, self.constructs_list = self._create_clips_df()
+            span.count = len(self.clips_df.index)
+        with profiling.span("create_source_plate"):
+            self.source_plate, self.source_info = self._create_source_plate()
+        with profiling.span("create_mixed_wells"):
+            self.mixed_wells = self._create_mixed_wells()
+        with profiling.span("gen_final_assembly_dict", count=len(self.constructs)):
+            self.final_assembly_dict = self._gen_final_assembly_dict()
 
         # clip reaction subprotocol
         # purification subprotocol
         # assembly subprotocol
         # transformation subprotocol
         for subprotocol in self.subprotocols:
-            self = subprotocol(self)
+            with profiling.span(subprotocol.name, "subprotocol"):
+                self = subprotocol(self)
             self.history.append(subprotocol)
             self.generate_ot_script(self, assay, template_script)
             raise NotImplementedError
@@ -113,58 +129,44 @@ class Basic(Protocol):
                 else:
                     suffix_linker = construct.modules[index + 1]
                     clips_info['suffixes'].append(suffix_linker)
+        import pandas as pd  # deferred, pandas is slow to import
+
         clips_info_df = pd.DataFrame.from_dict(clips_info)
         return clips_info_df
     
     def _get_final_well(self, sample_number):
         """Determines well containing the final sample from sample number.
         """
-        letter = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
-        final_well_column = sample_number // 8 + \
-            (1 if sample_number % 8 > 0 else 0)
-        final_well_row = letter[sample_number - (final_well_column - 1) * 8 - 1]
-        return final_well_row + str(final_well_column)
+        return final_well(sample_number)
 
     def _create_clips_df(self):
+        import pandas as pd  # deferred, pandas is slow to import
+
         constructs_list = []
         for construct in self.constructs:
             constructs_list.append(self._get_construct_modules(construct))
 
         merged_construct_dfs = pd.concat(constructs_list, ignore_index=True)
-        unique_clips_df = merged_construct_dfs.drop_duplicates()
-        unique_clips_df = unique_clips_df.reset_index(drop=True)
-        clips_df = unique_clips_df.copy()
+
+        # Count number of each CLIP reaction in one pass keyed on
+        # (prefix, part, suffix). Counter keeps first-seen order, which is
+        # the same order drop_duplicates() gave
+        clip_count = Counter(zip(merged_construct_dfs['prefixes'],
+                                 merged_construct_dfs['parts'],
+                                 merged_construct_dfs['suffixes']))
+        clips_df = pd.DataFrame(list(clip_count.keys()),
+                                columns=['prefixes', 'parts', 'suffixes'])
 
         # Error
-        if len(unique_clips_df.index) > MAX_CLIPS:
+        if len(clips_df.index) > MAX_CLIPS:
             raise ValueError(
                 'Number of CLIP reactions exceeds 48.')
 
-        # Count number of each CLIP reaction
-        clip_count = np.zeros(len(clips_df.index))
-        for i, unique_clip in unique_clips_df.iterrows():
-            for _, clip in merged_construct_dfs.iterrows():
-                if unique_clip.equals(clip):
-                    clip_count[i] = clip_count[i] + 1
-        clip_count = clip_count // FINAL_ASSEMBLIES_PER_CLIP + 1
-        clips_df['number'] = [int(i) for i in clip_count.tolist()]
+        clips_df['number'] = [count // FINAL_ASSEMBLIES_PER_CLIP + 1
+                              for count in clip_count.values()]
 
         # Associate well/s for each CLIP reaction
-        clips_df['mag_well'] = pd.Series(['0'] * len(clips_df.index),
-                                        index=clips_df.index)
-        for index, number in clips_df['number'].iteritems():
-            if index == 0:
-                mag_wells = []
-                for x in range(number):
-                    mag_wells.append(self._get_final_well(x + 1 + 48))
-                clips_df.at[index, 'mag_well'] = tuple(mag_wells)
-            else:
-                mag_wells = []
-                for x in range(number):
-                    well_count = clips_df.loc[
-                        :index - 1, 'number'].sum() + x + 1 + 48
-                    mag_wells.append(self._get_final_well(well_count))
-                clips_df.at[index, 'mag_well'] = tuple(mag_wells)
+        clips_df['mag_well'] = self._create_mag_wells(clips_df)
 
         multiple = (clips_df['number'].sum())*CLIP_DEAD_VOL/CLIP_VOL
         # in future mutiple = (clips_df['number'].sum())*CLIP_DEAD_VOL/CLIP_VOL
@@ -188,27 +190,34 @@ class Basic(Protocol):
                     modules_list.append(module)
                     well_contents, well_volumes = source_mix(module)
                     well = Well(well_contents, well_volumes)
-                    indx = source_plate.add_wells(well)
+                    indx = source_plate.add_well(well)
                     source_info['modules'].append(module)
                     source_info['well_index'].append(indx)
                     source_info['well'].append(well)
         return source_plate, source_info
 
+    def _index_clips(self, clips_df) -> Dict[Tuple, int]:
+        """Map each (prefix, part, suffix) key to its row in clips_df."""
+        return {clip: row for row, clip in enumerate(zip(
+            clips_df['prefixes'], clips_df['parts'], clips_df['suffixes']))}
+
     def _gen_final_assembly_dict(self):
+        import numpy as np  # deferred, numpy is slow to import
+
         # mapping of mag_wells to final assembly wells
         final_assembly_dict = {}
-        clips_count = np.zeros(len(self.clips_df.index))
+        # built once, each clip lookup below is then a single dict hit
+        clip_index = self._index_clips(self.clips_df)
+        mag_wells = list(self.clips_df['mag_well'])
+        clips_count = np.zeros(len(self.clips_df.index), dtype=int)
         for construct_index, construct_df in enumerate(self.constructs_list):
             construct_well_list = []
-            for _, clip in construct_df.iterrows():
-                clip_info = self.clips_df[(self.clips_df['prefixes'] == clip['prefixes']) &
-                                    (self.clips_df['parts'] == clip['parts']) &
-                                    (self.clips_df['suffixes'] == clip['suffixes'])]
-                clip_wells = clip_info.at[clip_info.index[0], 'mag_well']
-                clip_num = int(clip_info.index[0])
-                clip_well = clip_wells[int(clips_count[clip_num] //
-                                        FINAL_ASSEMBLIES_PER_CLIP)]
-                clips_count[clip_num] = clips_count[clip_num] + 1
+            for clip in zip(construct_df['prefixes'], construct_df['parts'],
+                            construct_df['suffixes']):
+                clip_num = clip_index[clip]
+                clip_well = mag_wells[clip_num][clips_count[clip_num] //
+                                                FINAL_ASSEMBLIES_PER_CLIP]
+                clips_count[clip_num] += 1
                 construct_well_list.append(clip_well)
             final_assembly_dict[self._get_final_well(
                 construct_index + 1)] = construct_well_list
@@ -218,25 +227,33 @@ class Basic(Protocol):
         # clips_df -> Plate, use basic_mix
         
         mixed_wells = Plate()
+        contents, volumes, offsets = self.mix.batch(
+            [clip_info['prefixes'], clip_info['parts'], clip_info['suffixes']]
+            for _, clip_info in self.clip_df.iterrows())
         for clip_index, clip_info in self.clip_df.iterrows():
-            modules = []
-            modules.append(clip_info['prefixes'])
-            modules.append(clip_info['parts'])
-            modules.append(clip_info['suffixes'])
-            well_contents, well_volumes = self.mix(modules)
+            start, end = offsets[clip_index], offsets[clip_index + 1]
+            well_contents, well_volumes = contents[start:end], volumes[start:end]
             wells = []
             well_indices = []
             for x in range(clip_info['number']):
                 well = Well(well_contents, well_volumes)
                 wells.append(well)
-                indx = mixed_wells.add_wells(well)
+                indx = mixed_wells.add_well(well)
                 well_indices.append(indx)
             self.clip_df.insert(clip_index, 'well', well)
             self.clip_df.insert(clip_index, 'well_index', indx)
         return mixed_wells
 
-    def _create_mag_wells(self):
-        # need to modify _get_final_well() and add_wells() to do this
+    def _create_mag_wells(self, clips_df) -> List[Tuple[str, ...]]:
+        """Magbead plate wells of each CLIP reaction, from well 49 on.
+
+        The first well of each CLIP is offset by the number of wells taken
+        by the CLIPs before it.
+        """
+        offsets = clips_df['number'].cumsum() - clips_df['number']
+        mag_wells = final_wells(range(49, 49 + clips_df['number'].sum())).tolist()
+        return [tuple(mag_wells[offset:offset + number])
+                for offset, number in zip(offsets, clips_df['number'])]
 
             
 
@@ -0,0 +1,391 @@
+"""Splitting BASIC designs that exceed one deck into deck-sized batches.
+
+A single run of the four BASIC scripts (see basic_steps) is limited to
+MAX_CONSTRUCTS final assemblies and MAX_CLIPS CLIP reactions. Designs
+larger than that are planned into batches that each fit those limits, and
+the scripts for every batch are generated in parallel, one directory per
+batch plus a manifest describing the whole campaign.
+
+generate_batches is the entry point for designs given as a constructs
+csv, next to Basic, which works from Construct objects that fit one deck.
+Both take the same parameters, see basic.DEFAULT_PARAMETERS.
+"""
+
+import csv
+import json
+import os
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
+
+from script_gen_pipeline.protocol.basic import (
+    CLIP_VOL, T4_BUFF_VOL, BSAI_VOL, T4_LIG_VOL, CLIP_MAST_WATER,
+    PART_PER_CLIP, MIN_VOL, DEFAULT_PART_VOL, DEFAULT_PARAMETERS)
+from script_gen_pipeline.protocol.protocol import (
+    CLIP_OUT_PATH, MAGBEAD_OUT_PATH, F_ASSEMBLY_OUT_PATH, TRANS_SPOT_OUT_PATH,
+    basic_steps, MAX_CONSTRUCTS, MAX_CLIPS, FINAL_ASSEMBLIES_PER_CLIP,
+    iter_construct_clips)
+from script_gen_pipeline.labware.wells import final_wells
+from script_gen_pipeline.protocol.multichannel import MultiChannelPlan, plan_basic
+from script_gen_pipeline.protocol.templates import TEMPLATE_DIR, render_script
+from script_gen_pipeline.protocol.timing import estimate_run
+from script_gen_pipeline.protocol.tips import (
+    assembly_tips, clip_tips, purification_tips, transformation_tips)
+
+Clip = Tuple[str, str, str]
+"""A CLIP reaction as (prefix linker, part, suffix linker)."""
+
+MANIFEST_NAME = 'manifest.json'
+MULTICHANNEL_NAME = 'multichannel.json'
+
+BASIC_TEMPLATES = {
+    CLIP_OUT_PATH: 'clip_template.py',
+    MAGBEAD_OUT_PATH: 'purification_template.py',
+    F_ASSEMBLY_OUT_PATH: 'assembly_template.py',
+    TRANS_SPOT_OUT_PATH: 'transformation_template.py',
+}
+"""Template script used for each of the BASIC output scripts."""
+
+
+def with_defaults(parameters: Dict = None) -> Dict:
+    """Parameters given, with DEFAULT_PARAMETERS for any left out."""
+    return {**DEFAULT_PARAMETERS, **(parameters or {})}
+
+
+class Batch:
+    """The constructs of one deck-sized run.
+
+    Attributes:
+        index: position of this batch in the campaign, from 0
+        constructs: CLIP reactions of each construct in this batch
+        clip_counts: number of constructs using each unique CLIP,
+            in first-seen order
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        self.constructs: List[List[Clip]] = []
+        self.clip_counts: Counter = Counter()
+
+    @property
+    def reactions(self) -> int:
+        """Number of CLIP reaction wells this batch needs."""
+        return sum(clip_reactions(count) for count in self.clip_counts.values())
+
+    def __len__(self):
+        return len(self.constructs)
+
+    def __repr__(self):
+        return f"Batch {self.index}: {len(self)} constructs, {self.reactions} CLIPs"
+
+
+def clip_reactions(count: int) -> int:
+    """Number of CLIP reactions needed for count final assemblies."""
+    return count // FINAL_ASSEMBLIES_PER_CLIP + 1
+
+
+def plan_batches(
+    constructs: Iterable[List[Clip]],
+    max_constructs: int = MAX_CONSTRUCTS,
+    max_clips: int = MAX_CLIPS,
+) -> Iterator[Batch]:
+    """Greedily split constructs, in order, into deck-sized batches.
+
+    A construct joins the current batch unless that would push it past
+    max_constructs final assemblies or max_clips CLIP reactions. Each
+    batch is yielded once it is full and then dropped, so with a lazy
+    constructs iterable only one batch is held at a time.
+
+    Args:
+        constructs: CLIP reactions of each construct, eg. iter_construct_clips
+        max_constructs: final assemblies per deck
+        max_clips: CLIP reactions (magbead samples) per deck
+
+    Yields:
+        The batches, each fitting on one deck
+    """
+
+    batch = Batch(0)
+    reactions = 0
+    for construct in constructs:
+        added = Counter(construct)
+        extra = sum(
+            clip_reactions(batch.clip_counts[clip] + count)
+            - (clip_reactions(batch.clip_counts[clip]) if clip in batch.clip_counts else 0)
+            for clip, count in added.items())
+
+        if batch.constructs and (
+                len(batch) >= max_constructs or reactions + extra > max_clips):
+            yield batch
+            batch = Batch(batch.index + 1)
+            reactions = 0
+            extra = sum(clip_reactions(count) for count in added.values())
+
+        if extra > max_clips:
+            raise ValueError(
+                f'A single construct needs {extra} CLIP reactions, more than the {max_clips} that fit on a deck.')
+
+        batch.constructs.append(construct)
+        batch.clip_counts.update(added)
+        reactions += extra
+
+    if batch.constructs:
+        yield batch
+
+
+def generate_sources_dict(paths: List[str], source_deck_pos: List[str]) -> Dict[str, Tuple]:
+    """Imports csvs files containing a series of parts/linkers with
+    corresponding information into a dictionary where the key corresponds with
+    part/linker and the value is a (well, concentration, deck position) tuple.
+
+    Args:
+        paths: sources csv files, one per source plate
+        source_deck_pos: deck slot of each source plate
+    """
+    sources_dict = {}
+    for deck_index, path in enumerate(paths):
+        with open(path, 'r') as csvfile:
+            csv_reader = csv.reader(csvfile)
+            for index, source in enumerate(csv_reader):
+                if index != 0:
+                    well = source[1]
+                    concentration = source[2] if len(source) > 2 else ''
+                    sources_dict[str(source[0])] = (
+                        well, concentration, source_deck_pos[deck_index])
+    return sources_dict
+
+
+def generate_clips_dict(batch: Batch, sources_dict: Dict[str, Tuple]) -> Dict[str, List]:
+    """Returns the clips_dict for 'clip_template.py', one entry per CLIP
+    reaction well, from the unique CLIPs of a batch."""
+
+    max_part_vol = CLIP_VOL - (T4_BUFF_VOL + BSAI_VOL + T4_LIG_VOL
+                               + CLIP_MAST_WATER + 2)
+    clips_dict = {'prefixes_wells': [], 'prefixes_plates': [],
+                  'suffixes_wells': [], 'suffixes_plates': [],
+                  'parts_wells': [], 'parts_plates': [], 'parts_vols': [],
+                  'water_vols': []}
+
+    for (prefix, part, suffix), count in batch.clip_counts.items():
+        number = clip_reactions(count)
+        try:
+            prefix_well, _, prefix_plate = sources_dict[prefix]
+            suffix_well, _, suffix_plate = sources_dict[suffix]
+            part_well, concentration, part_plate = sources_dict[part]
+        except KeyError as error:
+            raise KeyError(f'{error} not listed in the sources csvs') from None
+
+        if not concentration:
+            part_vol = DEFAULT_PART_VOL
+        else:
+            part_vol = round(PART_PER_CLIP / float(concentration), 1)
+            part_vol = min(max(part_vol, MIN_VOL), max_part_vol)
+
+        clips_dict['prefixes_wells'] += [prefix_well] * number
+        clips_dict['prefixes_plates'] += [prefix_plate] * number
+        clips_dict['suffixes_wells'] += [suffix_well] * number
+        clips_dict['suffixes_plates'] += [suffix_plate] * number
+        clips_dict['parts_wells'] += [part_well] * number
+        clips_dict['parts_plates'] += [part_plate] * number
+        clips_dict['parts_vols'] += [part_vol] * number
+        clips_dict['water_vols'] += [max_part_vol - part_vol] * number
+    return clips_dict
+
+
+def generate_final_assembly_dict(batch: Batch) -> Dict[str, List[str]]:
+    """Map each final assembly well to the magbead wells of its CLIPs.
+    CLIP reaction wells follow the first 48 wells, in first-seen order."""
+
+    numbers = [clip_reactions(count) for count in batch.clip_counts.values()]
+    mag_names = final_wells(range(49, 49 + sum(numbers))).tolist()
+    mag_wells: Dict[Clip, List[str]] = {}
+    offset = 0
+    for clip, number in zip(batch.clip_counts, numbers):
+        mag_wells[clip] = mag_names[offset:offset + number]
+        offset += number
+
+    final_wells_list = final_wells(range(1, len(batch.constructs) + 1)).tolist()
+    final_assembly_dict = {}
+    clips_count: Counter = Counter()
+    for construct_index, construct in enumerate(batch.constructs):
+        construct_well_list = []
+        for clip in construct:
+            construct_well_list.append(
+                mag_wells[clip][clips_count[clip] // FINAL_ASSEMBLIES_PER_CLIP])
+            clips_count[clip] += 1
+        final_assembly_dict[final_wells_list[construct_index]] = construct_well_list
+    return final_assembly_dict
+
+
+def generate_spotting_tuples(batch: Batch, spotting_vols_dict: Dict[int, float],
+                             order: List[int] = None) -> List[Tuple]:
+    """Generates a spotting tuple (see 'transformation_template.py') for
+    every column of constructs, with the 1st construct in well A1.
+    Spotting volumes are looked up by the construct's part number.
+
+    Args:
+        order: construct in each final assembly well, if reordered
+    """
+    wells = final_wells(range(1, len(batch) + 1)).tolist()
+    constructs = batch.constructs if order is None else [batch.constructs[x] for x in order]
+    vols = [spotting_vols_dict[len(construct)] for construct in constructs]
+
+    spotting_tuples = []
+    for x in range(0, len(wells), 8):
+        tuple_wells = tuple(wells[x:x + 8])
+        spotting_tuples.append((tuple_wells, tuple_wells, tuple(vols[x:x + 8])))
+    return spotting_tuples
+
+
+def batch_plans(batch: Batch, sources_dict: Dict[str, Tuple]
+                ) -> Tuple[MultiChannelPlan, MultiChannelPlan]:
+    """Column-aligned CLIP and final assembly plans of a batch, see
+    multichannel.plan_basic."""
+    return plan_basic(generate_clips_dict(batch, sources_dict),
+                      generate_final_assembly_dict(batch))
+
+
+def batch_kwargs(batch: Batch, sources_dict: Dict[str, Tuple],
+                 parameters: Dict = None,
+                 plans: Tuple[MultiChannelPlan, MultiChannelPlan] = None) -> Dict[str, Dict]:
+    """Keyword arguments injected into each BASIC script for this batch,
+    keyed by output script name.
+
+    Args:
+        plans: if given (see batch_plans), use their layouts, and have the
+            CLIP and assembly scripts make their transfers with a p10_multi
+            where planned
+    """
+
+    parameters = with_defaults(parameters)
+    if plans:
+        clip_plan, assembly_plan = plans
+        clips_dict = clip_plan.layout
+        final_assembly_dict = assembly_plan.layout
+        order = assembly_plan.order
+        clip_transfers = clip_plan.transfers
+        assembly_transfers = assembly_plan.transfers
+    else:
+        clips_dict = generate_clips_dict(batch, sources_dict)
+        final_assembly_dict = generate_final_assembly_dict(batch)
+        order = clip_transfers = assembly_transfers = None
+    sample_number = len(clips_dict['parts_wells'])
+    spotting_tuples = generate_spotting_tuples(batch, parameters['SPOTTING_VOLS_DICT'], order)
+    # Tipracks are loaded in the slots the simulated pick-ups use, raising
+    # ValueError here, not on the robot, if they run out of slots
+    transformation_racks = transformation_tips(spotting_tuples)
+    return {
+        CLIP_OUT_PATH: {
+            'clips_dict': clips_dict,
+            'tiprack_slots': clip_tips(clips_dict, transfers=clip_transfers).slots,
+            'multichannel_transfers': clip_plan.to_dict() if plans else None},
+        MAGBEAD_OUT_PATH: {
+            'sample_number': sample_number,
+            'ethanol_well': parameters['ethanol_well_for_stage_2'],
+            'tiprack_slots': purification_tips(sample_number).slots},
+        F_ASSEMBLY_OUT_PATH: {
+            'final_assembly_dict': final_assembly_dict,
+            'tiprack_slots': assembly_tips(
+                final_assembly_dict, transfers=assembly_transfers).slots,
+            'multichannel_transfers': assembly_plan.to_dict() if plans else None},
+        TRANS_SPOT_OUT_PATH: {
+            'spotting_tuples': spotting_tuples,
+            'soc_well': "A1",
+            'p10_tiprack_slots': transformation_racks['p10'].slots,
+            'p300_tiprack_slots': transformation_racks['p300'].slots},
+    }
+
+
+def generate_batch(batch: Batch, sources_dict: Dict[str, Tuple],
+                   out_dir: str, parameters: Dict = None) -> Dict:
+    """Write the BASIC scripts of one batch into its own directory.
+
+    Returns:
+        The manifest entry of this batch
+    """
+
+    parameters = with_defaults(parameters)
+    batch_dir = os.path.join(out_dir, f'batch_{batch.index + 1:03d}')
+    os.makedirs(batch_dir, exist_ok=True)
+
+    plans = batch_plans(batch, sources_dict) if parameters.get('multichannel') else None
+    kwargs_by_script = batch_kwargs(batch, sources_dict, parameters, plans)
+    scripts = []
+    for script, kwargs in kwargs_by_script.items():
+        template_path = os.path.join(TEMPLATE_DIR, BASIC_TEMPLATES[script])
+        render_script(os.path.join(batch_dir, script), template_path, **kwargs)
+        scripts.append(script)
+
+    estimate = estimate_run(kwargs_by_script)
+    entry = {
+        'batch': batch.index + 1,
+        'directory': os.path.relpath(batch_dir, out_dir),
+        'constructs': len(batch),
+        'clip_reactions': len(plans[0].order) if plans else batch.reactions,
+        'unique_clips': len(batch.clip_counts),
+        'scripts': scripts,
+        'estimate': dict(estimate.to_dict(),
+                         constructs_per_hour=estimate.constructs_per_hour(len(batch))),
+    }
+    if plans:
+        # The plans are rendered into the scripts, this is a record of them
+        with open(os.path.join(batch_dir, MULTICHANNEL_NAME), 'w') as plan_file:
+            json.dump({step: plan.to_dict()
+                       for step, plan in zip((CLIP_OUT_PATH, F_ASSEMBLY_OUT_PATH), plans)},
+                      plan_file, indent=2)
+        entry['pipetting_steps'] = {
+            CLIP_OUT_PATH: {'single_channel': 3 * batch.reactions,
+                            'multi_channel': plans[0].steps},
+            F_ASSEMBLY_OUT_PATH: {'single_channel': sum(map(len, batch.constructs)),
+                                  'multi_channel': plans[1].steps}}
+    return entry
+
+
+def generate_batches(
+    construct_path: str,
+    sources_paths: List[str],
+    out_dir: str,
+    parameters: Dict = None,
+    max_workers: int = None,
+) -> Dict:
+    """Plan a design into deck-sized batches and generate the BASIC scripts
+    of all batches in parallel across a process pool.
+
+    Args:
+        construct_path: constructs csv, as for DNAbot
+        sources_paths: part/linker csvs, one per source plate
+        out_dir: directory that gets one sub-directory per batch and the manifest
+        parameters: see DEFAULT_PARAMETERS, any left out take their default
+        max_workers: size of the process pool (default: number of CPUs)
+
+    Returns:
+        The manifest, also written to out_dir/manifest.json
+    """
+
+    parameters = with_defaults(parameters)
+    sources_dict = generate_sources_dict(
+        sources_paths, parameters['SOURCE_DECK_POS'])
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Batches are read from the csv as workers free up, so only a few
+    # per worker are held, however large the design
+    window = 2 * (max_workers or os.cpu_count() or 1)
+    entries: List[Dict] = []
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for batch in plan_batches(iter_construct_clips(construct_path)):
+            if len(pending) >= window:
+                entries.append(pending.popleft().result())
+            pending.append(executor.submit(
+                generate_batch, batch, sources_dict, out_dir, parameters))
+        entries.extend(future.result() for future in pending)
+
+    manifest = {
+        'constructs': construct_path,
+        'sources': sources_paths,
+        'scripts': basic_steps,
+        'batches': entries,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
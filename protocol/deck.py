@@ -0,0 +1,225 @@
+"""Assigning labware and modules to OT-2 deck slots, over as many runs as needed.
+
+The OT-2 deck has 12 slots, numbered from the front left, with the fixed
+trash in slot 12:
+
+    10  11  12
+     7   8   9
+     4   5   6
+     1   2   3
+
+Modules go in set slots (the magnetic module in slot 1 and the
+temperature module in slot 4, as in the BASIC templates) and labware can
+be limited to some slots, eg. source plates to SOURCE_DECK_POS. Labware
+needed on every run (modules, tipracks, reagent tube racks) is placed
+first, then the rest, eg. the plates of a large design, fills the free
+slots. When a deck is full the remaining labware spills into further
+runs. Each run takes as much as can be fitted, moving labware between
+its allowed slots to make room, so a campaign needs the fewest runs.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+DECK_SLOTS = [str(n) for n in range(1, 13)]
+TRASH_SLOT = '12'
+
+MODULE_SLOTS = {'magdeck': '1', 'tempdeck': '4'}
+"""Default slot of each module, override with 'MAGDECK_SLOT'/'TEMPDECK_SLOT' parameters."""
+
+PLATE = 'plate'
+TIPRACK = 'tiprack'
+TUBE_RACK = 'tube_rack'
+MODULE = 'module'
+
+
+class Labware:
+    """Something that takes up a deck slot, or sits on a module.
+
+    Attributes:
+        name: unique name, eg. 'Plate:1' or 'magdeck'
+        kind: PLATE, TIPRACK, TUBE_RACK or MODULE
+        slots: slots it may go in (default: {any free slot})
+        every_run: needed on every run, rather than placed on one run
+        on: name of the module it sits on, sharing the module's slot
+        content: what it stands for, eg. a Plate
+    """
+
+    def __init__(self, name: str, kind: str = PLATE, slots: Sequence[str] = None,
+                 every_run: bool = False, on: str = None, content: Any = None):
+        self.name = name
+        self.kind = kind
+        self.slots = [str(slot) for slot in slots] if slots else []
+        self.every_run = every_run or kind == MODULE
+        self.on = on
+        self.content = content
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.kind!r})"
+
+
+class DeckMap:
+    """The labware in each slot of the deck for one run.
+
+    Attributes:
+        run: index of the run, from 0
+        slots: labware in each slot, bottom up (a module, then what sits on it)
+    """
+
+    def __init__(self, run: int, slots: Dict[str, List[Labware]]):
+        self.run = run
+        self.slots = slots
+
+    def free(self) -> List[str]:
+        """Slots with nothing in them."""
+        return [slot for slot, stack in self.slots.items() if not stack]
+
+    def labware(self, kind: str = None) -> List[Labware]:
+        """Labware on this deck, of a kind if given, by slot."""
+        return [item for stack in self.slots.values() for item in stack
+                if kind is None or item.kind == kind]
+
+    def slot_of(self, name: str) -> Optional[str]:
+        """Slot holding the named labware, None if it is not on this deck."""
+        for slot, stack in self.slots.items():
+            if any(item.name == name for item in stack):
+                return slot
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            'run': self.run,
+            'slots': {slot: [item.name for item in stack] for slot, stack in self.slots.items()},
+        }
+
+    def __str__(self):
+        width = max([len(' / '.join(item.name for item in stack)) for stack in self.slots.values()] + [5])
+        lines = [f"Run {self.run + 1}"]
+        for row in range(9, -1, -3):  # back row first, as seen from the front
+            cells = []
+            for slot in DECK_SLOTS[row:row + 3]:
+                if slot == TRASH_SLOT:
+                    text = 'trash'
+                else:
+                    text = ' / '.join(item.name for item in self.slots.get(slot, [])) or '-'
+                cells.append(f"{slot:>2} {text:<{width}}")
+            lines.append('  '.join(cells))
+        return '\n'.join(lines)
+
+
+def deck_slots(parameters: Dict = None) -> List[str]:
+    """Slots labware can use: the first 'NUM_SLOTS' slots bar the trash."""
+    num_slots = parameters.get('NUM_SLOTS', 12) if parameters else 12
+    return [slot for slot in DECK_SLOTS[:num_slots] if slot != TRASH_SLOT]
+
+
+def module_slots(parameters: Dict = None) -> Dict[str, str]:
+    """Slot of each module, with any overrides from parameters."""
+    slots = dict(MODULE_SLOTS)
+    for name in MODULE_SLOTS:
+        key = f'{name.upper()}_SLOT'
+        if parameters and key in parameters:
+            slots[name] = str(parameters[key])
+    return slots
+
+
+class _Run:
+    """Slot assignment of one run, found by augmenting paths: labware that
+    doesn't fit in a free allowed slot can take one from labware that can
+    move to another of its own allowed slots."""
+
+    def __init__(self, slots: List[str], modules: Dict[str, str], pinned: Dict[str, str]):
+        self.slots = slots
+        self.modules = modules
+        self.pinned = pinned  # slot of labware kept in place between runs, by name
+        self.assignment: Dict[str, Labware] = {}
+        self.allowed: Dict[int, List[str]] = {}
+        self.stacked: Dict[str, Labware] = {}  # labware on each module, by module name
+
+    def _allowed(self, item: Labware) -> List[str]:
+        if item.name in self.pinned:
+            allowed = [self.pinned[item.name]]
+        elif item.kind == MODULE and item.name in self.modules:
+            allowed = [self.modules[item.name]]
+        else:
+            allowed = item.slots or self.slots
+        return [slot for slot in allowed if slot in self.slots]
+
+    def _augment(self, item: Labware, seen: Set[str]) -> bool:
+        for slot in self.allowed[id(item)]:
+            if slot in seen:
+                continue
+            seen.add(slot)
+            occupant = self.assignment.get(slot)
+            if occupant is None or (occupant.kind != MODULE and self._augment(occupant, seen)):
+                self.assignment[slot] = item
+                return True
+        return False
+
+    def place(self, item: Labware) -> bool:
+        """Put labware on the deck if it fits, return whether it did."""
+        if item.on:
+            if item.on in self.stacked or not any(
+                    module.name == item.on for module in self.assignment.values()):
+                return False
+            self.stacked[item.on] = item
+            return True
+
+        self.allowed[id(item)] = self._allowed(item)
+        if self._augment(item, set()):
+            return True
+        del self.allowed[id(item)]
+        return False
+
+    def deck_map(self, run: int) -> DeckMap:
+        slots: Dict[str, List[Labware]] = {slot: [] for slot in self.slots}
+        for slot, item in self.assignment.items():
+            slots[slot].append(item)
+            if item.name in self.stacked:
+                slots[slot].append(self.stacked[item.name])
+        return DeckMap(run, slots)
+
+
+def plan_runs(labware: Sequence[Labware], parameters: Dict = None) -> List[DeckMap]:
+    """Assign labware to deck slots over the fewest runs.
+
+    Labware needed on every run is placed on each run first, modules
+    before what sits on them, and stays in the slots it got on the first
+    run. The rest is placed in order, each run taking all that fits
+    before the remainder spills into the next run.
+
+    Args:
+        labware: everything to put on the deck
+        parameters: protocol parameters, see deck_slots and module_slots
+
+    Returns:
+        A deck map per run
+
+    Raises:
+        ValueError: if labware fits on no deck, eg. there is no free slot
+            it is allowed in once the labware for every run is placed
+    """
+
+    slots = deck_slots(parameters)
+    modules = module_slots(parameters)
+    fixed = sorted((item for item in labware if item.every_run),
+                   key=lambda item: (item.kind != MODULE, item.on is not None))
+    pending = [item for item in labware if not item.every_run]
+
+    runs: List[DeckMap] = []
+    pinned: Dict[str, str] = {}
+    while True:
+        run = _Run(slots, modules, pinned)
+        for item in fixed:
+            if not run.place(item):
+                raise ValueError(
+                    f"{item.name} does not fit on the deck with the labware needed on every run")
+        leftover = [item for item in pending if not run.place(item)]
+        if leftover and len(leftover) == len(pending):
+            raise ValueError(
+                f"{leftover[0].name} does not fit on a deck with only the labware needed on every run")
+        runs.append(run.deck_map(len(runs)))
+        if not pinned:
+            pinned = {item.name: runs[0].slot_of(item.name) for item in fixed if not item.on}
+        if not leftover:
+            return runs
+        pending = leftover
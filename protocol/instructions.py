@@ -6,9 +6,14 @@
 #  * @desc [description]
 #  */
 
-from typing import List
+import math
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Union
 from uuid import uuid4
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class Transfer:
     """Transfer contents from one container to another.
@@ -51,6 +56,163 @@ class Transfer:
         return hash(self.src) + hash(self.dest) + hash(self.volume)
 
 
+class TransferTable:
+    """Columnar store of Transfers.
+
+    Instead of one Transfer object per transfer, containers are registered
+    once and each transfer is a row of three typed arrays. Iterating still
+    yields Transfers for code that wants objects.
+
+    Args:
+        transfers: Transfers to add to the table (default: {None})
+
+    Attributes:
+        containers: the container registry, indexed by src and dest
+        src: registry index of each transfer's source container
+        dest: registry index of each transfer's destination container
+        volume: volume of each transfer in microliters
+    """
+
+    def __init__(self, transfers: Iterable[Transfer] = None):
+        self.containers: List = []
+        self._index: Dict = {}
+        self.src = array("q")
+        self.dest = array("q")
+        self.volume = array("d")
+
+        if transfers:
+            self.extend(transfers)
+
+    def register(self, container) -> int:
+        """Return the registry index of a container, adding it if new."""
+
+        index = self._index.get(container)
+        if index is None:
+            index = self._index[container] = len(self.containers)
+            self.containers.append(container)
+        return index
+
+    def add(self, src, dest, volume: float):
+        """Add a single transfer from src to dest."""
+
+        self.src.append(self.register(src))
+        self.dest.append(self.register(dest))
+        self.volume.append(volume)
+
+    def extend(self, transfers: Iterable[Transfer]):
+        """Add many Transfers."""
+
+        register = self.register
+        for transfer in transfers:
+            self.src.append(register(transfer.src))
+            self.dest.append(register(transfer.dest))
+            self.volume.append(transfer.volume)
+
+    def _like(self, src: "np.ndarray", dest: "np.ndarray", volume: "np.ndarray") -> "TransferTable":
+        """Return a table with new rows over a copy of the container
+        registry, so containers added to it don't appear in this table."""
+
+        import numpy as np
+
+        table = TransferTable()
+        table.containers = list(self.containers)
+        table._index = dict(self._index)
+        table.src = array("q", src.astype(np.int64, copy=False).tobytes())
+        table.dest = array("q", dest.astype(np.int64, copy=False).tobytes())
+        table.volume = array("d", volume.astype(np.float64, copy=False).tobytes())
+        return table
+
+    def arrays(self):
+        """Return zero-copy NumPy views of the src, dest and volume columns.
+        NumPy is only imported once a table is used this way."""
+
+        import numpy as np
+
+        return (
+            np.frombuffer(self.src, dtype=np.int64) if self.src else np.zeros(0, np.int64),
+            np.frombuffer(self.dest, dtype=np.int64) if self.dest else np.zeros(0, np.int64),
+            np.frombuffer(self.volume) if self.volume else np.zeros(0),
+        )
+
+    def split(self, max_volume: float, multiple_of: float) -> "TransferTable":
+        """Split every transfer into transfers of at most max_volume,
+        each a multiple of multiple_of, as Transfer.split does for one.
+
+        Args:
+            max_volume: the max volume of a single transfer in uL
+            multiple_of: each transfer has to be a multiple of this (in uL)
+
+        Returns:
+            A new table with the split transfers, in the same order
+        """
+
+        import numpy as np
+
+        src, dest, volume = self.arrays()
+        counts = np.ceil(volume / max_volume).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_transfer = np.round(volume / counts / multiple_of) * multiple_of
+        return self._like(
+            np.repeat(src, counts), np.repeat(dest, counts), np.repeat(per_transfer, counts)
+        )
+
+    def take(self, rows: Iterable[int]) -> "TransferTable":
+        """Return a table of only the given rows."""
+
+        import numpy as np
+
+        rows = np.asarray(rows, dtype=np.int64)
+        src, dest, volume = self.arrays()
+        return self._like(src[rows], dest[rows], volume[rows])
+
+    def _group_by(self, column: "np.ndarray") -> Dict:
+        import numpy as np
+
+        order = np.argsort(column, kind="stable")
+        keys, starts = np.unique(column[order], return_index=True)
+        return {
+            self.containers[key]: rows
+            for key, rows in zip(keys, np.split(order, starts[1:]))
+        }
+
+    def group_by_src(self) -> Dict:
+        """Map each source container to the rows transferring from it."""
+
+        return self._group_by(self.arrays()[0])
+
+    def group_by_dest(self) -> Dict:
+        """Map each destination container to the rows transferring into it."""
+
+        return self._group_by(self.arrays()[1])
+
+    def srcs(self) -> List:
+        """Return the unique source containers, in registry order."""
+
+        import numpy as np
+
+        return [self.containers[i] for i in np.unique(self.arrays()[0])]
+
+    def dests(self) -> List:
+        """Return the unique destination containers, in registry order."""
+
+        import numpy as np
+
+        return [self.containers[i] for i in np.unique(self.arrays()[1])]
+
+    def __len__(self):
+        return len(self.volume)
+
+    def __getitem__(self, row: int) -> Transfer:
+        return Transfer(
+            self.containers[self.src[row]], self.containers[self.dest[row]], self.volume[row]
+        )
+
+    def __iter__(self) -> Iterator[Transfer]:
+        containers = self.containers
+        for src, dest, volume in zip(self.src, self.dest, self.volume):
+            yield Transfer(containers[src], containers[dest], volume)
+
+
 class Temperature:
     """A temperature instruction, has a temperature and time component.
 
@@ -75,13 +237,16 @@ class Instruction:
     def __init__(
         self,
         name: str = "",
-        transfers: List[Transfer] = None,
+        transfers: Union[List[Transfer], TransferTable] = None,
         temps: List[Temperature] = None,
         instructions: List[str] = None,
     ):
         self.id = uuid4()
         self.name = name
-        self.transfers = transfers
+        if transfers is None or isinstance(transfers, TransferTable):
+            self.transfers = transfers
+        else:
+            self.transfers = TransferTable(transfers)
         self.temps = temps
         self.instructions = instructions or []
 
@@ -0,0 +1,454 @@
+"""Planning 8-channel transfers for the BASIC CLIP and final assembly steps.
+
+Given a plan, 'clip_template.py' and 'assembly_template.py' fill whole
+destination columns with a p10_multi and leave the other wells to the
+p10_single. An 8-channel transfer fills a column at once when its 8
+sources sit in one source column, each on its destination's row, with
+one volume.
+
+Most transfers are in the final assembly, where every assembly takes one
+purified CLIP reaction per part. A column of assemblies has a
+'signature' for a part: the CLIP used on each row. The final assemblies
+are laid out so that many columns share signatures, and a column of CLIP
+reactions is placed to match each signature worth it. That part of every
+column with the signature is then one 8-channel transfer. A CLIP may get
+more reactions than its assemblies need so that it sits on every row
+that uses it, as long as all reactions fit in MAX_CLIPS wells and the
+transfers saved outweigh the extra CLIP and purification work. The rest
+of the CLIP reactions follow these columns, reordered so that parts from
+one source column line up for the CLIP step.
+"""
+
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from script_gen_pipeline.labware.wells import COL_MAJOR, well_index, well_position
+from script_gen_pipeline.labware.wells import well_name as plate_well_name
+from script_gen_pipeline.protocol.basic import FINAL_ASSEMBLIES_PER_CLIP, MAX_CLIPS
+
+CHANNELS = 8
+MAG_WELL_OFFSET = 48
+"""CLIP reaction n ends up in magbead well n + MAG_WELL_OFFSET after purification."""
+
+LINKER_VOL = 1
+PART_VOL = 1.5
+"""Volumes of each linker transfer in 'clip_template.py' and each part
+transfer in 'assembly_template.py'."""
+
+CLIP_STEPS = 4
+"""Transfers into each CLIP reaction: water, prefix, suffix and part."""
+PURIFICATION_STEPS = 9
+"""p300 multi-channel transfers per column of CLIP reactions in 'purification_template.py'."""
+
+Source = Tuple[str, str]
+"""A transfer source as (plate, well)."""
+
+
+def well_name(index: int) -> str:
+    """Name of the well at a column-major index from 0, eg. 9 -> 'B2'."""
+    return plate_well_name(index, order=COL_MAJOR)
+
+
+class ChannelTransfer:
+    """One aspirate/dispense step, by a single channel or all channels.
+
+    Attributes:
+        volume: volume per channel
+        source_plate: plate aspirated from
+        source_wells: one well per channel
+        dest_wells: one well per channel
+    """
+
+    def __init__(self, volume: float, source_plate: str,
+                 source_wells: List[str], dest_wells: List[str]):
+        self.volume = volume
+        self.source_plate = source_plate
+        self.source_wells = source_wells
+        self.dest_wells = dest_wells
+
+    @property
+    def channels(self) -> int:
+        return len(self.dest_wells)
+
+    def to_dict(self) -> Dict:
+        return {'volume': self.volume, 'source_plate': self.source_plate,
+                'source_wells': self.source_wells, 'dest_wells': self.dest_wells}
+
+    def __repr__(self):
+        return (f"ChannelTransfer({self.volume} from {self.source_plate} "
+                f"{self.source_wells[0]} to {self.dest_wells[0]}, {self.channels} channels)")
+
+
+class MultiChannelPlan:
+    """A column-aligned layout and the transfers that fill it.
+
+    Attributes:
+        layout: the planned clips_dict / final_assembly_dict, a drop-in
+            replacement for the original
+        order: per new position, the old reaction or assembly it holds
+            (CLIP reactions that were added copy the reaction given)
+        transfers: the transfer steps, per transfer kind, in the order
+            the template makes them
+    """
+
+    def __init__(self, layout: Dict, order: List[int],
+                 transfers: Dict[str, List[ChannelTransfer]]):
+        self.layout = layout
+        self.order = order
+        self.transfers = transfers
+
+    @property
+    def steps(self) -> int:
+        """Pipetting steps with the 8-channel planned."""
+        return sum(len(transfers) for transfers in self.transfers.values())
+
+    @property
+    def single_steps(self) -> int:
+        """Pipetting steps with only the single-channel pipette."""
+        return sum(transfer.channels for transfers in self.transfers.values()
+                   for transfer in transfers)
+
+    def multi_channel_transfers(self) -> List[ChannelTransfer]:
+        return [transfer for transfers in self.transfers.values()
+                for transfer in transfers if transfer.channels > 1]
+
+    def to_dict(self) -> Dict[str, List[Dict]]:
+        """The transfers, as rendered into the templates."""
+        return {kind: [transfer.to_dict() for transfer in transfers]
+                for kind, transfers in self.transfers.items()}
+
+    def __repr__(self):
+        return f"MultiChannelPlan({self.single_steps} -> {self.steps} steps)"
+
+
+def align_columns(keys: List[Optional[Hashable]], rows: List[int],
+                  channels: int = CHANNELS) -> List[int]:
+    """Order items so that items with the same key fill whole destination
+    columns, each on the row it has in its source.
+
+    Args:
+        keys: per item, what must be shared across a column (eg. source
+            plate, source column and volume), None if it can't be aligned
+        rows: per item, the source row it must keep
+
+    Returns:
+        The item at each position: aligned columns first, then the
+        leftover items in their original order
+    """
+
+    groups: Dict[Hashable, List[List[int]]] = {}
+    for item, (key, row) in enumerate(zip(keys, rows)):
+        if key is not None and row < channels:
+            groups.setdefault(key, [[] for _ in range(channels)])[row].append(item)
+
+    aligned: List[int] = []
+    placed = set()
+    for buckets in groups.values():
+        for column in zip(*buckets):
+            aligned.extend(column)
+            placed.update(column)
+
+    return aligned + [item for item in range(len(keys)) if item not in placed]
+
+
+def column_transfers(sources: List[Optional[Source]], dest_wells: List[str],
+                     volumes: List[float], channels: int = CHANNELS) -> List[ChannelTransfer]:
+    """Batch the transfers into each destination column.
+
+    A full column becomes one multi-channel transfer when its sources are
+    on one plate, in one column, each on its destination's row, with one
+    volume. Otherwise, each well gets a single-channel transfer.
+
+    Args:
+        sources: per destination well (column-major from A1), its source or
+            None if that well gets nothing
+        dest_wells: destination well names
+        volumes: per destination well, the volume transferred
+    """
+
+    transfers = []
+    for start in range(0, len(dest_wells), channels):
+        column = range(start, min(start + channels, len(dest_wells)))
+        column_sources = [sources[x] for x in column]
+
+        if len(column) == channels and all(column_sources) and \
+                len(set(volumes[x] for x in column)) == 1:
+            plates = set(plate for plate, _ in column_sources)
+            positions = [well_position(well) for _, well in column_sources]
+            if len(plates) == 1 and len(set(col for _, col in positions)) == 1 and \
+                    all(row == well_position(dest_wells[x])[0]
+                        for (row, _), x in zip(positions, column)):
+                transfers.append(ChannelTransfer(
+                    volumes[start], plates.pop(),
+                    [well for _, well in column_sources],
+                    [dest_wells[x] for x in column]))
+                continue
+
+        for x in column:
+            if sources[x]:
+                plate, well = sources[x]
+                transfers.append(ChannelTransfer(volumes[x], plate, [well], [dest_wells[x]]))
+    return transfers
+
+
+def plan_clips(clips_dict: Dict[str, List], channels: int = CHANNELS,
+               linker_vol: float = LINKER_VOL, fixed: int = 0) -> MultiChannelPlan:
+    """Reorder CLIP reactions (see 'clip_template.py') so that parts from
+    the same source column, with the same volume, fill aligned columns.
+
+    Args:
+        clips_dict: clips_dict as injected into 'clip_template.py'
+        linker_vol: volume of each prefix and suffix linker transfer
+        fixed: number of leading reactions kept in their wells, a
+            multiple of channels
+    """
+
+    parts_wells = clips_dict['parts_wells']
+    keys = []
+    rows = []
+    for plate, well, vol in zip(clips_dict['parts_plates'][fixed:], parts_wells[fixed:],
+                                clips_dict['parts_vols'][fixed:]):
+        row, col = well_position(well)
+        keys.append((plate, col, vol))
+        rows.append(row)
+
+    order = list(range(fixed)) + [fixed + x for x in align_columns(keys, rows, channels)]
+    layout = {key: [values[x] for x in order] for key, values in clips_dict.items()}
+    dest_wells = [well_name(x) for x in range(len(order))]
+
+    transfers = {}
+    for kind in ('prefixes', 'suffixes', 'parts'):
+        sources = list(zip(layout[f'{kind}_plates'], layout[f'{kind}_wells']))
+        volumes = layout['parts_vols'] if kind == 'parts' else [linker_vol] * len(order)
+        transfers[kind] = column_transfers(sources, dest_wells, volumes, channels)
+    return MultiChannelPlan(layout, order, transfers)
+
+
+def assembly_transfers(final_assembly_dict: Dict[str, List[str]], channels: int = CHANNELS,
+                       part_vol: float = PART_VOL, mag_plate: str = '1'
+                       ) -> Dict[str, List[ChannelTransfer]]:
+    """Transfers of each part into the final assemblies (see
+    'assembly_template.py'), by part."""
+
+    dest_wells = list(final_assembly_dict)
+    mag_wells = list(final_assembly_dict.values())
+    transfers = {}
+    for part in range(max((len(wells) for wells in mag_wells), default=0)):
+        sources = [(mag_plate, wells[part]) if part < len(wells) else None
+                   for wells in mag_wells]
+        transfers[f'part_{part + 1}'] = column_transfers(
+            sources, dest_wells, [part_vol] * len(dest_wells), channels)
+    return transfers
+
+
+class _Columns:
+    """Columns of CLIP reactions chosen for one layout of final assemblies.
+
+    Attributes:
+        signatures: per column, the CLIP on each row
+        served: per column, the (part, assembly column) pairs it serves
+        reactions: reactions of each CLIP, its aligned ones included
+        saved: transfers saved in the final assembly
+    """
+
+    def __init__(self, needed: Sequence[int]):
+        self.needed = needed
+        self.signatures: List[Tuple[int, ...]] = []
+        self.served: List[List[Tuple[int, int]]] = []
+        self.aligned: Counter = Counter()
+        self.reactions = list(needed)
+        self.saved = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.reactions)
+
+    def extra(self, signature: Tuple[int, ...]) -> List[int]:
+        """Reactions of each CLIP with a column of signature added."""
+        added = Counter(signature)
+        return [max(needed, self.aligned[clip] + added[clip])
+                for clip, needed in enumerate(self.needed)]
+
+    def add(self, signature: Tuple[int, ...], served: List[Tuple[int, int]],
+            reactions: List[int], saved: int):
+        self.signatures.append(signature)
+        self.served.append(served)
+        self.aligned.update(signature)
+        self.reactions = reactions
+        self.saved += saved
+
+    def cost(self, channels: int = CHANNELS) -> int:
+        """Extra CLIP and purification transfers for the added reactions."""
+        return clip_work(self.total, channels) - clip_work(sum(self.needed), channels)
+
+
+def clip_work(reactions: int, channels: int = CHANNELS) -> int:
+    """Transfers made into a number of CLIP reactions, and to purify them."""
+    return CLIP_STEPS * reactions + PURIFICATION_STEPS * -(-reactions // channels)
+
+
+def _clip_uses(clips_dict: Dict[str, List], final_assembly_dict: Dict[str, List[str]]
+               ) -> Tuple[List[int], List[int], List[List[int]]]:
+    """Identify the CLIPs behind the reactions of a layout.
+
+    Returns:
+        The first reaction of each CLIP, the reactions each CLIP needs,
+        and per final assembly the CLIP of each of its parts
+    """
+
+    clip_of: Dict[Tuple, int] = {}
+    first: List[int] = []
+    needed: List[int] = []
+    reaction_clips = []
+    for reaction, key in enumerate(zip(*clips_dict.values())):
+        if key not in clip_of:
+            clip_of[key] = len(first)
+            first.append(reaction)
+            needed.append(0)
+        needed[clip_of[key]] += 1
+        reaction_clips.append(clip_of[key])
+
+    constructs = [[reaction_clips[well_index(well, order=COL_MAJOR) - MAG_WELL_OFFSET]
+                   for well in wells] for wells in final_assembly_dict.values()]
+    return first, needed, constructs
+
+
+def _arrange(constructs: List[List[int]], parts: List[int], by_rows: bool,
+             channels: int) -> List[int]:
+    """Lay out the assemblies sorted by their CLIPs of parts, in that
+    order of priority, down each column or, by_rows, along each row of
+    the full columns so that rows rather than columns share CLIPs.
+
+    Returns:
+        The assembly at each position, column-major
+    """
+
+    ordered = sorted(range(len(constructs)), key=lambda x: tuple(
+        constructs[x][part] if part < len(constructs[x]) else -1 for part in parts))
+    full = len(ordered) // channels
+    if not by_rows or not full:
+        return ordered
+
+    arrangement = list(ordered)
+    for k, construct in enumerate(ordered[:full * channels]):
+        arrangement[(k % full) * channels + k // full] = construct
+    return arrangement
+
+
+def _choose_columns(constructs: List[List[int]], arrangement: List[int],
+                    needed: Sequence[int], channels: int, max_clips: int,
+                    assemblies_per_clip: int) -> _Columns:
+    """Greedily pick the signatures worth a column of CLIP reactions."""
+
+    groups: Dict[Tuple[int, ...], List[Tuple[int, int]]] = {}
+    for col in range(len(arrangement) // channels):
+        members = [constructs[x] for x in arrangement[col * channels:(col + 1) * channels]]
+        for part in range(min(len(clips) for clips in members)):
+            groups.setdefault(tuple(clips[part] for clips in members), []).append((part, col))
+
+    # each reaction of a column takes one use per column it serves
+    candidates = [(signature, pairs[start:start + assemblies_per_clip])
+                  for signature, pairs in groups.items()
+                  for start in range(0, len(pairs), assemblies_per_clip)]
+    candidates.sort(key=lambda candidate: -len(candidate[1]))
+
+    columns = _Columns(needed)
+    for signature, served in candidates:
+        reactions = columns.extra(signature)
+        total = sum(reactions)
+        if total > max_clips:
+            continue
+        added = clip_work(total, channels) - clip_work(columns.total, channels)
+        saved = (channels - 1) * len(served)
+        if saved > added:
+            columns.add(signature, served, reactions, saved)
+    return columns
+
+
+def plan_basic(clips_dict: Dict[str, List],
+               final_assembly_dict: Dict[str, List[str]],
+               channels: int = CHANNELS, part_vol: float = PART_VOL,
+               mag_plate: str = '1', max_clips: int = MAX_CLIPS,
+               assemblies_per_clip: int = FINAL_ASSEMBLIES_PER_CLIP
+               ) -> Tuple[MultiChannelPlan, MultiChannelPlan]:
+    """Plan the CLIP reactions and final assemblies together: lay out the
+    final assemblies and their CLIP reactions for 8-channel transfers in
+    the final assembly, then align the remaining CLIP reactions for the
+    CLIP step.
+
+    Args:
+        clips_dict: clips_dict as injected into 'clip_template.py', with
+            reaction n purified into magbead well n + MAG_WELL_OFFSET
+        final_assembly_dict: final_assembly_dict as injected into
+            'assembly_template.py', keyed by wells from A1 column-major
+        part_vol: volume of each part transfer in the final assembly
+        mag_plate: deck slot of the magbead plate
+        max_clips: CLIP reaction wells available
+        assemblies_per_clip: final assemblies one CLIP reaction can supply
+
+    Returns:
+        The CLIP plan and the final assembly plan
+    """
+
+    first, needed, constructs = _clip_uses(clips_dict, final_assembly_dict)
+    part_transfers = sum(len(clips) for clips in constructs)
+
+    # Try sorting by each part in turn, keeping the best layout
+    best = (part_transfers, list(range(len(constructs))), _Columns(needed))
+    parts: List[int] = []
+    remaining = list(range(max((len(clips) for clips in constructs), default=0)))
+    while remaining:
+        trials = []
+        for part in remaining:
+            for by_rows in (False, True):
+                arrangement = _arrange(constructs, parts + [part], by_rows, channels)
+                columns = _choose_columns(constructs, arrangement, needed, channels,
+                                          max_clips, assemblies_per_clip)
+                trials.append((part_transfers - columns.saved + columns.cost(channels),
+                               part, arrangement, columns))
+        score, part, arrangement, columns = min(trials, key=lambda trial: trial[0])
+        if score < best[0]:
+            best = (score, arrangement, columns)
+        parts.append(part)
+        remaining.remove(part)
+    _, arrangement, columns = best
+
+    # CLIP reactions: the chosen columns, then the remaining reactions
+    reaction_clips = [clip for signature in columns.signatures for clip in signature]
+    for clip, reactions in enumerate(columns.reactions):
+        reaction_clips += [clip] * (reactions - columns.aligned[clip])
+    copies = [first[clip] for clip in reaction_clips]
+    clip_plan = plan_clips({key: [values[x] for x in copies] for key, values in clips_dict.items()},
+                           channels, fixed=len(columns.signatures) * channels)
+    reaction_clips = [reaction_clips[x] for x in clip_plan.order]
+    clip_plan.order = [copies[x] for x in clip_plan.order]
+
+    # Each part of an assembly takes its aligned reaction if it has one,
+    # else the least used reaction of its CLIP
+    uses = [0] * len(reaction_clips)
+    aligned: Dict[Tuple[int, int], int] = {}
+    for column, served in enumerate(columns.served):
+        for pair in served:
+            aligned[pair] = column * channels
+            for row in range(channels):
+                uses[column * channels + row] += 1
+    by_clip: Dict[int, List[int]] = {}
+    for reaction, clip in enumerate(reaction_clips):
+        by_clip.setdefault(clip, []).append(reaction)
+
+    layout: Dict[str, List[str]] = {}
+    for position, construct in enumerate(arrangement):
+        col, row = divmod(position, channels)
+        wells = []
+        for part, clip in enumerate(constructs[construct]):
+            if (part, col) in aligned:
+                reaction = aligned[(part, col)] + row
+            else:
+                reaction = min(by_clip[clip], key=lambda x: uses[x])
+                uses[reaction] += 1
+            wells.append(well_name(reaction + MAG_WELL_OFFSET))
+        layout[well_name(position)] = wells
+
+    assembly_plan = MultiChannelPlan(layout, arrangement, assembly_transfers(
+        layout, channels, part_vol, mag_plate))
+    return clip_plan, assembly_plan
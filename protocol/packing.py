@@ -0,0 +1,180 @@
+"""Bin packing of content volumes into setup containers.
+
+A Setup step has to split the total volume of each content across as few
+source containers (wells, tubes) as possible, with each container holding
+at most its volume_max including its volume_dead. Small instances are
+packed exactly, larger ones first-fit-decreasing, which uses at most
+11/9 OPT + 6/9 containers.
+"""
+
+import math
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+EXACT_MAX_ITEMS = 12
+"""Volume counts up to which packings are searched exhaustively."""
+
+
+class Packing:
+    """Volumes packed into containers.
+
+    Attributes:
+        bins: volumes in each container, excluding the dead volume
+        volume_max: max volume of each container
+        volume_dead: dead volume added to each container
+    """
+
+    def __init__(self, bins: List[List[float]], volume_max: float, volume_dead: float):
+        self.bins = bins
+        self.volume_max = volume_max
+        self.volume_dead = volume_dead
+
+    @property
+    def volumes(self) -> List[float]:
+        """Total volume of each container, including its dead volume."""
+        return [sum(b) + self.volume_dead for b in self.bins]
+
+    @property
+    def lower_bound(self) -> int:
+        """Fewest containers any packing could use."""
+        capacity = self.volume_max - self.volume_dead
+        total = sum(sum(b) for b in self.bins)
+        if self.volume_max <= 0 or capacity <= 0:
+            return len(self.bins)
+        return max(math.ceil(total / capacity), 1 if total else 0)
+
+    @property
+    def efficiency(self) -> float:
+        """Share of the filled containers' volume that is transferred on,
+        ie. not dead volume or left unused."""
+        if not self.bins or self.volume_max <= 0:
+            return 1.0
+        return sum(sum(b) for b in self.bins) / (len(self.bins) * self.volume_max)
+
+    def __len__(self):
+        return len(self.bins)
+
+    def __repr__(self):
+        return (f"Packing({len(self)} containers, lower bound {self.lower_bound}, "
+                f"{self.efficiency:.0%} efficient)")
+
+
+def pack_volumes(volumes: List[float], volume_max: float, volume_dead: float = 0,
+                 exact_max_items: int = EXACT_MAX_ITEMS) -> Packing:
+    """Pack volumes into as few containers as possible.
+
+    A volume is never split across containers. A volume that doesn't fit
+    an empty container gets one to itself. Containers without a
+    volume_max (<= 0) hold everything.
+
+    Args:
+        volumes: volumes to pack, eg. one per destination well
+        volume_max: max volume of each container
+        volume_dead: volume left unused at the bottom of each container
+
+    Keyword Args:
+        exact_max_items: pack exactly up to this many volumes, otherwise
+            first-fit-decreasing
+
+    Returns:
+        The packing
+    """
+
+    if not volumes:
+        return Packing([], volume_max, volume_dead)
+    if volume_max <= 0:
+        return Packing([sorted(volumes, reverse=True)], volume_max, volume_dead)
+
+    capacity = volume_max - volume_dead
+    items = sorted(volumes, reverse=True)
+    oversized = [[v] for v in items if v > capacity]
+    items = [v for v in items if v <= capacity]
+
+    bins = first_fit_decreasing(items, capacity)
+    if len(items) <= exact_max_items:
+        bound = math.ceil(sum(items) / capacity) if capacity > 0 else 0
+        if len(bins) > bound:
+            bins = _exact(items, capacity, len(bins) - 1, bound) or bins
+    return Packing(oversized + bins, volume_max, volume_dead)
+
+
+def group_volumes(codes: Sequence[int], volumes: Sequence[float],
+                  count: int) -> Tuple["np.ndarray", List["np.ndarray"]]:
+    """Group a flat list of (content code, volume) pairs by content code in
+    one vectorized pass.
+
+    Args:
+        codes: integer code of each volume's content, from 0 to count - 1
+        volumes: the volumes
+        count: the number of content codes
+
+    Returns:
+        The total volume of each code, and each code's volumes in input order
+    """
+
+    import numpy as np  # deferred, numpy is slow to import
+
+    codes = np.asarray(codes, dtype=np.intp)
+    volumes = np.asarray(volumes, dtype=float)
+
+    totals = np.bincount(codes, weights=volumes, minlength=count)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=count))[:-1]
+    return totals, np.split(volumes[order], bounds)
+
+
+def first_fit_decreasing(items: List[float], capacity: float) -> List[List[float]]:
+    """Put each item, largest first, in the first container it fits."""
+
+    bins: List[List[float]] = []
+    free: List[float] = []
+    for item in sorted(items, reverse=True):
+        for i, space in enumerate(free):
+            if item <= space:
+                bins[i].append(item)
+                free[i] -= item
+                break
+        else:
+            bins.append([item])
+            free.append(capacity - item)
+    return bins
+
+
+def _exact(items: List[float], capacity: float, max_bins: int, bound: int) -> List[List[float]]:
+    """Search for a packing in the fewest containers, from the lower bound
+    up to max_bins. Items sorted largest first. Returns None if there's
+    none within max_bins."""
+
+    bins: List[List[float]] = []
+    free: List[float] = []
+
+    def search(i: int, limit: int) -> bool:
+        if i == len(items):
+            return True
+        item = items[i]
+        tried = set()
+        for j, space in enumerate(free):
+            # containers with the same free space are interchangeable
+            if item <= space and space not in tried:
+                tried.add(space)
+                bins[j].append(item)
+                free[j] -= item
+                if search(i + 1, limit):
+                    return True
+                free[j] += item
+                bins[j].pop()
+        if len(bins) < limit:
+            bins.append([item])
+            free.append(capacity - item)
+            if search(i + 1, limit):
+                return True
+            bins.pop()
+            free.pop()
+        return False
+
+    for limit in range(max(bound, 1), max_bins + 1):
+        if search(0, limit):
+            return bins
+    return None
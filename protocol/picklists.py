@@ -0,0 +1,187 @@
+"""Picklists for robotic liquid handlers, from an Instruction's transfers.
+
+Each writer streams rows straight to an open file handle, one transfer at
+a time, so memory stays flat however many transfers there are.
+
+Supported platforms:
+    tecan: Freedom EVOware worklist (.gwl) with Aspirate/Dispense/Wash lines
+    hamilton: CSV of source/destination plate, well and volume (uL)
+    labcyte: Echo CSV with transfer volumes in nL, split to the Echo's limits
+"""
+
+import csv
+import io
+from typing import Callable, Dict, Optional, TextIO
+
+from script_gen_pipeline.labware.containers import Layout
+from script_gen_pipeline.protocol.instructions import Instruction
+
+ECHO_MAX_VOLUME = 10.0
+"""Max volume of a single Labcyte Echo transfer in uL."""
+
+ECHO_DROPLET_VOLUME = 0.0025
+"""Labcyte Echo transfers are a multiple of this volume in uL (2.5 nL)."""
+
+
+def _layout(instruction: Instruction, existing_plates: int, layout: Optional[Layout]) -> Layout:
+    if layout is not None:
+        return layout
+    return Layout.from_instruction(
+        instruction, src_containers=True, existing_plates=existing_plates
+    )
+
+
+def write_tecan(
+    instruction: Instruction,
+    existing_plates: int,
+    handle: TextIO,
+    layout: Layout = None,
+) -> int:
+    """Write a Tecan worklist (.gwl): an aspirate, dispense and wash line
+    per transfer. Wells are referenced by their 1-based index on a plate.
+
+    Args:
+        instruction: the instruction with plate to plate transfers
+        existing_plates: plates used before this instruction
+        handle: the file to write to
+
+    Keyword Args:
+        layout: the instruction's Layout with its source containers, eg.
+            Protocol.instruction_layout's (default: {built from the instruction})
+
+    Returns:
+        The number of transfers written
+    """
+
+    layout = _layout(instruction, existing_plates, layout)
+    plate_name = layout.container_to_plate_name
+    well_index = layout.container_to_well_index
+
+    rows = 0
+    for transfer in instruction.transfers:
+        src, dest = transfer.src, transfer.dest
+        handle.write(f"A;{plate_name[src]};;;{well_index[src]};;{transfer.volume}\n")
+        handle.write(f"D;{plate_name[dest]};;;{well_index[dest]};;{transfer.volume}\n")
+        handle.write("W;\n")
+        rows += 1
+    return rows
+
+
+def write_hamilton(
+    instruction: Instruction,
+    existing_plates: int,
+    handle: TextIO,
+    layout: Layout = None,
+) -> int:
+    """Write a Hamilton CSV picklist, a row per transfer with volumes in uL.
+
+    Args:
+        instruction: the instruction with plate to plate transfers
+        existing_plates: plates used before this instruction
+        handle: the file to write to
+
+    Keyword Args:
+        layout: the instruction's Layout with its source containers, eg.
+            Protocol.instruction_layout's (default: {built from the instruction})
+
+    Returns:
+        The number of transfers written
+    """
+
+    layout = _layout(instruction, existing_plates, layout)
+    plate_name = layout.container_to_plate_name
+    well_name = layout.container_to_well_name
+
+    writer = csv.writer(handle, lineterminator="\n")
+    writer.writerow(
+        ["Source Plate", "Source Well", "Destination Plate", "Destination Well", "Volume"]
+    )
+
+    rows = 0
+    for transfer in instruction.transfers:
+        src, dest = transfer.src, transfer.dest
+        writer.writerow(
+            [plate_name[src], well_name[src], plate_name[dest], well_name[dest], transfer.volume]
+        )
+        rows += 1
+    return rows
+
+
+def write_labcyte(
+    instruction: Instruction,
+    existing_plates: int,
+    handle: TextIO,
+    max_volume: float = ECHO_MAX_VOLUME,
+    multiple_of: float = ECHO_DROPLET_VOLUME,
+    layout: Layout = None,
+) -> int:
+    """Write a Labcyte Echo CSV picklist with transfer volumes in nL.
+
+    Transfers over max_volume are split into equal transfers that are each
+    a multiple of multiple_of, see TransferTable.split. Transfers that
+    round to 0 nL are left out.
+
+    Args:
+        instruction: the instruction with plate to plate transfers
+        existing_plates: plates used before this instruction
+        handle: the file to write to
+
+    Keyword Args:
+        max_volume: max volume of a single transfer in uL
+        multiple_of: each transfer is a multiple of this in uL
+        layout: the instruction's Layout with its source containers, eg.
+            Protocol.instruction_layout's (default: {built from the instruction})
+
+    Returns:
+        The number of (split) transfers written
+    """
+
+    layout = _layout(instruction, existing_plates, layout)
+    plate_name = layout.container_to_plate_name
+    well_name = layout.container_to_well_name
+
+    writer = csv.writer(handle, lineterminator="\n")
+    writer.writerow(
+        [
+            "Source Plate Name",
+            "Source Well",
+            "Destination Plate Name",
+            "Destination Well",
+            "Transfer Volume",
+        ]
+    )
+
+    rows = 0
+    for transfer in instruction.transfers.split(max_volume, multiple_of):
+        volume = round(transfer.volume * 1000, 1)  # nL
+        if not volume:
+            continue  # less than half a droplet
+        src, dest = transfer.src, transfer.dest
+        writer.writerow(
+            [plate_name[src], well_name[src], plate_name[dest], well_name[dest], volume]
+        )
+        rows += 1
+    return rows
+
+
+PICKLIST_WRITERS: Dict[str, Callable[[Instruction, int, TextIO], int]] = {
+    "tecan": write_tecan,
+    "hamilton": write_hamilton,
+    "labcyte": write_labcyte,
+}
+"""Picklist writer of each platform."""
+
+
+def _to_str(writer: Callable[[Instruction, int, TextIO], int]):
+    def to_picklist(instruction: Instruction, existing_plates: int = 0) -> str:
+        handle = io.StringIO()
+        writer(instruction, existing_plates, handle)
+        return handle.getvalue()
+
+    to_picklist.__doc__ = f"Return the picklist of {writer.__name__} as a string."
+    return to_picklist
+
+
+to_tecan = _to_str(write_tecan)
+to_hamilton = _to_str(write_hamilton)
+to_labcyte = _to_str(write_labcyte)
@@ -0,0 +1,252 @@
+"""Stage-level profiling of protocol runs.
+
+Spans record the wall time, CPU time, allocated bytes and item counts of
+a Step, Subprotocol or planning stage. Profiling is off by default: a
+disabled span is a shared no-op, so instrumented code pays one global
+lookup per stage. Records export as JSON or in Chrome trace format (open
+in chrome://tracing or Perfetto).
+
+    profiling.enable()
+    protocol.run()
+    profiling.to_chrome_trace("run.trace.json")
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+_enabled = False
+_trace_memory = False
+_records: List["Record"] = []
+_lock = threading.Lock()
+
+
+class Record:
+    """Measurements of one span.
+
+    Attributes:
+        name: what ran, eg. the Step's class name
+        category: kind of span, eg. 'step' or 'subprotocol'
+        start: perf_counter at the start, in seconds
+        wall: wall time in seconds
+        cpu: CPU time of the process in seconds
+        alloc: bytes allocated and still held at the end (None unless
+            memory is traced)
+        count: items processed, eg. wells or constructs (optional)
+        depth: nesting level of the span
+        thread: id of the thread it ran on
+    """
+
+    __slots__ = ("name", "category", "start", "wall", "cpu", "alloc",
+                 "count", "depth", "thread")
+
+    def __init__(self, name: str, category: str, start: float, wall: float, cpu: float,
+                 alloc: Optional[int], count: Optional[int], depth: int, thread: int):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.wall = wall
+        self.cpu = cpu
+        self.alloc = alloc
+        self.count = count
+        self.depth = depth
+        self.thread = thread
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Span:
+    """An open span, see span(). Set count while it runs."""
+
+    __slots__ = ("name", "category", "count", "_start", "_cpu", "_alloc", "_depth")
+
+    _local = threading.local()
+
+    def __init__(self, name: str, category: str, count: Optional[int] = None):
+        self.name = name
+        self.category = category
+        self.count = count
+
+    def __enter__(self) -> "Span":
+        self._depth = getattr(Span._local, "depth", 0)
+        Span._local.depth = self._depth + 1
+        self._alloc = tracemalloc.get_traced_memory()[0] if _trace_memory else None
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._start
+        cpu = time.process_time() - self._cpu
+        alloc = None
+        if self._alloc is not None and tracemalloc.is_tracing():
+            alloc = tracemalloc.get_traced_memory()[0] - self._alloc
+        Span._local.depth = self._depth
+
+        record = Record(self.name, self.category, self._start, wall, cpu, alloc,
+                        self.count, self._depth, threading.get_ident())
+        with _lock:
+            _records.append(record)
+        return False
+
+
+class _NullSpan:
+    """Stand-in for Span while profiling is disabled."""
+
+    __slots__ = ()
+    count = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass  # eg. span.count = n, dropped
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(trace_memory: bool = False):
+    """Start recording spans.
+
+    Keyword Args:
+        trace_memory: also record allocated bytes with tracemalloc,
+            which slows the traced code down noticeably (default: {False})
+    """
+
+    global _enabled, _trace_memory
+    _enabled = True
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    """Stop recording spans. Records so far are kept."""
+
+    global _enabled, _trace_memory
+    _enabled = False
+    if _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Drop all records."""
+
+    with _lock:
+        _records.clear()
+
+
+def records() -> List[Record]:
+    with _lock:
+        return list(_records)
+
+
+def span(name: str, category: str = "stage", count: Optional[int] = None):
+    """Context manager recording a span while profiling is enabled.
+
+    Args:
+        name: what runs in the span
+        category: kind of span (default: {"stage"})
+        count: items processed, can also be set on the span later
+    """
+
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, category, count)
+
+
+def profiled(name: str = None, category: str = "stage"):
+    """Decorator recording a span for every call while profiling is enabled.
+
+    Keyword Args:
+        name: span name (default: {the function's qualified name})
+        category: kind of span (default: {"stage"})
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, category):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def summary() -> Dict[str, Dict[str, Any]]:
+    """Total calls, wall and CPU time, allocations and counts per span name."""
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    for record in records():
+        total = totals.setdefault(record.name, {
+            "category": record.category, "calls": 0, "wall": 0.0, "cpu": 0.0,
+            "alloc": None, "count": None})
+        total["calls"] += 1
+        total["wall"] += record.wall
+        total["cpu"] += record.cpu
+        if record.alloc is not None:
+            total["alloc"] = (total["alloc"] or 0) + record.alloc
+        if record.count is not None:
+            total["count"] = (total["count"] or 0) + record.count
+    return totals
+
+
+def to_json(filename: str = "") -> str:
+    """Return (and optionally write) the records and summary as JSON."""
+
+    output = json.dumps(
+        {"records": [r.to_dict() for r in records()], "summary": summary()}, indent=2
+    )
+    if filename:
+        with open(filename, "w") as json_file:
+            json_file.write(output)
+    return output
+
+
+def to_chrome_trace(filename: str = "") -> str:
+    """Return (and optionally write) the records in Chrome trace event
+    format, one complete ("X") event per span, times in microseconds."""
+
+    pid = os.getpid()
+    events = []
+    for record in records():
+        args = {"cpu_ms": round(record.cpu * 1000, 3)}
+        if record.alloc is not None:
+            args["alloc_bytes"] = record.alloc
+        if record.count is not None:
+            args["count"] = record.count
+        events.append({
+            "name": record.name,
+            "cat": record.category,
+            "ph": "X",
+            "ts": record.start * 1e6,
+            "dur": record.wall * 1e6,
+            "pid": pid,
+            "tid": record.thread,
+            "args": args,
+        })
+
+    output = json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+    if filename:
+        with open(filename, "w") as trace_file:
+            trace_file.write(output)
+    return output
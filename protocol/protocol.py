@@ -7,28 +7,48 @@
 #  */
 
 
-from typing import List, Iterable, Dict, Tuple, Sequence
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Iterable, Iterator, Dict, Optional, Tuple, Sequence, TextIO, Union
 import csv
-import pandas as pd
-import numpy as np
+import functools
+import io
+import logging
 import os
+import string
+import unicodedata
 
 # import sys
 # # Yes this is awful but it lets modules from sibling directories be imported https://docs.python.org/3/tutorial/modules.html#the-module-search-path
 # sys.path.insert(0,'../') # print('sys.path', sys.path)
 
 from script_gen_pipeline.protocol.instructions import Instruction, instr_to_txt, Temperature
+from script_gen_pipeline.protocol.picklists import PICKLIST_WRITERS
+from script_gen_pipeline.protocol import profiling
 from script_gen_pipeline.labware.containers import Container, Fridge, Layout, Well
+# Layout is redefined below for the robot deck, this is the plate Layout
+from script_gen_pipeline.labware.containers import Layout as ContainerLayout
+from script_gen_pipeline.labware.wells import (
+    COL_MAJOR, ROW_MAJOR, final_well, plate_shape, well_index, well_indices, well_name,
+    well_names)
 from script_gen_pipeline.protocol.biochem_utils import Reagent, Species
 from script_gen_pipeline.protocol.steps import Step, Setup, Pipette
+from script_gen_pipeline.protocol.deck import DeckMap, Labware, MODULE, PLATE, plan_runs
+from script_gen_pipeline.protocol.templates import render_script
+from script_gen_pipeline.protocol.tips import assembly_tips
 from script_gen_pipeline.labware.mix import Mix
 from script_gen_pipeline.designs.construct import Construct, Variant
 
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
 
 class Protocol:
-    def __init__(self, constructs: List[Construct] = [Construct()]):
+    def __init__(self, constructs: List[Construct] = None):
         self.name = ''
-        self.constructs = constructs  # the final construct to be built
+        self.constructs = constructs or []  # the final construct to be built
         self.steps: List[Step] = []  # list of steps for this assembly
         self.history: List[Subprotocols] = []  # history of steps run organized by subprotocol
 
@@ -41,7 +61,12 @@ class Protocol:
         To be updated within steps, so consider moving layout to
         Subprotocol """
 
-        print("NotImplem: Protocol init needs work")
+        self.plate_count = 0  # plates used by the instructions so far
+        self.separate_reagents = False
+        self.instruction_to_plate_count: Dict[Instruction, int] = {}
+        self.instruction_to_layout: Dict[Tuple[Instruction, bool], ContainerLayout] = {}
+
+        logger.debug("NotImplem: Protocol init needs work")
 
     # TODO: update this from old protocol
     def generate_ot_script(self, assay, template_script, **kwargs):
@@ -84,29 +109,53 @@ class Protocol:
         """
 
         self.instructions.append(instruction)
-        self.instruction_to_plate_count[instruction] = self.layout.plate_count 
+        self.instruction_to_plate_count[instruction] = self.plate_count
 
         # add any pippete-able Layout
         if instruction.transfers:
-            dest_containers = {t.dest for t in instruction.transfers}
+            dest_containers = instruction.transfers.dests()
             if all(not isinstance(c, Fridge) for c in dest_containers):
-                self.plate_count += len(
-                    Layout.from_instruction(
-                        instruction, separate_reagents=self.separate_reagents
-                    )
-                )
+                self.plate_count += len(self.instruction_layout(instruction))
+
+    def instruction_layout(
+        self, instruction: Instruction, src_containers: bool = False
+    ) -> ContainerLayout:
+        """Return the Layout of an instruction's transfers, built once and
+        cached for add_instruction, to_csv, to_picklists, etc.
+
+        Args:
+            instruction: an instruction with transfers, added to this protocol
+
+        Keyword Args:
+            src_containers: also map out the source containers, as picklists
+                need (default: {False})
+        """
+
+        key = (instruction, src_containers)
+        layout = self.instruction_to_layout.get(key)
+        if layout is None:
+            layout = ContainerLayout.from_instruction(
+                instruction,
+                src_containers=src_containers,
+                existing_plates=self.instruction_to_plate_count.get(instruction, 0),
+                separate_reagents=self.separate_reagents,
+            )
+            self.instruction_to_layout[key] = layout
+        return layout
 
     def run(self) -> "Protocol":
         """ Core running of a protocol """
 
-        # all input records, each start out assigned to a single Fridge source
-        records = [construct.get_all_modules() for construct in self.constructs]
+        with profiling.span(type(self).__name__, "protocol", count=len(self.constructs)):
+            # all input records, each start out assigned to a single Fridge source
+            records = [construct.get_all_modules() for construct in self.constructs]
 
-        # update containers
-        self.containers = [Fridge(r) for r in records]  # everything comes from fridge
+            # update containers
+            self.containers = [Fridge(r) for r in records]  # everything comes from fridge
 
-        for step in self.steps:
-            step(self)
+            for step in self.steps:
+                with profiling.span(type(step).__name__, "step"):
+                    step(self)
 
         return self
 
@@ -205,15 +254,33 @@ class Protocol:
         """Write CSV file(s) describing the containers/Layout after each step.
 
         Rows of Layout/containers are written in CSV format with each step's name as its heading.
+        Cells are written by csv.writer, so content names with commas are quoted,
+        eg. "Promega T4 DNA Ligase buffer, 10X".
 
         Args:
-            filename: The name of the CSV's name
+            filename: The name of the CSV's name. If given, each step's layout is
+                streamed into the file as it's reached
+
+        Returns:
+            The CSV if no filename is given (it's also written to the default
+            filename), else the name of the written CSV
         """
 
-        if not filename:
-            filename = self._filename() + ".csv"
+        if filename:
+            with open(filename, "w", newline="") as csvfile:
+                self._write_csv(csvfile)
+            return filename
+
+        handle = io.StringIO()
+        self._write_csv(handle)
+        csv_text = handle.getvalue()
+        with open(self._filename() + ".csv", "w", newline="") as csvfile:
+            csvfile.write(csv_text)
+        return csv_text
+
+    def _write_csv(self, handle: TextIO):
+        """Write each step's heading and Layout, see to_csv."""
 
-        csv = ""
         row = 0
         for instruction in self.instructions:
             if not instruction.transfers:
@@ -223,20 +290,12 @@ class Protocol:
             if not name and instruction.instructions:
                 name = instruction.instructions[0]
             row += 1
-            csv += f"{name}:\n" if name else f"Setup step {row}:\n"
-            csv += Layout.from_instruction(
-                instruction,
-                existing_plates=self.instruction_to_plate_count[instruction],
-                log_volume=row == 1,
-                separate_reagents=self.separate_reagents,
-            ).to_csv()
-
-        with open(filename, "w") as csvfile:
-            csvfile.write(csv)
+            handle.write(f"{name}:\n" if name else f"Setup step {row}:\n")
+            self.instruction_layout(instruction).write_csv(handle, log_volume=row == 1)
 
-        return csv
-
-    def to_picklists(self, filename: str = "", platform: str = "tecan"):
+    def to_picklists(
+        self, filename: str = "", platform: str = "tecan", max_workers: int = None
+    ) -> List[int]:
         """Create picklists for robotic pipetting.
 
         Supported platforms are `tecan`, `hamilton`, and `labcyte`.
@@ -251,15 +310,14 @@ class Protocol:
         Keyword Args:
             filename: Name of picklist file (default: {self.name})
             platform: Picklist platform (default: {"tecan"})
+            max_workers: threads writing picklists (default: {ThreadPoolExecutor's})
+
+        Returns:
+            The number of transfers written to each picklist
         """
 
-        picklist_generators = {
-            "tecan": to_tecan,
-            "hamilton": to_hamilton,
-            "labcyte": to_labcyte,
-        }
-        if platform not in picklist_generators:
-            picklist_platforms = ", ".join(picklist_generators.keys())
+        if platform not in PICKLIST_WRITERS:
+            picklist_platforms = ", ".join(PICKLIST_WRITERS.keys())
             raise ValueError(
                 f"'{platform}' is an unrecognized platform. Choose from: {picklist_platforms}"
             )
@@ -280,8 +338,8 @@ class Protocol:
             if not instruction.transfers:
                 continue
 
-            srcs = {t.src for t in instruction.transfers}
-            dests = {t.dest for t in instruction.transfers}
+            srcs = instruction.transfers.srcs()
+            dests = instruction.transfers.dests()
 
             def no_fridge(containers: Iterable[Container]) -> bool:
                 return all(not isinstance(s, Fridge) for s in containers)
@@ -299,13 +357,30 @@ class Protocol:
             fname, fext = os.path.splitext(filename)
             return fname + str(index + 1) + fext
 
-        for i, instruction in enumerate(picklist_instructions):
-            picklist = picklist_generators[platform](
-                instruction, self.instruction_to_plate_count[instruction]
-            )
+        writer = PICKLIST_WRITERS[platform]
+        # the cached layouts are shared by every platform, fill them before the threads
+        layouts = [
+            self.instruction_layout(instruction, src_containers=True)
+            for instruction in picklist_instructions
+        ]
 
-            with open(picklist_filename(i), "w") as picklist_file:
-                picklist_file.write(picklist)
+        def write_picklist(i: int, instruction: Instruction) -> int:
+            # stream the rows straight to the file
+            with open(picklist_filename(i), "w", newline="") as picklist_file:
+                return writer(
+                    instruction,
+                    self.instruction_to_plate_count[instruction],
+                    picklist_file,
+                    layout=layouts[i],
+                )
+
+        # each instruction's picklist is independent, write them concurrently
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(write_picklist, i, instruction)
+                for i, instruction in enumerate(picklist_instructions)
+            ]
+            return [future.result() for future in futures]
 
     def _check_output(self):
         """Verify that the Protocol has steps and that they have been run.
@@ -389,6 +464,10 @@ MAGBEAD_OUT_PATH = '2_purification.ot2.py'
 F_ASSEMBLY_OUT_PATH = '3_assembly.ot2.py'
 TRANS_SPOT_OUT_PATH = '4_transformation.ot2.py'
 basic_steps = [CLIP_OUT_PATH, MAGBEAD_OUT_PATH, F_ASSEMBLY_OUT_PATH, TRANS_SPOT_OUT_PATH]
+MAX_CONSTRUCTS = 96
+MAX_CLIPS = 48
+FINAL_ASSEMBLIES_PER_CLIP = 15
+CLIP_COLUMNS = ['prefixes', 'parts', 'suffixes']
 
 
 class Clip_Reaction(Protocol):
@@ -418,13 +497,16 @@ class Clip_Reaction(Protocol):
     def __call__(self, protocol: Protocol):
         """ Running a subprotocol """
 
-        initial_plates = self.make_clip_plates(protocol) 
+        with profiling.span("make_clip_plates") as span:
+            initial_plates = self.make_clip_plates(protocol) 
+            span.count = len(initial_plates)
         self.steps = [Setup(initial_plates, ),
                     Pipette(),
         ]
 
         for step in self.steps:
-            protocol = step(protocol)  # update the protocol at each step
+            with profiling.span(type(step).__name__, "step"):
+                protocol = step(protocol)  # update the protocol at each step
 
         return protocol
 
@@ -450,7 +532,7 @@ class Clip_Reaction(Protocol):
             construct = plate.add_wells(well_contents, well_volumes)  # add wells, return any remaining construct
 
             if plate.is_full():
-                print("NotImplem: layout indexing should be dict organized according to Container type")
+                logger.debug("NotImplem: layout indexing should be dict organized according to Container type")
                 self.layout[Plate.type].append(plate)
                 plate: Plate = Plate(protocol.parameters)
 
@@ -468,7 +550,7 @@ class Clip_Reaction(Protocol):
                 construct: single unique combination of Variants that make up 
                     an instance of a fully built construct  """
 
-            print("NotImplem: check that well creation makes sense in terms of Clip reaction")
+            logger.debug("NotImplem: check that well creation makes sense in terms of Clip reaction")
 
             mixed_wells: List[Container] = []
 
@@ -554,65 +636,6 @@ class Clip_Reaction(Protocol):
             return sorted(mixed_wells)
 
 
-class Plate(Container):
-    # Move to container.py
-    """ A plate holding a number of Wells """
-    def __init__(self, parameters: Dict = None):
-        super().__init__()
-        print("NotImplem: Plate class to contain Wells and deck nr")
-
-        # default
-        self.shape = (8, 12)
-        self.deck_pos = 0  
-        if parameters:
-            print("NotImplem: Get plate type and well num")
-            self.shape = (8, 12)
-            self.deck_pos = 0
-
-        # init 2D (nested) List
-        #self.wells: List[List[Container]] = [[None] * self.shape[1]] * self.shape[0]
-        self.wells: List[Container] = []
-        
-    def is_full(self):
-        """ Check if all wells have been filled """
-        print("Implem: checking that plate is full could done be better")
-        
-        for well in self.wells:
-            if isinstance(well, Container):
-                continue
-            else: 
-                return False
-        return True
-
-    def add_wells(self, well_contents, well_volumes):
-        """for wellrow, well_list in enumerate(self.wells):
-            for wellcol, well in enumerate(well_list):
-                if well == None:
-                    new_well = Well(contents=well_contents, volumes=well_volumes)
-                    self.wells[wellrow][wellcol] = new_well
-                    break
-                elif ((wellrow == self.shape[0]-1) and (wellcol == self.shape[1]-1)):
-                    raise RuntimeError(f"No space for new well")
-                else: 
-                    continue
-                
-        """
-        if len(self.wells < self.shape[0]*self.shape[1] - 1):
-            self.wells.append(Well(well_contents, well_volumes))
-        else:
-            raise RuntimeError(f"No more free wells.")
-    
-    def print_wells(self):
-        # how wells look
-        well_list = self.wells.copy()
-        norows = self.shape[0]
-        nocols = self.shape[1]
-        for row in range(norows - 1):
-            start = row*nocols
-            end = start + nocols - 1
-            print(well_list[start:end])
-
-
 class Setup(Step):
     def __init__(self):
         self.layout = Layout()
@@ -647,7 +670,7 @@ class Setup(Step):
 
         tipracks = [protocol.load_labware(tiprack_type, slot) for slot in slots]
         if PIPETTE_TYPE != 'p10_single':
-            print('Define labware must be changed to use', PIPETTE_TYPE)
+            logger.error("Define labware must be changed to use %s", PIPETTE_TYPE)
             exit()
         pipette = protocol.load_instrument('p10_single', PIPETTE_MOUNT, tip_racks=tipracks)
         pipette.start_at_tip(tipracks[0].well(INITIAL_TIP))
@@ -662,6 +685,47 @@ class Setup(Step):
 
 
 
+def process_construct(construct: List[str]) -> List[Tuple[str, str, str]]:
+    """Processes an individual construct into its CLIP reactions, each a
+    (prefix linker, part, suffix linker) tuple.
+    """
+
+    def interogate_linker(linker):
+        """Interogates linker to determine if the suffix linker is a UTR
+        linker.
+        """
+        if len(linker) >= 4:
+            if linker[:3] == 'UTR':
+                return linker[:4] + '-S'
+        else:
+            return linker + "-S"
+
+    clips = []
+    for i, sequence in enumerate(construct):
+        if i % 2 != 0:
+            if i == len(construct) - 1:
+                suffix_linker = interogate_linker(construct[0])
+            else:
+                suffix_linker = interogate_linker(construct[i + 1])
+            clips.append((construct[i - 1] + '-P', sequence, suffix_linker))
+    return clips
+
+
+def iter_construct_clips(path) -> Iterator[List[Tuple[str, str, str]]]:
+    """Streams a constructs csv row by row, yielding the CLIP reactions of
+    each construct (see process_construct) as it is read. Nothing but the
+    current row is held in memory.
+    """
+    with open(path, 'r') as csvfile:
+        csv_reader = csv.reader(csvfile)
+        for index, construct in enumerate(csv_reader):
+            if index != 0:  # Checks if row is header.
+                construct = list(filter(None, construct))
+                if not construct[1:]:
+                    break
+                yield process_construct(construct[1:])
+
+
 class Subprotocol(Protocol):
     """ A subprotocol is equivalent to one run on a liquid handler
     without human input necessary. The actual steps of the protocol are
@@ -680,7 +744,7 @@ class Subprotocol(Protocol):
         # self.template_script = self._get_template()
 
     def _get_template(self):
-        print("NotImplem: connect script template creation to BASIC")
+        logger.debug("NotImplem: connect script template creation to BASIC")
         if self.name == str(basic_steps[0]):
             return 'assembly_template.py'
         if self.name == str(basic_steps[1]):
@@ -694,74 +758,50 @@ class Subprotocol(Protocol):
             return ''
 
     def generate_constructs_list(self, path):
-        """Generates a list of dataframes corresponding to each construct. Each 
-        dataframe lists components of the CLIP reactions required.
+        """Yields a dataframe for each construct as its row is read. Each
+        dataframe lists components of the CLIP reactions required. Only the
+        current construct is held, use list() for all of them at once.
         """
+        import pandas as pd  # deferred, pandas is slow to import
 
-        def process_construct(construct):
-            """Processes an individual construct into a dataframe of CLIP reactions
-            outlining prefix linkers, parts and suffix linkers.
-            """
+        for count, clips in enumerate(iter_construct_clips(path), 1):
+            # Errors
+            if count > MAX_CONSTRUCTS:
+                raise ValueError(
+                    'Number of constructs exceeds maximum. Reduce construct number in construct.csv.')
+            yield pd.DataFrame(clips, columns=CLIP_COLUMNS)
 
-            def interogate_linker(linker):
-                """Interogates linker to determine if the suffix linker is a UTR
-                linker.
-                """
-                if len(linker) >= 4:
-                    if linker[:3] == 'UTR':
-                        return linker[:4] + '-S'
-                else:
-                    return linker + "-S"
-
-            clips_info = {'prefixes': [], 'parts': [],
-                        'suffixes': []}
-            for i, sequence in enumerate(construct):
-                if i % 2 != 0:
-                    clips_info['parts'].append(sequence)
-                    clips_info['prefixes'].append(
-                        construct[i - 1] + '-P')
-                    if i == len(construct) - 1:
-                        suffix_linker = interogate_linker(construct[0])
-                        clips_info['suffixes'].append(suffix_linker)
-                    else:
-                        suffix_linker = interogate_linker(construct[i + 1])
-                        clips_info['suffixes'].append(suffix_linker)
-            return pd.DataFrame.from_dict(clips_info)
-
-        constructs_list = []
-        with open(path, 'r') as csvfile:
-            csv_reader = csv.reader(csvfile)
-            for index, construct in enumerate(csv_reader):
-                if index != 0:  # Checks if row is header.
-                    construct = list(filter(None, construct))
-                    if not construct[1:]:
-                        break
-                    else:
-                        constructs_list.append(process_construct(construct[1:]))
+    def generate_clip_counts(self, path, max_constructs: int = MAX_CONSTRUCTS):
+        """Streams the constructs csv and folds each construct's CLIP
+        reactions into a running counter as its row arrives, so memory is
+        bounded by the number of unique CLIPs rather than constructs.
 
-        # Errors
-        if len(constructs_list) > MAX_CONSTRUCTS:
-            raise ValueError(
-                'Number of constructs exceeds maximum. Reduce construct number in construct.csv.')
-        else:
-            return constructs_list
+        Args:
+            path: constructs csv
+            max_constructs: raise once more constructs than this are read,
+                None for no limit (eg. when sharding across robot runs)
 
+        Returns:
+            Counter of (prefix, part, suffix) -> number of constructs using
+            it, in first-seen order, and the number of constructs read
+        """
+        clip_counts: Counter = Counter()
+        construct_count = 0
+        for clips in iter_construct_clips(path):
+            clip_counts.update(clips)
+            construct_count += 1
+            if max_constructs is not None and construct_count > max_constructs:
+                raise ValueError(
+                    'Number of constructs exceeds maximum. Reduce construct number in construct.csv.')
+        return clip_counts, construct_count
+
+    @staticmethod
     def calculate_final_assembly_tipracks(final_assembly_dict):
-        """Calculates the number of final assembly tipracks required ensuring
-        no more than MAX_FINAL_ASSEMBLY_TIPRACKS are used.
+        """Calculates the number of final assembly tipracks by replaying the
+        template's tip pick-ups (see tips.assembly_tips). Raises ValueError
+        if they don't fit in the candidate tiprack slots.
         """
-        final_assembly_lens = []
-        for values in final_assembly_dict.values():
-            final_assembly_lens.append(len(values))
-        master_mix_tips = len(list(set(final_assembly_lens)))
-        total_tips = master_mix_tips + sum(final_assembly_lens)
-        final_assembly_tipracks = total_tips // 96 + (
-            1 if total_tips % 96 > 0 else 0)
-        if final_assembly_tipracks > MAX_FINAL_ASSEMBLY_TIPRACKS:
-            raise ValueError(
-                'Final assembly tiprack number exceeds number of slots. Reduce number of constructs in constructs.csv')
-        else:
-            return final_assembly_tipracks
+        return assembly_tips(final_assembly_dict).tiprack_num
 
     def generate_spotting_tuples(constructs_list, spotting_vols_dict):
         """Using constructs_list, generates a spotting tuple
@@ -795,44 +835,17 @@ class Subprotocol(Protocol):
     def __str__(self):
         return self.name
 
+    @staticmethod
     def generate_ot2_script(ot2_script_path, template_path, **kwargs):
         """Generates an ot2 script named 'ot2_script_path', where kwargs are 
         written as global variables at the top of the script. For each kwarg, the 
         keyword defines the variable name while the value defines the name of the 
-        variable. The remainder of template file is subsequently written below.        
+        variable. The remainder of template file is subsequently written below.
+        The template is parsed once and cached (see templates.load_template).
         """
-        print("output location of ot2_script_path:{}".format(ot2_script_path))
-        print(os.path.realpath(ot2_script_path))
-        this_object_output_path = os.path.realpath(ot2_script_path)
-
-        # current_path = os.getcwd()
-        # remove_example = os.path.split("my_examples")
-        # writing_path = os.path.join(current_path, "output")
-        # output_path = os.path.join(writing_path, ot2_script_path)
-        
-        with open(ot2_script_path, 'w') as wf:
-            with open(template_path, 'r') as rf:
-                for index, line in enumerate(rf):
-                    if line[:3] == 'def':
-                        function_start = index
-                        break
-                    else:
-                        wf.write(line)
-                for key, value in kwargs.items():
-                    wf.write('{}='.format(key))
-                    if type(value) == dict:
-                        wf.write(json.dumps(value))
-                    elif type(value) == str:
-                        wf.write("'{}'".format(value))
-                    else:
-                        wf.write(str(value))
-                    wf.write('\n')
-                wf.write('\n')
-            with open(template_path, 'r') as rf:
-                for index, line in enumerate(rf):
-                    if index >= function_start - 1:
-                        wf.write(line)
-        return this_object_output_path
+        logger.info("output location of ot2_script_path: %s (%s)",
+                    ot2_script_path, os.path.realpath(ot2_script_path))
+        return render_script(ot2_script_path, template_path, **kwargs)
 
 
 class Clone(Protocol):
@@ -855,7 +868,8 @@ class Basic(Protocol):
     """
 
     def __init__(self, construct: Construct):
-        super().__init__(construct)
+        super().__init__([construct])
+        self.construct = construct
 
         # Get parameters based on equipment chosen
         self.parameters = {
@@ -881,19 +895,33 @@ class Basic(Protocol):
             raise NotImplementedError
 
 
-CLIP_MIX = Mix(
-    {Reagent("master mix"): 4.0, Variant: 2.0},
-    fill_with=Reagent("water"),
-    fill_to=20.0,
-)
-"""Mix(
-    {Reagent("Promega T4 DNA Ligase buffer, 10X"): T4_BUFF_VOL, 
-    Reagent("NEB BsaI-HFv2"): BSAI_VOL, 
-    Reagent("Promega T4 DNA Ligase"): T4_LIG_VOL, 
-    Module: DEFAULT_PART_VOL, Module: DEFAULT_PART_VOL, 
-    Module: DEFAULT_PART_VOL}, 
-    fill_with=Reagent("water"), fill_to=CLIP_VOL,
-) """
+@functools.lru_cache(maxsize=None)
+def clip_mix() -> Mix:
+    """Return CLIP_MIX, made on first use rather than at import.
+
+    CLIP_MIX should become
+    Mix(
+        {Reagent("Promega T4 DNA Ligase buffer, 10X"): T4_BUFF_VOL, 
+        Reagent("NEB BsaI-HFv2"): BSAI_VOL, 
+        Reagent("Promega T4 DNA Ligase"): T4_LIG_VOL, 
+        Module: DEFAULT_PART_VOL, Module: DEFAULT_PART_VOL, 
+        Module: DEFAULT_PART_VOL}, 
+        fill_with=Reagent("water"), fill_to=CLIP_VOL,
+    )
+    """
+
+    return Mix(
+        {Reagent("master mix"): 4.0, Variant: 2.0},
+        fill_with=Reagent("water"),
+        fill_to=20.0,
+    )
+
+
+def __getattr__(name: str):
+    # module level objects made on first access
+    if name == "CLIP_MIX":
+        return clip_mix()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Clip_Reaction(Subprotocol):
@@ -920,13 +948,15 @@ class Clip_Reaction(Subprotocol):
     def __init__(self, name='Clip', parameters: Dict = {}):
         super().__init__(name, parameters)
 
-        self.mix = CLIP_MIX
-        print("[Clip] NotImplem: init parameters to be defined")
+        self.mix = clip_mix()
+        logger.debug("[Clip] NotImplem: init parameters to be defined")
 
     def __call__(self, protocol: Protocol):
         """ Running a subprotocol """
 
-        self.target_clip_wells = self.make_clip_plates(protocol)
+        with profiling.span("make_clip_plates") as span:
+            self.target_clip_wells = self.make_clip_plates(protocol)
+            span.count = len(self.target_clip_wells)
         # self.layout.make_layout(self.init_clip_wells)
 
         # TODO: Test that layout updated in make_clip_plates
@@ -935,7 +965,8 @@ class Clip_Reaction(Subprotocol):
                       ]
 
         for step in self.steps:
-            protocol = step(protocol)  # update the protocol at each step
+            with profiling.span(type(step).__name__, "step"):
+                protocol = step(protocol)  # update the protocol at each step
 
         return protocol
 
@@ -947,13 +978,15 @@ class Clip_Reaction(Subprotocol):
         Returns:
             List of all wells for this protocol
         """
-        print("When making plates for the reaction, include handling for \
-            constructs that don't fit in this protocol (assuming 48 parts)")
+        logger.debug("When making plates for the reaction, include handling for "
+                     "constructs that don't fit in this protocol (assuming 48 parts)")
 
         # Validate
         protocol.construct.check_module_order()  # Check that modules are ordered
 
-        unique_constructs = protocol.construct.get_unique_constructs()  # Get assemblies
+        # Get assemblies. This is a lazy CombinatorialSpace, constructs are
+        # decoded one at a time below rather than held as a full product
+        unique_constructs = protocol.construct.get_unique_constructs()
 
         target_clip_wells: List[Well] = []
         """ Contains all wells needed for this run. Each element is list of
@@ -978,18 +1011,18 @@ class Clip_Reaction(Subprotocol):
         construct: single unique combination of Variants that make up 
             an instance of a fully built construct """
 
-        print("[make_clip_wells] check that well creation makes sense for Clip protocol")
+        logger.debug("[make_clip_wells] check that well creation makes sense for Clip protocol")
 
         mixed_wells: List[Container] = []
         clip_parts = self.get_construct_as_clips(construct)  # rearrange construct
 
-        for clip_part in clip_parts:
-            # add reaction mix and water
-            # TODO: define Clip reaction mix for each well
-            well_contents, well_volumes = self.mix(clip_part)
+        # add reaction mix and water to all clip wells at once
+        # TODO: define Clip reaction mix for each well
+        contents, volumes, offsets = self.mix.batch(clip_parts)
 
+        for start, end in zip(offsets, offsets[1:]):
             # create a well that mixes the assembly mix, plasmids, and reagents
-            well = Well(contents=well_contents, volumes=well_volumes)
+            well = Well(contents=contents[start:end], volumes=volumes[start:end])
 
             mixed_wells.append(well)
 
@@ -1032,98 +1065,227 @@ class Clip_Reaction(Subprotocol):
 
 
 class Plate(Container):
-    # Move to container.py
-    """ A plate holding a number of Wells """
-    def __init__(self, parameters: Dict = None):
+    """A plate of Wells on a fixed rows x cols grid.
+
+    Wells are held in an object array of the plate's shape (None where
+    free). An occupancy bitmap and a cursor over the grid in fill order
+    make add_well, next_free and is_full O(1), amortised when wells are
+    also placed at set positions. Well indices are row-major from 0
+    whatever the fill order, eg. 'B1' is index 12 on a 96 well plate.
+
+    Keyword Args:
+        parameters: protocol parameters, 'plate_wells' and 'fill_order'
+            override wells and order (default: {None})
+        wells: number of wells, one of PLATE_SHAPES in labware.wells (default: {96})
+        order: 'row' to fill A1, A2.. or 'col' to fill A1, B1.. as
+            DNABot's final_well does (default: {'col'})
+    """
+    def __init__(self, parameters: Dict = None, wells: int = 96, order: str = COL_MAJOR):
+        import numpy as np  # deferred, numpy is slow to import
+
         super().__init__()
-        print("NotImplem: Plate class to contain Wells and deck nr")
-        
-        self.name = 'Control'
 
-        # default
-        self.shape = (8, 12)
+        self.name = 'Control'
         self.deck_pos = 0
-        # should get plate labels from parameters
-        self.rows = ['A','B','C','D','E','F','G','H']
         if parameters:
-            print("[Plate init] NotImplem: Get plate type and well num")
-            self.shape = (8, 12)
-            self.deck_pos = 0
-
-        # init 2D (nested) List
-        self.wells: List[List[Container]] = [[None] * self.shape[1]] * self.shape[0]
-        
-    def is_full(self):
+            wells = parameters.get('plate_wells', wells)
+            order = parameters.get('fill_order', order)
+        if order not in (ROW_MAJOR, COL_MAJOR):
+            raise ValueError(f"Fill order must be {ROW_MAJOR!r} or {COL_MAJOR!r}, not {order!r}")
+
+        self.shape = plate_shape(wells)
+        self.rows, self.cols = self.shape
+        self.order = order
+        self.wells = np.empty(self.shape, dtype=object)
+        self._occupied = np.zeros(wells, dtype=bool)
+        grid = np.arange(wells).reshape(self.shape)
+        self._fill_order = (grid if order == ROW_MAJOR else grid.T).ravel()
+        self._cursor = 0  # no free wells before this position in fill order
+        self._count = 0
+
+    @property
+    def size(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def count(self) -> int:
+        """Number of wells filled."""
+        return self._count
+
+    def is_full(self) -> bool:
         """ Check if all wells have been filled """
-        print("Implem: checking that plate is full could done be better")
-        
-        for well in self.wells:
-            if isinstance(well, Container):
-                continue
-            else: 
-                return False
-        return True
+        return self._count >= self.size
+
+    def next_free(self) -> Optional[int]:
+        """Index of the next free well in fill order, None if full."""
+        while self._cursor < self.size:
+            index = int(self._fill_order[self._cursor])
+            if not self._occupied[index]:
+                return index
+            self._cursor += 1
+        return None
+
+    def add_well(self, well: Container, index: Union[int, str] = None) -> int:
+        """Put a Well in the next free well, or at index (or name) if given.
+
+        Returns:
+            The index of the well it was put in
+        """
+        if index is None:
+            index = self.next_free()
+            if index is None:
+                raise RuntimeError(f"No more free wells on {self.name} plate")
+        elif isinstance(index, str):
+            index = self.well_index(index)
+        if self._occupied[index]:
+            raise ValueError(f"Well {self.well_name(index)} is already filled")
+
+        self.wells.flat[index] = well
+        self._occupied[index] = True
+        self._count += 1
+        return index
 
     # TESTED: 27.07.20
-    def add_wells(self, remaining_wells: List[List[Well]]):
-        """ Fill the Plate with the input Wells by row """
-        row_count = 0
-        col_count = 0
-        for i in range(len(remaining_wells)):
-            added_well = remaining_wells[i].pop(0)
-            if not self.wells[row_count][col_count]:
-                self.wells[row_count][col_count] = added_well
-                col_count += 1
-                if col_count >= self.shape[1]:
-                    col_count = 0
-                    row_count += 1
-                    if row_count >= self.shape[0]:
-                        break
-
-        print(len(remaining_wells), 'constructs moved to next plate')
+    def add_wells(self, remaining_wells: List[List[Well]]) -> List[List[Well]]:
+        """ Fill the Plate with each construct's Wells, in fill order.
+
+        A construct's wells are kept on one plate: if they do not all fit,
+        it and the constructs after it are returned for the next plate.
+        Only a construct too big for an empty plate is split across plates.
+
+        Returns:
+            The wells of each construct that did not fit
+        """
+        for i, wells in enumerate(remaining_wells):
+            free = self.size - self._count
+            if len(wells) > free:
+                if self._count:
+                    remaining_wells = remaining_wells[i:]
+                else:
+                    for well in wells[:free]:
+                        self.add_well(well)
+                    remaining_wells = [wells[free:]] + remaining_wells[i + 1:]
+                break
+            for well in wells:
+                self.add_well(well)
+        else:
+            remaining_wells = []
+
+        if remaining_wells:
+            logger.info("%d constructs moved to next plate", len(remaining_wells))
         return remaining_wells
 
+    def well(self, index: Union[int, str]) -> Optional[Container]:
+        """The Well at an index or name, None if free."""
+        if isinstance(index, str):
+            index = self.well_index(index)
+        return self.wells.flat[index]
+
+    def filled_wells(self) -> List[Container]:
+        """The Wells on the plate, in fill order."""
+        return [self.wells.flat[i] for i in self._fill_order[self._occupied[self._fill_order]]]
+
+    def well_name(self, index: int) -> str:
+        """Name of the well at an index, eg. 13 -> 'B2' on a 96 well plate."""
+        return well_name(index, self.size)
+
+    def well_index(self, name: str) -> int:
+        """Index of a well by name, eg. 'B2' -> 13 on a 96 well plate."""
+        return well_index(name, self.size)
+
+    def well_names(self, indices: Iterable[int]) -> "np.ndarray":
+        """Names of the wells at an array of indices."""
+        return well_names(indices, self.size)
+
+    def well_indices(self, names: Iterable[str]) -> "np.ndarray":
+        """Indices of an array of well names."""
+        return well_indices(names, self.size)
+
 
 class Layout:
-    """ Handles movement of reagents and materials in a protocol """
+    """ Handles movement of reagents and materials in a protocol.
+
+    Plates, tipracks, tube racks and modules added to the layout are
+    assigned to deck slots with deck.plan_runs, spilling into further
+    runs of the robot when one deck is full. The plan is made when runs
+    or robot_deck are first read after a change.
+    """
     def __init__(self, parameters: Dict = None):
+        self.parameters = parameters or {}
         self.plate_count = 0
-        self.robot_deck = self.init_deck(parameters)
-        self.overflow_wells: List[List[Well]] = [[]]
+        self.labware: List[Labware] = []
+        self.overflow_wells: List[List[Well]] = []
+        self._runs: Optional[List[DeckMap]] = None
+        self.num_slots = self.init_deck(parameters)
 
-    def init_deck(self, parameters):
+    def init_deck(self, parameters) -> int:
         """ Initialise a deck for one liquid handler.
         Returns:
-            slots: unit of space that can hold a Container """
-        print("[make_deck] NotImplem")
-        num_slots = parameters['NUM_SLOTS'] if parameters else 12  # OT has 12 default slots
-
-        # robot_deck: Dict[int, Container] = {}
-        robot_deck: List[Container] = [[None]]*num_slots
-        robot_deck[0] = Plate()
+            num_slots: units of space that can hold a Container """
+        return parameters['NUM_SLOTS'] if parameters else 12  # OT has 12 default slots
+
+    @property
+    def runs(self) -> List[DeckMap]:
+        """Deck map of each run needed for all the labware."""
+        if self._runs is None:
+            self._runs = plan_runs(self.labware, self.parameters)
+            for deck_map in self._runs:
+                for slot, stack in deck_map.slots.items():
+                    for item in stack:
+                        if hasattr(item.content, 'deck_pos'):
+                            item.content.deck_pos = int(slot)
+        return self._runs
+
+    @property
+    def robot_deck(self) -> List[Container]:
+        """ What is in each slot of the first run, by slot index (slot 1
+        at 0), top of the stack if labware sits on a module, else None """
+        robot_deck: List[Container] = [None] * self.num_slots
+        for slot, stack in self.runs[0].slots.items():
+            if stack:
+                top = stack[-1]
+                robot_deck[int(slot) - 1] = top if top.content is None else top.content
+        return robot_deck
 
-        self.plate_count += sum(isinstance(p, Plate) for p in robot_deck)
+    def add(self, labware: Labware) -> Labware:
+        """ Add labware to the deck, it's given a slot on the next plan """
+        self.labware.append(labware)
+        self._runs = None
+        return labware
 
-        print("[Layout] NotImplem: layout indexing should be dict organized according to Container type")
-
-        return robot_deck
+    def add_module(self, name: str, content: Container = None) -> Labware:
+        """ Add a module (eg. 'magdeck', 'tempdeck') to every run, in its
+        slot from deck.module_slots """
+        return self.add(Labware(name, MODULE, content=content))
 
     def make_layout(self, wells: List[List[Well]]):
-        """ Make the protocol's layout from input list of wells. """
+        """ Make the protocol's layout from input list of wells.
+        Each construct's wells are kept on one plate, plates are added
+        until every construct has its wells. """
         remaining_wells = wells
-        for plate in ((i, p) for (i, p) in enumerate(self.robot_deck) if isinstance(p, Plate)):
-            """ plate: (slot_index, plate_from_slot) """
-            deck_index = plate[0]
-            if remaining_wells:
-                remaining_wells = plate.add_wells(remaining_wells)
-                self.robot_deck[deck_index] = plate
-
-        self.overflow = remaining_wells
-
-    def append(self, plate: Plate):
-        """ Fill the last free Plate in the robot_deck with input plate """
-        print("[layout append] NotImplem: add input plate to robot deck")
-        plate 
+        while remaining_wells:
+            plate = Plate(self.parameters)
+            remaining_wells = plate.add_wells(remaining_wells)
+            self.append(plate)
+
+        self.overflow_wells = []
+
+    def append(self, plate: Plate, slots: Sequence[str] = None, every_run: bool = False,
+               on: str = None) -> Labware:
+        """ Add a Plate to the deck, on the first run with a free slot.
+
+        Keyword Args:
+            slots: slots the plate may go in, eg. SOURCE_DECK_POS (default: {any})
+            every_run: the plate is needed on every run (default: {False})
+            on: module the plate sits on, eg. 'magdeck' (default: {None})
+        """
+        self.plate_count += 1
+        return self.add(Labware(f"Plate:{self.plate_count}", PLATE, slots=slots,
+                                every_run=every_run, on=on, content=plate))
+
+    def deck_maps(self) -> List[Dict]:
+        """ Slots of each run's labware, by labware name """
+        return [deck_map.to_dict() for deck_map in self.runs]
 
 
 class Well(Container):
@@ -8,13 +8,16 @@
 
 """Steps: lab processes to assemble a design."""
 
-from collections import defaultdict
+import logging
 from typing import Sequence, List, Dict, Optional, Callable
 
 from script_gen_pipeline.labware.containers import content_id, Content, Container, Fridge
 from script_gen_pipeline.protocol.instructions import Instruction, Temperature, Transfer
+from script_gen_pipeline.protocol.packing import Packing, group_volumes, pack_volumes
 from script_gen_pipeline.protocol.biochem_utils import Reagent, Species
 
+logger = logging.getLogger(__name__)
+
 
 class Step:
     """A single Step of a Protocol. Taken
@@ -43,6 +46,8 @@ class Setup(Step):
         dest: the type of target container (default: {first target container})
         name: the name of this step in the protocol
         instructions: extra instructions to add to this step,
+        packings: after running, how each content's volumes were packed
+            into setup containers, by content id
     """
 
     def __init__(
@@ -59,44 +64,58 @@ class Setup(Step):
 
         self.target = target
         if isinstance(target[0], list):
-            print("[Setup] Target og a List[Container] and now List[List[Container]]")
+            logger.debug("[Setup] Target og a List[Container] and now List[List[Container]]")
         self.dest = dest
         self.name = name
         self.instructions = instructions if instructions else []
+        self.packings: Dict[str, Packing] = {}
+
+    def packing_efficiency(self) -> float:
+        """Share of all setup containers' volume that is transferred on,
+        ie. not dead volume or left unused."""
+
+        capacity = sum(len(p) * p.volume_max for p in self.packings.values())
+        if capacity <= 0:
+            return 1.0
+        return sum(sum(map(sum, p.bins)) for p in self.packings.values()) / capacity
 
     def __call__(self, protocol: "Protocol"):
         """Create setup containers with enough contents to fill the target containers."""
 
-        # accumulate the list of transfer volumes necessary
-        id_to_content: Dict[str, Content] = {}
-        id_to_volumes: Dict[str, List[float]] = defaultdict(list)
+        # flatten the transfer volumes necessary into (content code, volume)
+        id_to_code: Dict[str, int] = {}
+        contents: List[Content] = []
+        codes: List[int] = []
+        volumes: List[float] = []
         # for container in self.target:
         for construct in self.target:
             for container in construct:
                 for i, content in enumerate(container):
                     cid = content_id(content)
-                    id_to_content[cid] = content
-                    id_to_volumes[cid].append(container.volumes[i])
+                    code = id_to_code.get(cid)
+                    if code is None:
+                        code = id_to_code[cid] = len(contents)
+                        contents.append(content)
+                    codes.append(code)
+                    volumes.append(container.volumes[i])
+        totals, code_volumes = group_volumes(codes, volumes, len(contents))
 
         # create the setup containers and transfers based on volume/count
         container = self.dest or (self.target[0][0] if isinstance(self.target[0], list) else self.target[0])
         volume_max = container.volume_max
+        volume_dead = max(container.volume_dead, 0)
         setup: List[Container] = []
-        for cid, content in id_to_content.items():
-            volumes = id_to_volumes[cid]
-
-            new_container = container.create(
-                content, volumes=[volumes.pop() + container.volume_dead]
-            )
-            while volumes:
-                volume = volumes.pop()
-
-                if new_container.volume() + volume > volume_max:
-                    setup.append(new_container)
-                    new_container = container.create(content, volumes=[volume])
-
-                new_container.volumes[0] += volume
-            setup.append(new_container)
+        self.packings = {}
+        for cid, code in id_to_code.items():
+            if volume_max <= 0 or totals[code] + volume_dead <= volume_max:
+                # it all fits in one container, nothing to pack
+                packing = Packing([code_volumes[code].tolist()], volume_max, volume_dead)
+            else:
+                # fewest containers for this content, each with its dead volume
+                packing = pack_volumes(code_volumes[code].tolist(), volume_max, volume_dead)
+            self.packings[cid] = packing
+            for volume in packing.volumes:
+                setup.append(container.create(contents[code], volumes=[volume]))
 
         # make a transfer to fill each setup container
         transfers = [Transfer(src=Fridge(c), dest=c, volume=c.volume()) for c in setup]
@@ -0,0 +1,88 @@
+"""Rendering of OT-2 scripts from the DNAbot template scripts.
+
+Each template is parsed once into a header (everything above the first
+top-level def), the injection point where kwargs are written as globals,
+and a body. Parsed templates are cached by path and modification time, so
+rendering many scripts from the same template never re-reads the file.
+"""
+
+import json
+import os
+from typing import Dict, Tuple
+
+TEMPLATE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'dna_bot_utils', 'template_ot2_scripts')
+"""Directory holding the DNAbot OT-2 template scripts."""
+
+
+class Template:
+    """An OT-2 template script split at its injection point.
+
+    Args:
+        path: path of the template file
+        text: contents of the template file
+    """
+
+    def __init__(self, path: str, text: str):
+        self.path = path
+
+        lines = text.splitlines(keepends=True)
+        function_start = next(
+            (i for i, line in enumerate(lines) if line[:3] == 'def'), None)
+        if function_start is None:
+            raise ValueError(f"template {path} has no top-level def to inject before")
+
+        self.header = ''.join(lines[:function_start])
+        # the line above the def (usually blank) is repeated after the kwargs
+        self.body = ''.join(lines[max(function_start - 1, 0):])
+
+    def render(self, **kwargs) -> str:
+        """Return the script with each kwarg written as a global variable
+        between the header and the body."""
+
+        chunks = [self.header]
+        for key, value in kwargs.items():
+            chunks.append(f'{key}={format_value(value)}\n')
+        chunks.append('\n')
+        chunks.append(self.body)
+        return ''.join(chunks)
+
+
+_template_cache: Dict[str, Tuple[int, Template]] = {}
+
+
+def format_value(value) -> str:
+    """Python source for a kwarg value injected into a template."""
+
+    if type(value) == dict:
+        return json.dumps(value)
+    if type(value) == str:
+        return "'{}'".format(value)
+    return str(value)
+
+
+def load_template(template_path: str) -> Template:
+    """Return the parsed template, re-reading the file only if it changed."""
+
+    path = os.path.realpath(template_path)
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _template_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'r') as rf:
+        template = Template(path, rf.read())
+    _template_cache[path] = (mtime, template)
+    return template
+
+
+def render_script(ot2_script_path: str, template_path: str, **kwargs) -> str:
+    """Render template_path with kwargs into ot2_script_path in a single
+    write. Returns the real path of the written script."""
+
+    script = load_template(template_path).render(**kwargs)
+    with open(ot2_script_path, 'w') as wf:
+        wf.write(script)
+    return os.path.realpath(ot2_script_path)
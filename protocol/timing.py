@@ -0,0 +1,325 @@
+"""Deck-time estimates for generated BASIC protocols.
+
+Walks the same data the OT-2 templates consume (clips_dict, sample_number,
+final_assembly_dict and spotting_tuples) and prices every tip change,
+aspirate, dispense and mix the templates would perform, plus the fixed
+protocol.delay incubations. Used to compare batch sizes by constructs per
+robot-hour.
+
+When a run is planned for the p10 multi-channel (multichannel_transfers),
+each planned transfer is priced as one pipetting step whether it moves one
+well or a whole column of 8.
+
+Pauses that wait on a human (protocol.pause) are counted, not timed.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+from script_gen_pipeline.protocol.protocol import (
+    CLIP_OUT_PATH, MAGBEAD_OUT_PATH, F_ASSEMBLY_OUT_PATH, TRANS_SPOT_OUT_PATH)
+
+P10_MAX_VOL = 10
+P300_MAX_VOL = 300
+MINUTE = 60
+
+# Settings mirrored from dna_bot_utils/template_ot2_scripts
+CLIP_MASTER_MIX_VOLUME = 20
+CLIP_LINKER_MIX_REPS = 1
+CLIP_PART_MIX_REPS = 4
+
+MAGBEAD_SAMPLE_VOLUME = 30
+MAGBEAD_BEAD_RATIO = 1.8
+MAGBEAD_DEAD_TOTAL_VOL = 5
+MAGBEAD_ELUTION_VOLUME = 40
+MAGBEAD_ETHANOL_VOL = 150
+MAGBEAD_ETHANOL_DEAD_VOL = 50
+MAGBEAD_BEAD_MIX_REPS = 5
+MAGBEAD_IMMOBILISE_MIX_REPS = 10
+MAGBEAD_ELUTION_MIX_REPS = 20
+MAGBEAD_DELAYS = {'incubation': 5, 'settling': 2, 'wash': 0.5, 'wash_2': 0.5,
+                  'drying': 5, 'elution': 2, 'elutant_separation': 1}
+"""protocol.delay calls in purification_template.py, in minutes."""
+
+ASSEMBLY_TOTAL_VOL = 15
+ASSEMBLY_PART_VOL = 1.5
+ASSEMBLY_MIX_REPS = 1
+
+TRANSFORMATION_ASSEMBLY_VOL = 5
+TRANSFORMATION_MIX_REPS = 4
+TRANSFORMATION_SOC_VOL = 125
+TRANSFORMATION_SOC_MIX_REPS = 4
+TRANSFORMATION_RESUSPEND_MIX_REPS = 4
+TRANSFORMATION_MAX_SPOT_VOL = 5
+TRANSFORMATION_DELAYS = {'incubation': 20, 'outgrowth': 60}
+"""protocol.delay calls in transformation_template.py, in minutes."""
+
+
+class TimingModel:
+    """Seconds taken by each OT-2 primitive.
+
+    The defaults are rough figures for an OT-2 at default head speeds and
+    can be calibrated against timed runs.
+
+    Keyword Args:
+        pick_up_tip: move to the tiprack and pick up a tip
+        drop_tip: move to the trash and drop the tip
+        aspirate: move to the source and aspirate
+        dispense: move to the destination and dispense
+        mix_cycle: one aspirate/dispense cycle of a mix
+        blow_out: blow out at the current location
+        move: a single head move without liquid handling
+        spot: slow dispense and agar stab of one transformation spot
+        module: set a module state (magnet engage, deck temperature
+            already in range)
+        temperature_change: wait for a temperature module to reach a new
+            target
+    """
+
+    def __init__(
+        self,
+        pick_up_tip: float = 5.0,
+        drop_tip: float = 4.0,
+        aspirate: float = 3.0,
+        dispense: float = 3.0,
+        mix_cycle: float = 1.5,
+        blow_out: float = 1.0,
+        move: float = 1.0,
+        spot: float = 6.0,
+        module: float = 3.0,
+        temperature_change: float = 180.0,
+    ):
+        self.pick_up_tip = pick_up_tip
+        self.drop_tip = drop_tip
+        self.aspirate = aspirate
+        self.dispense = dispense
+        self.mix_cycle = mix_cycle
+        self.blow_out = blow_out
+        self.move = move
+        self.spot = spot
+        self.module = module
+        self.temperature_change = temperature_change
+
+    def tip(self) -> float:
+        """Fetch a fresh tip and discard it afterwards."""
+        return self.pick_up_tip + self.drop_tip
+
+    def liquid(self, volume: float, max_volume: float,
+               mix_reps: int = 0, blow_out: bool = False) -> float:
+        """Move volume from one well to another, splitting it into as many
+        aspirate/dispense trips as the pipette's max_volume requires."""
+        trips = max(math.ceil(volume / max_volume), 1)
+        seconds = trips * (self.aspirate + self.dispense)
+        seconds += mix_reps * self.mix_cycle
+        if blow_out:
+            seconds += trips * self.blow_out
+        return seconds
+
+
+class RunEstimate:
+    """Estimated wall-clock of a set of BASIC scripts.
+
+    Attributes:
+        scripts: seconds per output script (eg. '1_clip.ot2.py')
+        pauses: number of protocol.pause calls per script, which add
+            operator time on top of the estimate
+    """
+
+    def __init__(self):
+        self.scripts: Dict[str, float] = {}
+        self.pauses: Dict[str, int] = {}
+
+    @property
+    def total(self) -> float:
+        """Total seconds across all scripts."""
+        return sum(self.scripts.values())
+
+    def constructs_per_hour(self, constructs: int) -> float:
+        """Throughput of a run that builds this many constructs."""
+        return constructs / (self.total / 3600) if self.total else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'scripts': dict(self.scripts),
+            'pauses': dict(self.pauses),
+            'total': self.total,
+        }
+
+    def __str__(self):
+        lines = [f"{script}: {seconds / MINUTE:.1f} min"
+                 for script, seconds in self.scripts.items()]
+        lines.append(f"total: {self.total / MINUTE:.1f} min")
+        return "\n".join(lines)
+
+
+def planned_transfers(multichannel_transfers: Dict[str, List[Dict]], kind: str,
+                      mix_reps: int, model: TimingModel) -> float:
+    """Seconds for the planned transfers of one kind, each a single step with
+    its own tip(s) on either the p10 single or the p10 multi-channel."""
+    return sum(model.tip() + model.liquid(transfer['volume'], P10_MAX_VOL, mix_reps=mix_reps)
+               for transfer in multichannel_transfers[kind])
+
+
+def estimate_clip(clips_dict: Dict[str, List], model: TimingModel = None,
+                  multichannel_transfers: Dict[str, List[Dict]] = None) -> float:
+    """Seconds for 'clip_template.py' with this clips_dict and, when the
+    linkers and parts are planned for the multi-channel, these
+    multichannel_transfers."""
+    model = model or TimingModel()
+    clip_count = len(clips_dict['parts_wells'])
+
+    # master mix with a single tip, water with a fresh tip per well
+    seconds = model.tip() + clip_count * model.liquid(
+        CLIP_MASTER_MIX_VOLUME, P10_MAX_VOL)
+    for water_vol in clips_dict['water_vols']:
+        seconds += model.tip() + model.liquid(water_vol, P10_MAX_VOL)
+
+    if multichannel_transfers:
+        seconds += planned_transfers(
+            multichannel_transfers, 'prefixes', CLIP_LINKER_MIX_REPS, model)
+        seconds += planned_transfers(
+            multichannel_transfers, 'suffixes', CLIP_LINKER_MIX_REPS, model)
+        seconds += planned_transfers(
+            multichannel_transfers, 'parts', CLIP_PART_MIX_REPS, model)
+        return seconds
+
+    # prefix, suffix and part, each with its own tip and mix
+    for part_vol in clips_dict['parts_vols']:
+        seconds += 2 * (model.tip() + model.liquid(
+            1, P10_MAX_VOL, mix_reps=CLIP_LINKER_MIX_REPS))
+        seconds += model.tip() + model.liquid(
+            part_vol, P10_MAX_VOL, mix_reps=CLIP_PART_MIX_REPS)
+    return seconds
+
+
+def estimate_purification(sample_number: int, model: TimingModel = None) -> float:
+    """Seconds for 'purification_template.py', which works a column of
+    8 samples at a time with the p300 multi-channel."""
+    model = model or TimingModel()
+    columns = math.ceil(sample_number / 8)
+    bead_volume = MAGBEAD_SAMPLE_VOLUME * MAGBEAD_BEAD_RATIO
+    total_vol = bead_volume + MAGBEAD_SAMPLE_VOLUME + MAGBEAD_DEAD_TOTAL_VOL
+    fresh = model.tip()
+
+    per_column = 0.0
+    # beads and samples mixed on the mix plate
+    per_column += fresh + MAGBEAD_BEAD_MIX_REPS * model.mix_cycle
+    per_column += model.liquid(bead_volume, P300_MAX_VOL)
+    per_column += model.liquid(
+        MAGBEAD_SAMPLE_VOLUME + MAGBEAD_DEAD_TOTAL_VOL, P300_MAX_VOL,
+        mix_reps=MAGBEAD_IMMOBILISE_MIX_REPS, blow_out=True)
+    # back to the magdeck, then supernatant to waste
+    per_column += 2 * (fresh + model.liquid(total_vol, P300_MAX_VOL, blow_out=True))
+    # two ethanol washes, in and out
+    per_column += 2 * (fresh + model.liquid(MAGBEAD_ETHANOL_VOL, P300_MAX_VOL))
+    per_column += 2 * (fresh + model.liquid(
+        MAGBEAD_ETHANOL_VOL + MAGBEAD_ETHANOL_DEAD_VOL, P300_MAX_VOL))
+    # elution buffer, then eluate to the output column
+    per_column += fresh + model.liquid(
+        MAGBEAD_ELUTION_VOLUME, P300_MAX_VOL, mix_reps=MAGBEAD_ELUTION_MIX_REPS)
+    per_column += fresh + model.liquid(MAGBEAD_ELUTION_VOLUME, P300_MAX_VOL)
+
+    modules = 5 * model.module  # magdeck engage / disengage
+    delays = sum(MAGBEAD_DELAYS.values()) * MINUTE
+    return columns * per_column + modules + delays
+
+
+def estimate_assembly(final_assembly_dict: Dict[str, List[str]],
+                      model: TimingModel = None,
+                      multichannel_transfers: Dict[str, List[Dict]] = None) -> float:
+    """Seconds for 'assembly_template.py' with this final_assembly_dict and,
+    when the parts are planned for the multi-channel, these
+    multichannel_transfers."""
+    model = model or TimingModel()
+    destinations = len(final_assembly_dict)
+    seconds = model.temperature_change + model.module
+
+    # one master mix dispense to every destination per assembly size
+    for length in set(len(wells) for wells in final_assembly_dict.values()):
+        seconds += model.tip() + destinations * model.liquid(
+            ASSEMBLY_TOTAL_VOL - length * ASSEMBLY_PART_VOL, P10_MAX_VOL)
+
+    if multichannel_transfers:
+        return seconds + sum(
+            planned_transfers(multichannel_transfers, kind, ASSEMBLY_MIX_REPS, model)
+            for kind in multichannel_transfers)
+
+    part_transfer = model.tip() + model.liquid(
+        ASSEMBLY_PART_VOL, P10_MAX_VOL, mix_reps=ASSEMBLY_MIX_REPS)
+    seconds += part_transfer * sum(len(wells) for wells in final_assembly_dict.values())
+    return seconds
+
+
+def estimate_transformation(spotting_tuples: List[Tuple],
+                            model: TimingModel = None) -> float:
+    """Seconds for 'transformation_template.py' with these spotting_tuples."""
+    model = model or TimingModel()
+
+    wells = list(dict.fromkeys(
+        well for spotting_tuple in spotting_tuples for well in spotting_tuple[0]))
+    tuple_cols = [list(dict.fromkeys(well[1:] for well in spotting_tuple[0]))
+                  for spotting_tuple in spotting_tuples]
+    unique_cols = set(col for cols in tuple_cols for col in cols)
+
+    # agar plate calibration transfer
+    seconds = model.tip() + model.liquid(1, P10_MAX_VOL)
+
+    # transformation setup at 4 degrees then incubation
+    seconds += model.temperature_change
+    seconds += len(wells) * (model.tip() + model.liquid(
+        TRANSFORMATION_ASSEMBLY_VOL, P10_MAX_VOL, mix_reps=TRANSFORMATION_MIX_REPS))
+    seconds += TRANSFORMATION_DELAYS['incubation'] * MINUTE
+
+    # outgrowth at 37 degrees
+    seconds += len(unique_cols) * (model.tip() + model.liquid(
+        TRANSFORMATION_SOC_VOL, P300_MAX_VOL, mix_reps=TRANSFORMATION_SOC_MIX_REPS))
+    seconds += model.temperature_change + TRANSFORMATION_DELAYS['outgrowth'] * MINUTE
+    seconds += model.module
+
+    # resuspend each column then spot every reaction
+    spot = model.tip() + model.aspirate + 4 * model.move + model.spot \
+        + model.dispense + model.blow_out
+    for spotting_tuple, cols in zip(spotting_tuples, tuple_cols):
+        seconds += len(cols) * (
+            model.tip() + TRANSFORMATION_RESUSPEND_MIX_REPS * model.mix_cycle)
+        for spot_vol in spotting_tuple[2]:
+            seconds += spot * math.ceil(spot_vol / TRANSFORMATION_MAX_SPOT_VOL)
+    return seconds
+
+
+def estimate_run(kwargs_by_script: Dict[str, Dict],
+                 model: TimingModel = None) -> RunEstimate:
+    """Estimate each BASIC script from the kwargs injected into it,
+    eg. the output of batches.batch_kwargs.
+
+    Args:
+        kwargs_by_script: template kwargs keyed by output script name
+        model: primitive timings (default: TimingModel())
+
+    Returns:
+        Per-script and total wall-clock estimate
+    """
+    model = model or TimingModel()
+    estimate = RunEstimate()
+
+    for script, kwargs in kwargs_by_script.items():
+        if script == CLIP_OUT_PATH:
+            estimate.scripts[script] = estimate_clip(
+                kwargs['clips_dict'], model, kwargs.get('multichannel_transfers'))
+            estimate.pauses[script] = 0
+        elif script == MAGBEAD_OUT_PATH:
+            estimate.scripts[script] = estimate_purification(
+                kwargs['sample_number'], model)
+            estimate.pauses[script] = 0
+        elif script == F_ASSEMBLY_OUT_PATH:
+            estimate.scripts[script] = estimate_assembly(
+                kwargs['final_assembly_dict'], model,
+                kwargs.get('multichannel_transfers'))
+            estimate.pauses[script] = 0
+        elif script == TRANS_SPOT_OUT_PATH:
+            estimate.scripts[script] = estimate_transformation(
+                kwargs['spotting_tuples'], model)
+            estimate.pauses[script] = 3
+        else:
+            raise ValueError(f"no timing model for script '{script}'")
+    return estimate
@@ -0,0 +1,213 @@
+"""Tip-consumption simulation for the BASIC OT-2 scripts.
+
+Replays the tip pick-ups each template makes for its planned transfers,
+rack by rack, instead of estimating tipracks with per-template arithmetic.
+The result gives exact tip counts, which candidate slots get a tiprack and
+the first/last tip used in each rack. The slots are rendered into each
+script (see batches.batch_kwargs), the templates load just those racks.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+from script_gen_pipeline.labware.wells import COL_MAJOR, well_index, well_name
+
+CLIP_TIPRACK_SLOTS = ['3', '6', '9']
+MAGBEAD_TIPRACK_SLOTS = ['3', '6', '9', '2', '5']
+ASSEMBLY_TIPRACK_SLOTS = ['3', '6', '9', '2', '5', '8', '11']
+TRANSFORMATION_P10_SLOTS = ['9', '2', '5']
+TRANSFORMATION_P300_SLOTS = ['3', '6']
+"""Candidate tiprack slots, as in each template."""
+
+MAX_SPOT_VOL = 5
+
+
+class TipRacks:
+    """Tipracks loaded into candidate slots, used in the OT-2's order:
+    down each column (A1, B1 ... H1, A2 ...) and rack after rack. Pipettes
+    sharing the racks share their tips: a single channel takes the first
+    tip left, a multi-channel the first full column left.
+
+    Args:
+        slots: candidate deck slots, filled in order as racks run out
+        initial_tip: first tip to use in the first rack
+        rows: rows of tips per rack
+        cols: columns of tips per rack
+    """
+
+    def __init__(self, slots: List[str], initial_tip: str = 'A1',
+                 rows: int = 8, cols: int = 12):
+        self.slots = slots
+        self.rows = rows
+        self.cols = cols
+
+        self.start = well_index(initial_tip, rows * cols, COL_MAJOR)
+        self.used: List[bytearray] = []  # per rack, 1 for each tip taken
+        self.tips = 0
+        self.racks: List[Dict] = []
+
+    def _tip_name(self, index: int) -> str:
+        return well_name(index, self.rows * self.cols, COL_MAJOR)
+
+    def _free(self, used: bytearray, channels: int) -> int:
+        """First tip a pipette would take from a rack, -1 if none."""
+        if channels == 1:
+            return used.find(0)
+        for start in range(0, len(used), self.rows):
+            if not any(used[start:start + self.rows]):
+                return start
+        return -1
+
+    def pick(self, channels: int = 1) -> Tuple[str, str]:
+        """Pick up tips for one pipette, return the slot and first tip well.
+
+        A multi-channel pick needs a full column, so partially used columns
+        are left to single-channel picks.
+        """
+
+        rack = next((rack for rack, used in enumerate(self.used)
+                     if self._free(used, channels) >= 0), len(self.used))
+        if rack == len(self.used):
+            if rack >= len(self.slots):
+                raise ValueError(
+                    f'Tips run out: more than {len(self.slots)} tipracks needed in slots {self.slots}')
+            used = bytearray(self.rows * self.cols)
+            if not rack:
+                used[:self.start] = b'\x01' * self.start
+            self.used.append(used)
+            self.racks.append({'slot': self.slots[rack], 'first': None,
+                               'last': None, 'tips': 0})
+
+        tip = self._free(self.used[rack], channels)
+        self.used[rack][tip:tip + channels] = b'\x01' * channels
+        info = self.racks[rack]
+        well = self._tip_name(tip)
+        info['first'] = info['first'] or well
+        info['last'] = self._tip_name(tip + channels - 1)
+        info['tips'] += channels
+
+        self.tips += channels
+        return info['slot'], well
+
+    def usage(self) -> "TipUsage":
+        return TipUsage(self.tips, [dict(rack) for rack in self.racks])
+
+
+class TipUsage:
+    """Result of a tip simulation.
+
+    Attributes:
+        tips: total tips used
+        racks: per rack, its 'slot', 'first' and 'last' tip and 'tips' used
+    """
+
+    def __init__(self, tips: int, racks: List[Dict]):
+        self.tips = tips
+        self.racks = racks
+
+    @property
+    def tiprack_num(self) -> int:
+        return len(self.racks)
+
+    @property
+    def slots(self) -> List[str]:
+        return [rack['slot'] for rack in self.racks]
+
+    def __repr__(self):
+        return f"TipUsage({self.tips} tips in slots {self.slots})"
+
+
+def replay(racks: TipRacks, transfers: Dict[str, List]):
+    """Pick fresh tips for each planned transfer, see multichannel.MultiChannelPlan."""
+    for kind_transfers in transfers.values():
+        for transfer in kind_transfers:
+            racks.pick(channels=transfer.channels)
+
+
+def clip_tips(clips_dict: Dict[str, List], initial_tip: str = 'A1',
+              slots: List[str] = None, transfers: Dict[str, List] = None) -> TipUsage:
+    """Replay 'clip_template.py': one tip for the master mix, one per water
+    dispense, then prefix, suffix and part each with a fresh tip.
+
+    Args:
+        transfers: the planned linker and part transfers, if any
+    """
+
+    racks = TipRacks(slots or CLIP_TIPRACK_SLOTS, initial_tip)
+    clip_count = len(clips_dict['parts_wells'])
+
+    racks.pick()  # master mix
+    for _ in range(clip_count):
+        racks.pick()  # water
+    if transfers:
+        replay(racks, transfers)
+        return racks.usage()
+    for _ in range(clip_count):
+        for _transfer in range(3):  # prefix, suffix, part
+            racks.pick()
+    return racks.usage()
+
+
+def purification_tips(sample_number: int, slots: List[str] = None) -> TipUsage:
+    """Replay 'purification_template.py' on the p300 multi-channel: nine
+    8-tip pick-ups per column of samples."""
+
+    racks = TipRacks(slots or MAGBEAD_TIPRACK_SLOTS)
+    for _ in range(math.ceil(sample_number / 8)):
+        # beads + sample, back to magdeck, supernatant, 2x ethanol in and
+        # out, elution buffer, eluate
+        for _transfer in range(9):
+            racks.pick(channels=8)
+    return racks.usage()
+
+
+def assembly_tips(final_assembly_dict: Dict[str, List[str]],
+                  slots: List[str] = None, transfers: Dict[str, List] = None) -> TipUsage:
+    """Replay 'assembly_template.py': one tip per master mix (one per
+    distinct assembly size), then a fresh tip per part transfer.
+
+    Args:
+        transfers: the planned part transfers, if any
+    """
+
+    racks = TipRacks(slots or ASSEMBLY_TIPRACK_SLOTS)
+    for _ in set(len(wells) for wells in final_assembly_dict.values()):
+        racks.pick()
+    if transfers:
+        replay(racks, transfers)
+        return racks.usage()
+    for wells in final_assembly_dict.values():
+        for _ in wells:
+            racks.pick()
+    return racks.usage()
+
+
+def transformation_tips(spotting_tuples: List[Tuple], max_spot_vol: float = MAX_SPOT_VOL,
+                        p10_slots: List[str] = None,
+                        p300_slots: List[str] = None) -> Dict[str, TipUsage]:
+    """Replay 'transformation_template.py' for both pipettes.
+
+    Returns:
+        TipUsage of the 'p10' and 'p300' tipracks
+    """
+
+    p10 = TipRacks(p10_slots or TRANSFORMATION_P10_SLOTS)
+    p300 = TipRacks(p300_slots or TRANSFORMATION_P300_SLOTS)
+
+    wells = list(dict.fromkeys(
+        well for spotting_tuple in spotting_tuples for well in spotting_tuple[0]))
+    tuple_cols = [list(dict.fromkeys(well[1:] for well in spotting_tuple[0]))
+                  for spotting_tuple in spotting_tuples]
+
+    p10.pick()  # agar plate calibration
+    for _ in wells:  # final assemblies into competent cells
+        p10.pick()
+    for _ in set(col for cols in tuple_cols for col in cols):  # SOC outgrowth
+        p300.pick(channels=8)
+    for spotting_tuple, cols in zip(spotting_tuples, tuple_cols):
+        for _ in cols:  # resuspend each column
+            p300.pick(channels=8)
+        for spot_vol in spotting_tuple[2]:
+            for _ in range(math.ceil(spot_vol / max_spot_vol)):
+                p10.pick()
+    return {'p10': p10.usage(), 'p300': p300.usage()}
@@ -0,0 +1,18 @@
+""" The repo is the script_gen_pipeline package: make it importable by
+that name when the tests are run from inside it. """
+
+import importlib.util
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import script_gen_pipeline  # noqa: F401
+except ImportError:
+    spec = importlib.util.spec_from_file_location(
+        'script_gen_pipeline', os.path.join(REPO_DIR, '__init__.py'),
+        submodule_search_locations=[REPO_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['script_gen_pipeline'] = package
+    spec.loader.exec_module(package)
@@ -0,0 +1,131 @@
+import json
+import os
+import weakref
+
+import pytest
+
+from script_gen_pipeline.labware.wells import final_well
+from script_gen_pipeline.protocol.basic import DEFAULT_PARAMETERS, Basic
+from script_gen_pipeline.protocol.batches import (
+    MANIFEST_NAME, MULTICHANNEL_NAME, Batch, batch_kwargs, generate_batches, plan_batches,
+    with_defaults)
+from script_gen_pipeline.protocol.protocol import (
+    F_ASSEMBLY_OUT_PATH, FINAL_ASSEMBLIES_PER_CLIP, MAGBEAD_OUT_PATH, MAX_CLIPS,
+    MAX_CONSTRUCTS, TRANS_SPOT_OUT_PATH, basic_steps, iter_construct_clips)
+
+EXAMPLES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dna_bot_utils', 'examples')
+CONSTRUCTS_CSV = os.path.join(EXAMPLES, 'construct_csvs', 'storch_et_al_cons.csv')
+SOURCES_CSV = os.path.join(EXAMPLES, 'part_linker_csvs', 'part_plate_2_230419.csv')
+
+
+def construct(n, parts=2):
+    """ CLIPs of a construct whose parts are unique to it """
+    return [(f'L{p}-P', f'P{n}_{p}', f'L{p + 1}-S') for p in range(parts)]
+
+
+def test_split_on_construct_limit():
+    shared = [('L0-P', 'P', 'L1-S')]
+    planned = list(plan_batches([shared] * 10, max_constructs=4))
+
+    assert [len(batch) for batch in planned] == [4, 4, 2]
+    assert [batch.index for batch in planned] == [0, 1, 2]
+    assert all(batch.reactions == 1 for batch in planned)
+
+
+def test_split_on_clip_limit():
+    planned = list(plan_batches((construct(n, parts=3) for n in range(10)), max_clips=12))
+
+    assert [len(batch) for batch in planned] == [4, 4, 2]
+    assert all(batch.reactions <= 12 for batch in planned)
+    assert [c for batch in planned for c in batch.constructs] == \
+        [construct(n, parts=3) for n in range(10)]
+
+
+def test_batches_are_planned_lazily():
+    read = []
+
+    def constructs():
+        for n in range(10):
+            read.append(n)
+            yield construct(n)
+
+    batches = plan_batches(constructs(), max_constructs=4)
+    first = weakref.ref(next(batches))
+    # The fifth construct starts the second batch
+    assert read == list(range(5))
+    assert len(next(batches)) == 4
+    # Nothing holds on to a batch once the next is planned
+    assert first() is None
+    assert [len(batch) for batch in batches] == [2]
+
+
+def test_shared_clips_need_extra_reactions():
+    shared = [('L0-P', 'P', 'L1-S')]
+    planned = list(plan_batches([shared] * FINAL_ASSEMBLIES_PER_CLIP))
+
+    assert len(planned) == 1
+    assert planned[0].reactions == 2
+
+
+def test_construct_too_large_for_a_deck():
+    with pytest.raises(ValueError):
+        list(plan_batches([construct(0, parts=5)], max_clips=4))
+
+
+def test_partial_parameters_take_defaults():
+    parameters = with_defaults({'ethanol_well_for_stage_2': 'B11'})
+    assert parameters['ethanol_well_for_stage_2'] == 'B11'
+    assert parameters['SPOTTING_VOLS_DICT'] == DEFAULT_PARAMETERS['SPOTTING_VOLS_DICT']
+    assert Basic().parameters == DEFAULT_PARAMETERS
+
+    batch = Batch(0)
+    batch.constructs = [construct(0)]
+    batch.clip_counts.update(construct(0))
+    sources = {name: ('A1', '', '2') for clip in construct(0) for name in clip}
+    kwargs = batch_kwargs(batch, sources, {'ethanol_well_for_stage_2': 'B11'})
+    assert kwargs[MAGBEAD_OUT_PATH]['ethanol_well'] == 'B11'
+    assert kwargs[TRANS_SPOT_OUT_PATH]['spotting_tuples'] == [(('A1',), ('A1',), (5,))]
+
+
+def test_manifest(tmp_path):
+    # Three copies of the example design, 264 constructs
+    with open(CONSTRUCTS_CSV) as csv_file:
+        header, *rows = csv_file.read().splitlines()
+    rows = [row for row in rows if row.split(',', 1)[1].strip(',')]
+    constructs_csv = tmp_path / 'constructs.csv'
+    constructs_csv.write_text('\n'.join([header] + rows * 3) + '\n')
+    # The example sources csv only has parts, put the linkers on a second plate
+    with open(SOURCES_CSV) as csv_file:
+        parts = {line.split(',')[0] for line in csv_file.read().splitlines()[1:]}
+    linkers = sorted({name for clips in iter_construct_clips(str(constructs_csv))
+                      for clip in clips for name in clip} - parts)
+    linkers_csv = tmp_path / 'linkers.csv'
+    linkers_csv.write_text('Linker,Well\n' + ''.join(
+        f'{linker},{final_well(n + 1)}\n' for n, linker in enumerate(linkers)))
+    out_dir = tmp_path / 'out'
+
+    manifest = generate_batches(
+        str(constructs_csv), [SOURCES_CSV, str(linkers_csv)], str(out_dir),
+        {'multichannel': True}, max_workers=2)
+
+    with open(out_dir / MANIFEST_NAME) as manifest_file:
+        assert json.load(manifest_file) == manifest
+    assert manifest['scripts'] == basic_steps
+
+    entries = manifest['batches']
+    assert sum(entry['constructs'] for entry in entries) == 3 * len(rows)
+    assert len(entries) >= 3
+    for number, entry in enumerate(entries, 1):
+        assert entry['batch'] == number
+        assert entry['directory'] == f'batch_{number:03d}'
+        assert entry['scripts'] == basic_steps
+        assert entry['constructs'] <= MAX_CONSTRUCTS
+        assert entry['clip_reactions'] <= MAX_CLIPS
+        assert set(entry['pipetting_steps']) == {basic_steps[0], F_ASSEMBLY_OUT_PATH}
+        assert set(entry['estimate']['scripts']) == set(basic_steps)
+        assert entry['estimate']['total'] == pytest.approx(
+            sum(entry['estimate']['scripts'].values()))
+        assert entry['estimate']['constructs_per_hour'] > 0
+        for script in basic_steps + [MULTICHANNEL_NAME]:
+            assert (out_dir / entry['directory'] / script).is_file()
@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+import script_gen_pipeline
+from script_gen_pipeline.benchmarks.bench_import import BUDGET, MODULES, import_time
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import_time(module, monkeypatch):
+    # The fresh interpreters import the package from the directory above it
+    root = os.path.dirname(os.path.abspath(script_gen_pipeline.__path__[0]))
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(
+        filter(None, [root, os.environ.get('PYTHONPATH')])))
+
+    runs = [import_time(module) for _ in range(2)]
+    heavy = sorted({name for run in runs for name in run['heavy']})
+    assert not heavy, f'{module} imports {", ".join(heavy)}'
+    assert min(run['seconds'] for run in runs) < BUDGET
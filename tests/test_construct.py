@@ -0,0 +1,117 @@
+from itertools import product
+
+import pytest
+
+from script_gen_pipeline.designs.construct import CombinatorialSpace, Construct, Variant
+from script_gen_pipeline.designs.variant_table import VariantTable, VariantView
+
+# 5 part modules of 6 variants, each flanked by linkers: 6^5 = 7776 constructs
+PART_MODULES = 5
+VARIANTS = 6
+
+
+def library_components():
+    components = []
+    for module in range(PART_MODULES):
+        components.append(f'L{module}')
+        components.append([f'P{module}_{v}' for v in range(VARIANTS)])
+    components.append('L_end')
+    return components
+
+
+def build_library():
+    construct = Construct(library_components())
+    for module in construct.modules[::2]:
+        for part in module.parts:
+            part.set_role('Linker')
+    return construct.update_construct()
+
+
+@pytest.fixture
+def construct(monkeypatch):
+    def no_variant_objects(self, component):
+        raise AssertionError("Construct should not build a Variant per variant")
+
+    monkeypatch.setattr(Variant, '__init__', no_variant_objects)
+    return build_library()
+
+
+def test_variants_are_table_views(construct):
+    assert isinstance(construct.table, VariantTable)
+    assert len(construct.table) == PART_MODULES * VARIANTS + PART_MODULES + 1
+    for part in construct.parts:
+        assert part.table is construct.table
+        assert all(isinstance(variant, VariantView) for variant in part.variants)
+        assert all(isinstance(variant, Variant) for variant in part.variants)
+
+
+def test_views_match_variant_attributes(construct):
+    last = len(construct.modules) - 1
+    for module in construct.modules:
+        idx = module.order_idx
+        linker = idx % 2 == 0
+        for variant in module.parts[0].variants:
+            assert variant.module_order_idx == idx
+            assert variant.module_id == module.id
+            assert variant.is_linker() == linker
+            assert variant.role == ('Linker' if linker else 'Yuh')
+            # Linkers have no prefix/suffix, parts take their flanking linkers
+            assert variant.prefix == (None if linker else idx - 1)
+            assert variant.suffix == (None if linker or idx == last else idx + 1)
+
+    names = [variant.name for variant in construct.modules[1].parts[0].variants]
+    assert names == [f'BBA_fake_P0_{v}' for v in range(VARIANTS)]
+
+
+def test_views_have_every_variant_attribute(construct):
+    view = construct.modules[1].parts[0].variants[2]
+    variant = Variant.__new__(Variant)
+    for attribute in Variant.__slots__:
+        assert hasattr(view, attribute), attribute
+    assert view.component == 'P0_2'
+    assert view.sequence == view.uri == view.annotations == 0
+    with pytest.raises(AttributeError):
+        view.foo = 1
+    with pytest.raises(AttributeError):
+        variant.foo = 1
+
+    # Views are made once per part and read the table live
+    part = construct.modules[1].parts[0]
+    assert part.variants is part.variants
+    part.set_role('Promoter')
+    assert view.role == 'Promoter'
+
+
+def test_unique_constructs_product(construct):
+    space = construct.get_unique_constructs()
+    assert isinstance(space, CombinatorialSpace)
+    assert len(space) == VARIANTS ** PART_MODULES
+
+    expected = product(*([variant.name for variant in part.variants] for part in construct.parts))
+    assert [tuple(map(str, unique)) for unique in space] == list(expected)
+    assert [str(v) for v in space[1234]] == [str(v) for v in list(space)[1234]]
+
+
+def test_from_components_matches_construct(construct):
+    roles = ['Linker' if i % 2 == 0 else 'Yuh' for i in range(2 * PART_MODULES + 1)]
+    table = VariantTable.from_components(library_components(), roles).set_pref_suff()
+
+    assert table.names == construct.table.names
+    assert table.components == construct.table.components
+    for view, variant in zip(table, construct.table):
+        assert (view.role, view.module_order_idx, view.prefix, view.suffix) == \
+            (variant.role, variant.module_order_idx, variant.prefix, variant.suffix)
+
+
+def test_combinatorial_space_slices():
+    lists = [['a', 'b'], ['c', 'd', 'e'], ['f', 'g']]
+    space = CombinatorialSpace(lists)
+    expected = list(product(*lists))
+
+    assert len(space) == space.size == 12
+    assert [space.decode(index) for index in range(12)] == expected
+    assert list(space[3:9:2]) == expected[3:9:2]
+    assert space[3:9][-1] == expected[8]
+    assert [list(chunk) for chunk in space.chunks(5)] == \
+        [expected[:5], expected[5:10], expected[10:]]
+    assert repr(space[:4]) == 'CombinatorialSpace(2 x 3 x 2, 4 constructs)'
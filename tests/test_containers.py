@@ -0,0 +1,58 @@
+from script_gen_pipeline.designs.construct import Variant
+from script_gen_pipeline.labware.containers import Container, Layout, Well, content_id
+from script_gen_pipeline.protocol.biochem_utils import Reagent, Species
+
+
+def test_content_id_follows_renames():
+    reagent = Reagent('T4 Ligase')
+    species = Species('E. coli')
+    container = Container([reagent, species])
+    assert container.content_ids() == {'T4 Ligase', 'E. coli'}
+
+    reagent.name = 'T7 Ligase'
+    species.name = 'B. subtilis'
+    assert content_id(reagent) == 'T7 Ligase'
+    assert content_id(species) == 'B. subtilis'
+    assert not hasattr(reagent, '_content_id')
+
+
+def test_content_id_of_variant():
+    variant = Variant('a')
+    assert content_id(variant) == variant.short_id
+    variant.short_id = 'abcdef'
+    assert content_id(variant) == 'abcdef'
+
+
+class RecordVariant(Variant):
+    """ A Variant read from a sequence record, which has a seq """
+
+
+def test_content_id_of_sequence_follows_seq():
+    variant = RecordVariant('a')
+    variant.id = '<unknown id>'
+    variant.seq = 'ATGC'
+    assert content_id(variant) == 'ATGC'
+    assert content_id(variant) == 'ATGC'
+
+    variant.seq = 'GGCC'
+    assert content_id(variant) == 'GGCC'
+    variant.id = 'named'
+    assert content_id(variant) == variant.short_id
+
+
+def test_layout_orders_by_rank_then_id():
+    # Sequences, then reagents, then species, each by ID: a species named
+    # 'aaa' still goes after a reagent named 'mmm' and a sequence 'zzz'
+    variant = Variant('a')
+    variant.short_id = 'zzz'
+    wells = [Well([Species('aaa')]), Well([Reagent('mmm')]), Well([variant]),
+             Well([Reagent('bbb')])]
+
+    layout = Layout(wells)
+    assert [well.sort_key() for well in layout.wells] == \
+        [(0, 'zzz'), (1, 'bbb'), (1, 'mmm'), (2, 'aaa')]
+    assert [row.split(',')[1] for row in layout.to_csv().splitlines()[1:5]] == \
+        ['zzz', 'bbb', 'mmm', 'aaa']
+    # A total order, unlike comparing ranks and then IDs separately
+    species, reagent = wells[0], wells[1]
+    assert reagent < species and not species < reagent
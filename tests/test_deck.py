@@ -0,0 +1,65 @@
+import pytest
+
+from script_gen_pipeline.protocol.deck import (
+    MODULE, TIPRACK, TRASH_SLOT, Labware, deck_slots, module_slots, plan_runs)
+
+
+def every_run():
+    return [
+        Labware('magdeck', MODULE),
+        Labware('tempdeck', MODULE),
+        Labware('mag_plate', on='magdeck', every_run=True),
+        Labware('tiprack', TIPRACK, every_run=True),
+    ]
+
+
+def test_slots():
+    assert TRASH_SLOT not in deck_slots()
+    assert len(deck_slots()) == 11
+    assert deck_slots({'NUM_SLOTS': 4}) == ['1', '2', '3', '4']
+    assert module_slots({'MAGDECK_SLOT': 7}) == {'magdeck': '7', 'tempdeck': '4'}
+
+
+def test_one_run():
+    plates = [Labware(f'Plate:{n}', slots=['2', '3']) for n in range(2)]
+    runs = plan_runs(every_run() + plates)
+
+    assert len(runs) == 1
+    deck = runs[0]
+    assert deck.slot_of('magdeck') == deck.slot_of('mag_plate') == '1'
+    assert deck.slot_of('tempdeck') == '4'
+    assert {deck.slot_of('Plate:0'), deck.slot_of('Plate:1')} == {'2', '3'}
+    assert [item.name for item in deck.slots['1']] == ['magdeck', 'mag_plate']
+    assert len(deck.free()) == 11 - 5  # the modules, tiprack and plates
+    assert deck.to_dict()['slots']['1'] == ['magdeck', 'mag_plate']
+    assert 'trash' in str(deck)
+
+
+def test_makes_room_by_moving_labware():
+    # The tiprack placed first can also go in slot 3, so it gives up slot 2
+    labware = [Labware('tiprack', TIPRACK, slots=['2', '3'], every_run=True),
+               Labware('Plate:0', slots=['2'])]
+    runs = plan_runs(labware, {'NUM_SLOTS': 3})
+    assert len(runs) == 1
+    assert runs[0].slot_of('Plate:0') == '2'
+    assert runs[0].slot_of('tiprack') == '3'
+
+
+def test_spills_into_runs():
+    plates = [Labware(f'Plate:{n}', slots=['2', '3']) for n in range(5)]
+    runs = plan_runs(every_run() + plates)
+
+    assert len(runs) == 3
+    assert [len(run.labware('plate')) - 1 for run in runs] == [2, 2, 1]
+    # Labware for every run stays where it was on the first run
+    assert len({run.slot_of('tiprack') for run in runs}) == 1
+    placed = [item.name for run in runs for item in run.labware() if item.name.startswith('Plate')]
+    assert sorted(placed) == [plate.name for plate in plates]
+
+
+def test_does_not_fit():
+    with pytest.raises(ValueError):
+        plan_runs([Labware('Plate:0', slots=['12'])])
+    with pytest.raises(ValueError):
+        plan_runs([Labware('tiprack', TIPRACK, slots=['2'], every_run=True),
+                   Labware('tiprack2', TIPRACK, slots=['2'], every_run=True)])
@@ -0,0 +1,57 @@
+import pytest
+
+from script_gen_pipeline.labware.containers import Well
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+from script_gen_pipeline.protocol.instructions import Transfer, TransferTable
+
+
+@pytest.fixture
+def wells():
+    return [Well([Reagent(f'R{n}')]) for n in range(4)]
+
+
+def test_table_matches_transfers(wells):
+    transfers = [Transfer(wells[0], wells[2], 5.0), Transfer(wells[1], wells[2], 2.5),
+                 Transfer(wells[0], wells[3], 12.0)]
+    table = TransferTable(transfers)
+    table.add(wells[1], wells[3], 1.0)
+    transfers.append(Transfer(wells[1], wells[3], 1.0))
+
+    assert len(table) == 4
+    assert table.containers == [wells[0], wells[2], wells[1], wells[3]]
+    assert [(t.src, t.dest, t.volume) for t in table] == \
+        [(t.src, t.dest, t.volume) for t in transfers]
+    assert table[2].volume == 12.0
+    assert table.srcs() == [wells[0], wells[1]]
+    assert table.dests() == [wells[2], wells[3]]
+    assert {src: rows.tolist() for src, rows in table.group_by_src().items()} == \
+        {wells[0]: [0, 2], wells[1]: [1, 3]}
+    assert {dest: rows.tolist() for dest, rows in table.group_by_dest().items()} == \
+        {wells[2]: [0, 1], wells[3]: [2, 3]}
+
+
+def test_split_matches_transfer_split(wells):
+    transfers = [Transfer(wells[0], wells[1], 25.0), Transfer(wells[2], wells[3], 3.3)]
+    table = TransferTable(transfers).split(10, 0.0025)
+
+    expected = [t for transfer in transfers for t in transfer.split(10, 0.0025)]
+    assert len(table) == len(expected) == 4
+    for got, want in zip(table, expected):
+        assert (got.src, got.dest) == (want.src, want.dest)
+        assert got.volume == pytest.approx(want.volume)
+
+
+def test_take(wells):
+    table = TransferTable([Transfer(wells[0], wells[1], n) for n in range(5)])
+    assert [t.volume for t in table.take([4, 1])] == [4, 1]
+    assert len(TransferTable().take([])) == 0
+
+
+def test_derived_tables_have_own_registry(wells):
+    table = TransferTable([Transfer(wells[0], wells[1], 20.0)])
+    for derived in (table.split(10, 0.0025), table.take([0])):
+        derived.add(wells[2], wells[3], 1.0)
+        assert derived.containers == wells
+        assert derived[len(derived) - 1].dest is wells[3]
+    assert table.containers == wells[:2]
+    assert wells[2] not in table._index
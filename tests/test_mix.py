@@ -0,0 +1,66 @@
+import pytest
+
+from script_gen_pipeline.labware.mix import Mix
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+
+
+class Fragment:
+    pass
+
+
+class Enzyme:
+    pass
+
+
+class TypeIIS(Enzyme):
+    pass
+
+
+@pytest.fixture
+def mix():
+    return Mix({Fragment: 2.0, Enzyme: 1.0, Reagent('buffer'): 4.0},
+               fill_with=Reagent('water'), fill_to=20.0)
+
+
+def test_type_key_cached(mix, monkeypatch):
+    enzyme = TypeIIS()
+    assert mix._type_key(TypeIIS) is Enzyme
+    assert mix._type_key(Fragment) is Fragment
+    assert mix._type_key(str) is None
+    assert mix._type_to_key == {TypeIIS: Enzyme, Fragment: Fragment, str: None}
+
+    # Cached types never search the class keys again
+    monkeypatch.setattr(mix, '_class_keys', [])
+    assert mix([enzyme])[1] == [1.0, 4.0, 15.0]
+
+
+def test_reassigning_mix_resets_cache(mix):
+    assert mix._type_key(TypeIIS) is Enzyme
+
+    mix.mix = {TypeIIS: 0.5}
+    assert mix._type_to_key == {}
+    assert mix._type_key(TypeIIS) is TypeIIS
+    assert mix([TypeIIS()])[1] == [0.5, 19.5]
+
+    mix.mix = {Fragment: 2.0}
+    assert mix._type_key(TypeIIS) is None
+
+
+def test_batch_layout(mix):
+    buffer, water = Reagent('buffer'), Reagent('water')
+    fragments = [Fragment() for _ in range(3)]
+    enzyme = TypeIIS()
+    contents_list = [fragments[:2], [fragments[2], enzyme, buffer], []]
+
+    contents, volumes, offsets = mix.batch(contents_list)
+
+    assert offsets == [0, 4, 8, 10]
+    assert len(contents) == len(volumes) == offsets[-1]
+    for i, well_contents in enumerate(contents_list):
+        start, end = offsets[i], offsets[i + 1]
+        assert (contents[start:end], volumes[start:end]) == mix(well_contents)
+    assert contents[:4] == fragments[:2] + [buffer, water]
+    assert volumes[:4] == [2.0, 2.0, 4.0, 12.0]
+    assert volumes[4:8] == [2.0, 1.0, 4.0, 13.0]
+    assert contents[8:] == [buffer, water]
+    assert volumes[8:] == [4.0, 16.0]
@@ -0,0 +1,143 @@
+import math
+import os
+from collections import Counter
+
+import pytest
+
+from script_gen_pipeline.labware.wells import COL_MAJOR, final_well, well_index, well_position
+from script_gen_pipeline.protocol.basic import DEFAULT_PARAMETERS
+from script_gen_pipeline.protocol.batches import (
+    BASIC_TEMPLATES, batch_kwargs, batch_plans, generate_clips_dict,
+    generate_final_assembly_dict, generate_sources_dict, plan_batches)
+from script_gen_pipeline.protocol.multichannel import (
+    CHANNELS, CLIP_STEPS, MAG_WELL_OFFSET, PURIFICATION_STEPS, well_name)
+from script_gen_pipeline.protocol.protocol import (
+    CLIP_OUT_PATH, F_ASSEMBLY_OUT_PATH, FINAL_ASSEMBLIES_PER_CLIP, MAX_CLIPS,
+    iter_construct_clips)
+from script_gen_pipeline.protocol.templates import TEMPLATE_DIR, render_script
+from script_gen_pipeline.protocol.timing import estimate_clip, estimate_run
+
+EXAMPLES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dna_bot_utils', 'examples')
+CONSTRUCTS_CSV = os.path.join(EXAMPLES, 'construct_csvs', 'storch_et_al_cons.csv')
+SOURCES_CSV = os.path.join(EXAMPLES, 'part_linker_csvs', 'part_plate_2_230419.csv')
+
+
+@pytest.fixture(scope='module')
+def storch(tmp_path_factory):
+    """ The example design as one batch, with its sources """
+    tmp_path = tmp_path_factory.mktemp('storch')
+    with open(CONSTRUCTS_CSV) as csv_file:
+        header, *rows = csv_file.read().splitlines()
+    constructs_csv = tmp_path / 'constructs.csv'
+    constructs_csv.write_text('\n'.join(
+        [header] + [row for row in rows if row.split(',', 1)[1].strip(',')]) + '\n')
+    constructs = list(iter_construct_clips(str(constructs_csv)))
+    # The example sources csv only has parts, put the linkers on a second plate
+    with open(SOURCES_CSV) as csv_file:
+        parts = {line.split(',')[0] for line in csv_file.read().splitlines()[1:]}
+    linkers = sorted({name for clips in constructs for clip in clips for name in clip} - parts)
+    linkers_csv = tmp_path / 'linkers.csv'
+    linkers_csv.write_text('Linker,Well\n' + ''.join(
+        f'{linker},{final_well(n + 1)}\n' for n, linker in enumerate(linkers)))
+
+    batches = list(plan_batches(constructs))
+    assert len(batches) == 1
+    sources = generate_sources_dict([SOURCES_CSV, str(linkers_csv)],
+                                    DEFAULT_PARAMETERS['SOURCE_DECK_POS'])
+    return batches[0], sources
+
+
+def reaction(well):
+    return well_index(well, order=COL_MAJOR) - MAG_WELL_OFFSET
+
+
+def test_plan_cuts_steps(storch):
+    batch, sources = storch
+    clip_plan, assembly_plan = batch_plans(batch, sources)
+
+    # Water, then prefix, suffix and part per reaction with the p10_single
+    single = (CLIP_STEPS * batch.reactions
+              + PURIFICATION_STEPS * math.ceil(batch.reactions / CHANNELS)
+              + sum(len(clips) for clips in batch.constructs))
+    reactions = len(clip_plan.order)
+    multi = (reactions + clip_plan.steps
+             + PURIFICATION_STEPS * math.ceil(reactions / CHANNELS)
+             + assembly_plan.steps)
+    assert assembly_plan.single_steps == sum(len(clips) for clips in batch.constructs)
+    assert assembly_plan.steps < assembly_plan.single_steps // 2
+    assert multi < 0.75 * single
+
+
+def test_plan_keeps_constructs(storch):
+    batch, sources = storch
+    clips_dict = generate_clips_dict(batch, sources)
+    final_assembly_dict = generate_final_assembly_dict(batch)
+    clip_plan, assembly_plan = batch_plans(batch, sources)
+
+    def clip(layout, x):
+        return tuple(layout[f'{kind}_{key}'][x] for kind in ('prefixes', 'parts', 'suffixes')
+                     for key in ('plates', 'wells'))
+
+    reactions = len(clip_plan.order)
+    assert reactions <= MAX_CLIPS
+    for x, old in enumerate(clip_plan.order):
+        assert clip(clip_plan.layout, x) == clip(clips_dict, old)
+
+    uses = Counter()
+    assert sorted(assembly_plan.order) == list(range(len(batch)))
+    for position, old in enumerate(assembly_plan.order):
+        wells = assembly_plan.layout[well_name(position)]
+        old_wells = final_assembly_dict[well_name(old)]
+        assert [clip(clip_plan.layout, reaction(well)) for well in wells] == \
+            [clip(clips_dict, reaction(well)) for well in old_wells]
+        uses.update(reaction(well) for well in wells)
+    assert max(uses) < reactions
+    assert max(uses.values()) <= FINAL_ASSEMBLIES_PER_CLIP
+
+
+def test_multi_transfers_fill_columns(storch):
+    batch, sources = storch
+    plans = batch_plans(batch, sources)
+
+    # The example's parts are scattered over their plate, so only the final
+    # assembly, where the plan lays out the sources, gets whole columns
+    assert plans[1].multi_channel_transfers()
+    for plan in plans:
+        for transfer in plan.multi_channel_transfers():
+            assert transfer.channels == CHANNELS
+            for wells in (transfer.source_wells, transfer.dest_wells):
+                positions = [well_position(well) for well in wells]
+                assert [row for row, _ in positions] == list(range(CHANNELS))
+                assert len({col for _, col in positions}) == 1
+
+
+@pytest.mark.parametrize('planned', [False, True])
+def test_scripts_render_plan(storch, tmp_path, planned):
+    batch, sources = storch
+    plans = batch_plans(batch, sources) if planned else None
+    kwargs = batch_kwargs(batch, sources, plans=plans)
+
+    for script in (CLIP_OUT_PATH, F_ASSEMBLY_OUT_PATH):
+        path = tmp_path / script
+        render_script(str(path), os.path.join(TEMPLATE_DIR, BASIC_TEMPLATES[script]),
+                      **kwargs[script])
+        text = path.read_text()
+        compile(text, script, 'exec')
+        assert ('\nmultichannel_transfers={"' in text) == planned
+        assert ('\nmultichannel_transfers=None\n' in text) != planned
+        assert "'p10_multi'" in text
+
+
+def test_plan_cuts_estimate(storch):
+    batch, sources = storch
+    plans = batch_plans(batch, sources)
+    single = estimate_run(batch_kwargs(batch, sources))
+    multi = estimate_run(batch_kwargs(batch, sources, plans=plans))
+
+    # No CLIP transfer fills a column, so the plan only adds its padded reactions
+    assert not plans[0].multi_channel_transfers()
+    assert len(plans[0].order) > batch.reactions
+    assert multi.scripts[CLIP_OUT_PATH] == pytest.approx(estimate_clip(plans[0].layout))
+    assert multi.scripts[CLIP_OUT_PATH] > single.scripts[CLIP_OUT_PATH]
+    assert multi.scripts[F_ASSEMBLY_OUT_PATH] < single.scripts[F_ASSEMBLY_OUT_PATH]
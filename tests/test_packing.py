@@ -0,0 +1,54 @@
+import pytest
+
+from script_gen_pipeline.protocol.packing import (
+    Packing, first_fit_decreasing, group_volumes, pack_volumes)
+
+# First-fit-decreasing puts 4 + 4 together and needs a third container,
+# 4 + 3 + 2 twice fills two exactly
+TIGHT = [4, 4, 3, 3, 2, 2]
+
+
+def test_exact_beats_first_fit_decreasing():
+    assert len(first_fit_decreasing(TIGHT, 9)) == 3
+
+    packing = pack_volumes(TIGHT, volume_max=10, volume_dead=1)
+    assert len(packing) == packing.lower_bound == 2
+    assert sorted(map(sorted, packing.bins)) == [[2, 3, 4], [2, 3, 4]]
+    assert packing.volumes == [10, 10]
+    assert packing.efficiency == pytest.approx(0.9)
+
+
+def test_first_fit_decreasing_past_exact_max_items():
+    packing = pack_volumes(TIGHT, volume_max=10, volume_dead=1, exact_max_items=len(TIGHT) - 1)
+    assert len(packing) == 3
+    assert packing.lower_bound == 2
+
+
+@pytest.mark.parametrize('volumes, volume_max, volume_dead, bound', [
+    (TIGHT, 10, 1, 2),
+    ([5] * 7, 10, 0, 4),
+    ([1], 10, 5, 1),
+    ([], 10, 0, 0),
+])
+def test_lower_bound(volumes, volume_max, volume_dead, bound):
+    packing = pack_volumes(volumes, volume_max, volume_dead)
+    assert packing.lower_bound == bound
+    assert len(packing) >= bound
+    assert sorted(v for b in packing.bins for v in b) == sorted(volumes)
+    assert all(volume <= volume_max for volume in packing.volumes)
+
+
+def test_oversized_and_unbounded():
+    packing = pack_volumes([12, 3, 3], volume_max=10)
+    assert packing.bins == [[12], [3, 3]]
+
+    unbounded = pack_volumes([1, 5, 3], volume_max=-1)
+    assert unbounded.bins == [[5, 3, 1]]
+    assert unbounded.lower_bound == 1
+    assert Packing([], 10, 0).efficiency == 1.0
+
+
+def test_group_volumes():
+    totals, grouped = group_volumes([1, 0, 1, 2], [1.0, 2.0, 3.0, 4.0], count=4)
+    assert totals.tolist() == [2.0, 4.0, 4.0, 0.0]
+    assert [g.tolist() for g in grouped] == [[2.0], [1.0, 3.0], [4.0], []]
@@ -0,0 +1,54 @@
+import csv
+import io
+
+from script_gen_pipeline.labware.containers import Layout, Well
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+from script_gen_pipeline.protocol.instructions import Instruction, Transfer
+from script_gen_pipeline.protocol.picklists import PICKLIST_WRITERS, to_hamilton, write_labcyte
+from script_gen_pipeline.protocol.protocol import Protocol
+
+
+def test_labcyte_splits_and_drops_empty_transfers():
+    water = Well([Reagent('water')], volumes=[50])
+    buffer = Well([Reagent('buffer')], volumes=[50])
+    mix = Well([Reagent('mix')])
+    instruction = Instruction('mix', [
+        Transfer(water, mix, 25.0),
+        Transfer(buffer, mix, 0.001),  # under half a 2.5 nL droplet
+        Transfer(buffer, mix, 0.0),
+        Transfer(buffer, mix, 0.002),
+    ])
+
+    handle = io.StringIO()
+    assert write_labcyte(instruction, 0, handle) == 4
+    _, *rows = csv.reader(io.StringIO(handle.getvalue()))
+    volumes = [float(row[-1]) for row in rows]
+    assert volumes == [8332.5] * 3 + [2.5]
+    assert all(volume > 0 for volume in volumes)
+
+
+def test_protocol_picklists_share_cached_layouts(tmp_path, monkeypatch):
+    water = Well([Reagent('water')], volumes=[50])
+    mixes = [Well([Reagent(f'mix{n}')]) for n in range(2)]
+    protocol = Protocol()
+    instructions = [Instruction(f'step{n}', [Transfer(water, mix, 5.0)])
+                    for n, mix in enumerate(mixes)]
+    for instruction in instructions:
+        protocol.add_instruction(instruction)
+    protocol.containers = mixes
+
+    built = []
+    from_instruction = Layout.from_instruction.__func__
+
+    def counting(cls, instruction, *args, **kwargs):
+        built.append((instruction, kwargs.get('src_containers', False)))
+        return from_instruction(cls, instruction, *args, **kwargs)
+
+    monkeypatch.setattr(Layout, 'from_instruction', classmethod(counting))
+    for platform in PICKLIST_WRITERS:
+        assert protocol.to_picklists(str(tmp_path / platform), platform) == [1, 1]
+
+    assert sorted(built, key=lambda b: b[0].name) == [(i, True) for i in instructions]
+    monkeypatch.undo()
+    assert (tmp_path / 'hamilton2').read_text() == to_hamilton(
+        instructions[1], protocol.instruction_to_plate_count[instructions[1]])
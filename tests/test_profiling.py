@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from script_gen_pipeline.protocol import profiling
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    profiling.disable()
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+@profiling.profiled(category='planning')
+def plan(n):
+    return list(range(n))
+
+
+def test_disabled_is_a_no_op():
+    assert not profiling.is_enabled()
+    span = profiling.span('stage', count=3)
+    with span as entered:
+        entered.count = 5
+    assert span is entered is profiling.span('other')
+    assert span.count is None
+    assert plan(3) == [0, 1, 2]
+    assert profiling.records() == []
+    assert profiling.summary() == {}
+
+
+def test_nested_spans():
+    profiling.enable()
+    with profiling.span('outer', 'protocol', count=2):
+        with profiling.span('inner', 'step') as span:
+            span.count = 4
+        plan(2)
+        plan(3)
+    profiling.disable()
+    with profiling.span('after'):
+        pass
+
+    records = profiling.records()
+    assert [(r.name, r.category, r.depth) for r in records] == [
+        ('inner', 'step', 1), ('plan', 'planning', 1), ('plan', 'planning', 1),
+        ('outer', 'protocol', 0)]
+    outer = records[-1]
+    for record in records[:-1]:
+        assert outer.start <= record.start
+        assert record.start + record.wall <= outer.start + outer.wall
+    assert records[0].count == 4
+    assert records[0].alloc is None
+
+    summary = profiling.summary()
+    assert summary['plan']['calls'] == 2
+    assert summary['outer']['count'] == 2
+    assert summary['plan']['count'] is None
+    assert json.loads(profiling.to_json())['summary'] == json.loads(json.dumps(summary))
+
+
+def test_trace_memory():
+    profiling.enable(trace_memory=True)
+    with profiling.span('allocate'):
+        data = [bytearray(1000) for _ in range(10)]
+    profiling.disable()
+    assert profiling.records()[0].alloc >= 10000
+    assert profiling.summary()['allocate']['alloc'] >= 10000
+    del data
+
+
+def test_chrome_trace(tmp_path):
+    profiling.enable()
+    with profiling.span('outer', count=3):
+        with profiling.span('inner', 'step'):
+            pass
+
+    path = tmp_path / 'run.trace.json'
+    trace = json.loads(profiling.to_chrome_trace(str(path)))
+    assert json.loads(path.read_text()) == trace
+    assert trace['displayTimeUnit'] == 'ms'
+    inner, outer = trace['traceEvents']
+    assert set(outer) == {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid', 'args'}
+    assert (outer['name'], outer['cat'], outer['ph']) == ('outer', 'stage', 'X')
+    assert (inner['name'], inner['cat']) == ('inner', 'step')
+    assert outer['pid'] == inner['pid'] and outer['tid'] == inner['tid']
+    assert outer['ts'] <= inner['ts']
+    assert inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert outer['args']['count'] == 3
+    assert 'count' not in inner['args'] and 'alloc_bytes' not in inner['args']
+    assert inner['args']['cpu_ms'] >= 0
@@ -0,0 +1,89 @@
+import pytest
+
+from script_gen_pipeline.designs.construct import Construct
+from script_gen_pipeline.labware.containers import Well
+from script_gen_pipeline.labware.wells import COL_MAJOR, ROW_MAJOR, final_well
+from script_gen_pipeline.protocol import basic
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+from script_gen_pipeline.protocol.instructions import Instruction, Transfer
+from script_gen_pipeline.protocol.protocol import Clone, Plate, Protocol, Subprotocol
+
+
+def test_protocol_default_constructs():
+    assert Protocol().constructs == []
+    assert Clone(design=None).constructs == []
+
+    first, second = Protocol(), Protocol()
+    first.constructs.append('construct')
+    assert second.constructs == []
+
+
+def test_basic_constructs():
+    construct = Construct(['L0', ['P0_0', 'P0_1'], 'L1'])
+    protocol = basic.Basic([construct], name='BASIC')
+
+    assert protocol.constructs == [construct]
+    assert protocol.name == 'BASIC'
+    assert [str(s) for s in protocol.subprotocols] == basic.basic_steps
+    assert all(isinstance(s, Subprotocol) for s in protocol.subprotocols)
+    assert all(s.parameters is protocol.parameters for s in protocol.subprotocols)
+
+
+def test_to_csv(tmp_path, monkeypatch):
+    water = Well([Reagent('water')], volumes=[50])
+    mix = Well([Reagent('Promega T4 DNA Ligase buffer, 10X')])
+    protocol = Protocol()
+    protocol.name = 'ligation'
+    protocol.add_instruction(Instruction('Ligate', [Transfer(water, mix, 2.0)]))
+
+    monkeypatch.chdir(tmp_path)
+    text = protocol.to_csv()
+    assert text.startswith('Ligate:\n')
+    assert '"Promega T4 DNA Ligase buffer, 10X' in text
+    assert (tmp_path / 'ligation.csv').read_text() == text
+
+    path = tmp_path / 'out.csv'
+    assert protocol.to_csv(str(path)) == str(path)
+    assert path.read_text() == text
+
+
+def test_plate_fills_columns_by_default():
+    plate = Plate()
+    assert plate.order == COL_MAJOR
+    indices = [plate.add_well(Well([Reagent(f'R{n}')])) for n in range(9)]
+    assert [plate.well_name(index) for index in indices] == \
+        [final_well(n) for n in range(1, 10)]
+    rows = Plate(order=ROW_MAJOR)
+    assert [rows.well_name(rows.add_well(Well())) for _ in range(2)] == ['A1', 'A2']
+
+
+def test_clip_counts_stream_constructs(tmp_path):
+    constructs_csv = tmp_path / 'constructs.csv'
+    constructs_csv.write_text(
+        'Well,Linker 1,Part 1,Linker 2,Part 2\n'
+        'A1,L1,P1,L2,P2\n'
+        'B1,L1,P1,L2,P3\n'
+        'C1,L1,P1,L2,P2\n')
+    subprotocol = Subprotocol(basic.basic_steps[0], {})
+
+    counts, constructs = subprotocol.generate_clip_counts(str(constructs_csv))
+    assert constructs == 3
+    assert counts == {('L1-P', 'P1', 'L2-S'): 3, ('L2-P', 'P2', 'L1-S'): 2,
+                      ('L2-P', 'P3', 'L1-S'): 1}
+    with pytest.raises(ValueError):
+        subprotocol.generate_clip_counts(str(constructs_csv), max_constructs=2)
+
+    frames = subprotocol.generate_constructs_list(str(constructs_csv))
+    assert [len(frame.index) for frame in frames] == [2, 2, 2]
+
+
+def test_mag_wells_follow_clip_numbers():
+    import pandas as pd
+
+    protocol = basic.Basic([Construct(['L0', 'P0', 'L1'])])
+    clips_df = pd.DataFrame({'number': [1, 3, 2]})
+    assert protocol._create_mag_wells(clips_df) == \
+        [('A7',), ('B7', 'C7', 'D7'), ('E7', 'F7')]
+
+    clips_df, _, _ = protocol._create_clips_df()
+    assert list(clips_df['mag_well']) == [('A7',)]
@@ -0,0 +1,54 @@
+import pytest
+
+from script_gen_pipeline.labware.containers import Fridge, Tube, Well, content_id
+from script_gen_pipeline.protocol.biochem_utils import Reagent
+from script_gen_pipeline.protocol.protocol import Protocol
+from script_gen_pipeline.protocol.steps import Setup
+
+
+@pytest.fixture
+def target():
+    """ Two constructs, three wells that each take 80 uL water and 5 uL buffer """
+    def well():
+        return Well([Reagent('water'), Reagent('buffer')], volumes=[80, 5])
+    return [[well(), well()], [well()]]
+
+
+def test_setup_packs_volumes(target):
+    protocol = Protocol()
+    step = Setup(target, name='setup')
+    step(protocol)
+
+    water, buffer = content_id(Reagent('water')), content_id(Reagent('buffer'))
+    assert set(step.packings) == {water, buffer}
+    # 240 uL water does not fit one well next to its 15 uL dead volume
+    assert sorted(map(sorted, step.packings[water].bins)) == [[80], [80, 80]]
+    assert step.packings[water].volume_dead == Well.volume_dead
+    assert step.packings[buffer].bins == [[5, 5, 5]]
+    assert step.packing_efficiency() == pytest.approx(255 / (3 * Well.volume_max))
+
+    volumes = sorted((c.content_ids().pop(), c.volume()) for c in protocol.containers)
+    assert volumes == sorted([(water, 175), (water, 95), (buffer, 30)])
+    assert all(isinstance(c, Well) for c in protocol.containers)
+
+    instruction, = protocol.instructions
+    assert instruction.name == 'setup'
+    assert all(isinstance(t.src, Fridge) for t in instruction.transfers)
+    assert sorted(t.volume for t in instruction.transfers) == [30, 95, 175]
+
+
+def test_setup_dead_volume_per_container(target):
+    protocol = Protocol()
+    step = Setup(target, dest=Tube)
+    step(protocol)
+
+    # Each content fits one tube, which gets a single dead volume
+    assert {len(packing) for packing in step.packings.values()} == {1}
+    assert sorted(c.volume() for c in protocol.containers) == \
+        [3 * 5 + Tube.volume_dead, 3 * 80 + Tube.volume_dead]
+    assert all(isinstance(c, Tube) for c in protocol.containers)
+
+
+def test_setup_needs_a_target():
+    with pytest.raises(ValueError):
+        Setup([])
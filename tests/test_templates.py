@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from script_gen_pipeline.protocol.templates import (
+    TEMPLATE_DIR, Template, load_template, render_script)
+
+TEMPLATE = "from opentrons import protocol_api\n\n\ndef run(protocol):\n    pass\n"
+
+
+def two_write_render(ot2_script_path, template_path, **kwargs):
+    """ The writer render_script replaced: the header and kwargs, then the
+    template read again from the line above its first def """
+    with open(ot2_script_path, 'w') as wf:
+        with open(template_path, 'r') as rf:
+            for index, line in enumerate(rf):
+                if line[:3] == 'def':
+                    function_start = index
+                    break
+                else:
+                    wf.write(line)
+            for key, value in kwargs.items():
+                wf.write('{}='.format(key))
+                if type(value) == dict:
+                    wf.write(json.dumps(value))
+                elif type(value) == str:
+                    wf.write("'{}'".format(value))
+                else:
+                    wf.write(str(value))
+                wf.write('\n')
+            wf.write('\n')
+        with open(template_path, 'r') as rf:
+            for index, line in enumerate(rf):
+                if index >= function_start - 1:
+                    wf.write(line)
+
+
+@pytest.mark.parametrize('template', sorted(
+    name for name in os.listdir(TEMPLATE_DIR) if name.endswith('_template.py')))
+def test_matches_two_write_render(template, tmp_path):
+    template_path = os.path.join(TEMPLATE_DIR, template)
+    kwargs = {'clips_dict': {'parts_wells': ['A1', 'B1'], 'parts_vols': [1.5, 2]},
+              'sample_number': 2, 'ethanol_well': 'A11',
+              'spotting_tuples': [(('A1',), ('A1',), (5,))], 'multichannel_transfers': None}
+
+    two_write_render(str(tmp_path / 'old.py'), template_path, **kwargs)
+    path = render_script(str(tmp_path / 'new.py'), template_path, **kwargs)
+
+    assert path == os.path.realpath(tmp_path / 'new.py')
+    assert (tmp_path / 'new.py').read_bytes() == (tmp_path / 'old.py').read_bytes()
+
+
+def test_cache_hit(tmp_path, monkeypatch):
+    path = tmp_path / 'template.py'
+    path.write_text(TEMPLATE)
+    template = load_template(str(path))
+
+    def no_read(*args, **kwargs):
+        raise AssertionError('cached template re-read')
+
+    monkeypatch.setattr(Template, '__init__', no_read)
+    assert load_template(str(path)) is template
+    assert load_template(str(tmp_path / '.' / 'template.py')) is template
+
+
+def test_cache_invalidated_by_mtime(tmp_path):
+    path = tmp_path / 'template.py'
+    path.write_text(TEMPLATE)
+    mtime = os.stat(path).st_mtime_ns
+    template = load_template(str(path))
+
+    path.write_text(TEMPLATE.replace('pass', 'protocol.comment("changed")'))
+    os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+    reloaded = load_template(str(path))
+
+    assert reloaded is not template
+    assert 'changed' in reloaded.render(x=1)
+    assert 'changed' not in template.render(x=1)
+
+
+def test_template_without_def(tmp_path):
+    path = tmp_path / 'template.py'
+    path.write_text('x = 1\n')
+    with pytest.raises(ValueError):
+        load_template(str(path))
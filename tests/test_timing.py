@@ -0,0 +1,101 @@
+import ast
+import os
+
+import pytest
+
+from script_gen_pipeline.protocol import timing
+from script_gen_pipeline.protocol.batches import BASIC_TEMPLATES
+from script_gen_pipeline.protocol.protocol import (
+    CLIP_OUT_PATH, F_ASSEMBLY_OUT_PATH, MAGBEAD_OUT_PATH, TRANS_SPOT_OUT_PATH)
+from script_gen_pipeline.protocol.templates import TEMPLATE_DIR
+
+
+def template_settings(script):
+    """ Constants and keyword defaults of a template, by name """
+    with open(os.path.join(TEMPLATE_DIR, BASIC_TEMPLATES[script])) as template:
+        tree = ast.parse(template.read())
+    settings = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 \
+                and isinstance(node.targets[0], ast.Name):
+            try:
+                settings[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+        elif isinstance(node, ast.FunctionDef):
+            args = node.args.args[len(node.args.args) - len(node.args.defaults):]
+            for arg, default in zip(args, node.args.defaults):
+                settings[arg.arg] = ast.literal_eval(default)
+    return settings
+
+
+def test_constants_match_templates():
+    clip = template_settings(CLIP_OUT_PATH)
+    assert timing.CLIP_MASTER_MIX_VOLUME == clip['MASTER_MIX_VOLUME']
+    assert timing.CLIP_LINKER_MIX_REPS == clip['LINKER_MIX_SETTINGS'][0]
+    assert timing.CLIP_PART_MIX_REPS == clip['PART_MIX_SETTINGS'][0]
+
+    magbead = template_settings(MAGBEAD_OUT_PATH)
+    assert timing.MAGBEAD_SAMPLE_VOLUME == magbead['sample_volume']
+    assert timing.MAGBEAD_BEAD_RATIO == magbead['bead_ratio']
+    assert timing.MAGBEAD_DEAD_TOTAL_VOL == magbead['DEAD_TOTAL_VOL']
+    assert timing.MAGBEAD_ELUTION_VOLUME == magbead['elution_buffer_volume']
+    assert timing.MAGBEAD_ETHANOL_VOL == magbead['ETHANOL_VOL']
+    assert timing.MAGBEAD_ETHANOL_DEAD_VOL == magbead['ETHANOL_DEAD_VOL']
+    assert timing.MAGBEAD_IMMOBILISE_MIX_REPS == magbead['IMMOBILISE_MIX_REPS']
+    assert timing.MAGBEAD_ELUTION_MIX_REPS == magbead['ELUTION_MIX_REPS']
+    assert timing.MAGBEAD_DELAYS == {
+        'incubation': magbead['incubation_time'], 'settling': magbead['settling_time'],
+        'wash': magbead['WASH_TIME'], 'wash_2': magbead['WASH_TIME'],
+        'drying': magbead['drying_time'], 'elution': magbead['elution_time'],
+        'elutant_separation': magbead['ELUTANT_SEP_TIME']}
+
+    assembly = template_settings(F_ASSEMBLY_OUT_PATH)
+    assert timing.ASSEMBLY_TOTAL_VOL == assembly['TOTAL_VOL']
+    assert timing.ASSEMBLY_PART_VOL == assembly['PART_VOL']
+    assert timing.ASSEMBLY_MIX_REPS == assembly['MIX_SETTINGS'][0]
+
+    transformation = template_settings(TRANS_SPOT_OUT_PATH)
+    assert timing.TRANSFORMATION_ASSEMBLY_VOL == transformation['ASSEMBLY_VOL']
+    assert timing.TRANSFORMATION_MIX_REPS == transformation['MIX_SETTINGS'][0]
+    assert timing.TRANSFORMATION_SOC_VOL == transformation['SOC_VOL']
+    assert timing.TRANSFORMATION_SOC_MIX_REPS == transformation['SOC_MIX_SETTINGS'][0]
+    assert timing.TRANSFORMATION_RESUSPEND_MIX_REPS == \
+        transformation['TRANSFORMATION_MIX_SETTINGS'][0]
+    assert timing.TRANSFORMATION_MAX_SPOT_VOL == transformation['max_spot_vol']
+    assert timing.TRANSFORMATION_DELAYS == {
+        'incubation': transformation['INCUBATION_TIME'],
+        'outgrowth': transformation['OUTGROWTH_TIME']}
+
+
+def test_planned_transfers_are_one_step_each():
+    model = timing.TimingModel()
+    clips_dict = {'parts_wells': ['A1'] * 8, 'water_vols': [5.0] * 8,
+                  'parts_vols': [1.0] * 8}
+    column = {'volume': 1, 'source_plate': '2', 'source_wells': ['A1'] * 8,
+              'dest_wells': [f'{row}2' for row in 'ABCDEFGH']}
+    transfers = {kind: [column] for kind in ('prefixes', 'suffixes', 'parts')}
+
+    single = timing.estimate_clip(clips_dict, model)
+    multi = timing.estimate_clip(clips_dict, model, transfers)
+    step = model.tip() + model.liquid(1, timing.P10_MAX_VOL)
+    mixes = (2 * timing.CLIP_LINKER_MIX_REPS + timing.CLIP_PART_MIX_REPS) * model.mix_cycle
+    assert single - multi == pytest.approx(7 * (3 * step + mixes))
+
+
+def test_estimate_run():
+    kwargs = {
+        CLIP_OUT_PATH: {'clips_dict': {'parts_wells': ['A1'], 'water_vols': [5.0],
+                                       'parts_vols': [1.0]}},
+        MAGBEAD_OUT_PATH: {'sample_number': 1},
+        F_ASSEMBLY_OUT_PATH: {'final_assembly_dict': {'A1': ['A7', 'B7']}},
+        TRANS_SPOT_OUT_PATH: {'spotting_tuples': [(('A1',), ('A1',), (5,))]},
+    }
+    estimate = timing.estimate_run(kwargs)
+    assert list(estimate.scripts) == list(kwargs)
+    assert estimate.total == pytest.approx(sum(estimate.scripts.values()))
+    assert estimate.pauses[TRANS_SPOT_OUT_PATH] == 3
+    assert estimate.constructs_per_hour(1) == pytest.approx(3600 / estimate.total)
+
+    with pytest.raises(ValueError):
+        timing.estimate_run({'5_unknown.ot2.py': {}})
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from script_gen_pipeline.protocol.batches import BASIC_TEMPLATES, Batch, batch_kwargs
+from script_gen_pipeline.protocol.protocol import (
+    CLIP_OUT_PATH, F_ASSEMBLY_OUT_PATH, MAGBEAD_OUT_PATH, TRANS_SPOT_OUT_PATH)
+from script_gen_pipeline.protocol.templates import TEMPLATE_DIR, render_script
+from script_gen_pipeline.protocol.tips import (
+    TipRacks, assembly_tips, clip_tips, purification_tips, transformation_tips)
+
+
+def test_racks_fill_down_columns():
+    racks = TipRacks(['3', '6'], initial_tip='G12')
+    assert racks.pick() == ('3', 'G12')
+    assert racks.pick() == ('3', 'H12')
+    assert racks.pick() == ('6', 'A1')
+    assert racks.usage().racks == [
+        {'slot': '3', 'first': 'G12', 'last': 'H12', 'tips': 2},
+        {'slot': '6', 'first': 'A1', 'last': 'A1', 'tips': 1}]
+
+
+def test_multichannel_skips_partial_columns():
+    racks = TipRacks(['3'])
+    racks.pick()
+    assert racks.pick(channels=8) == ('3', 'A2')
+    assert racks.usage().tips == 9
+
+
+def test_tips_run_out():
+    racks = TipRacks(['3'])
+    for _ in range(96):
+        racks.pick()
+    with pytest.raises(ValueError):
+        racks.pick()
+
+
+def test_clip_tips():
+    clips_dict = {'parts_wells': ['A1'] * 30}
+    usage = clip_tips(clips_dict)
+    # master mix, then water, prefix, suffix and part per CLIP
+    assert usage.tips == 1 + 4 * 30
+    assert usage.slots == ['3', '6']
+
+
+def test_purification_and_assembly_tips():
+    assert purification_tips(48).tips == 6 * 9 * 8
+    assert purification_tips(48).slots == ['3', '6', '9', '2', '5']
+
+    final_assembly_dict = {'A1': ['A7', 'B7'], 'B1': ['A7', 'C7', 'D7']}
+    assert assembly_tips(final_assembly_dict).tips == 2 + 5
+
+
+def test_transformation_tips():
+    spotting_tuples = [(('A1', 'B1'), ('A1', 'B1'), (5, 12))]
+    usage = transformation_tips(spotting_tuples)
+    # calibration, 2 transformations, 1 + 3 spots
+    assert usage['p10'].tips == 1 + 2 + 4
+    # SOC and resuspension of one column
+    assert usage['p300'].tips == 2 * 8
+
+
+def test_scripts_load_simulated_racks(tmp_path):
+    batch = Batch(0)
+    for n in range(40):
+        construct = [(f'L{p}-P', f'P{n % 10}_{p}', f'L{p + 1}-S') for p in range(3)]
+        batch.constructs.append(construct)
+        batch.clip_counts.update(construct)
+    sources = {name: ('A1', '', '2') for clip in batch.clip_counts for name in clip}
+
+    kwargs = batch_kwargs(batch, sources)
+    assert kwargs[CLIP_OUT_PATH]['tiprack_slots'] == \
+        clip_tips(kwargs[CLIP_OUT_PATH]['clips_dict']).slots == ['3', '6']
+    assert kwargs[MAGBEAD_OUT_PATH]['tiprack_slots'] == purification_tips(batch.reactions).slots
+    assert kwargs[F_ASSEMBLY_OUT_PATH]['tiprack_slots'] == ['3', '6']
+    transformation = transformation_tips(kwargs[TRANS_SPOT_OUT_PATH]['spotting_tuples'])
+    assert kwargs[TRANS_SPOT_OUT_PATH]['p10_tiprack_slots'] == transformation['p10'].slots
+    assert kwargs[TRANS_SPOT_OUT_PATH]['p300_tiprack_slots'] == transformation['p300'].slots
+
+    for script, script_kwargs in kwargs.items():
+        path = tmp_path / script
+        render_script(str(path), os.path.join(TEMPLATE_DIR, BASIC_TEMPLATES[script]),
+                      **script_kwargs)
+        text = path.read_text()
+        compile(text, script, 'exec')
+        assert 'CANDIDATE' not in text and '// 96' not in text
+        for key in script_kwargs:
+            if key.endswith('tiprack_slots'):
+                assert f'{key}={script_kwargs[key]}' in text
@@ -0,0 +1,61 @@
+import pytest
+
+from script_gen_pipeline.labware.wells import (
+    COL_MAJOR, ROW_MAJOR, final_well, final_wells, plate_shape, row_label, well_index,
+    well_indices, well_name, well_names, well_position)
+
+
+def test_well_position():
+    assert well_position('A1') == (0, 0)
+    assert well_position('B3') == (1, 2)
+    assert well_position('AF48') == (31, 47)
+    assert row_label(31) == 'AF'
+    with pytest.raises(ValueError):
+        well_position('b3')
+
+
+@pytest.mark.parametrize('wells', [24, 96, 384, 1536])
+@pytest.mark.parametrize('order', [ROW_MAJOR, COL_MAJOR])
+def test_names_and_indices_round_trip(wells, order):
+    names = well_names(range(wells), wells, order)
+    assert len(set(names.tolist())) == wells
+    assert well_indices(names, wells, order).tolist() == list(range(wells))
+    assert all(well_index(well_name(i, wells, order), wells, order) == i
+               for i in (0, 1, wells - 1))
+
+
+def test_orders():
+    assert well_name(13) == 'B2'
+    assert well_name(13, order=COL_MAJOR) == 'F2'
+    assert well_index('B2') == 13
+    assert well_index('A2', order=COL_MAJOR) == 8
+    assert plate_shape(384) == (16, 24)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        plate_shape(48)
+    with pytest.raises(ValueError):
+        well_name(96)
+    with pytest.raises(ValueError):
+        well_index('I1')
+    with pytest.raises(ValueError):
+        well_names([0, 96])
+    with pytest.raises(ValueError):
+        well_indices(['A1', 'A13'])
+    with pytest.raises(ValueError):
+        well_name(0, order='diagonal')
+
+
+def test_final_wells():
+    assert final_well(1) == 'A1'
+    assert final_well(9) == 'A2'
+    assert final_well(96) == 'H12'
+    assert final_well(97) == 'A13'
+    with pytest.raises(ValueError):
+        final_well(0)
+
+    numbers = [1, 9, 96]
+    assert final_wells(numbers).tolist() == [final_well(n) for n in numbers]
+    numbers = [1, 96, 97, 110]
+    assert final_wells(numbers).tolist() == [final_well(n) for n in numbers]
@@ -172,40 +172,29 @@ class Subprotocol(Protocol):
         reactions required to synthesise the constructs in constructs_list.
         """
         merged_construct_dfs = pd.concat(constructs_list, ignore_index=True)
-        unique_clips_df = merged_construct_dfs.drop_duplicates()
-        unique_clips_df = unique_clips_df.reset_index(drop=True)
-        clips_df = unique_clips_df.copy()
+
+        # Count number of each CLIP reaction in one pass keyed on
+        # (prefix, part, suffix), in first-seen order like drop_duplicates()
+        clip_count = Counter(zip(merged_construct_dfs['prefixes'],
+                                 merged_construct_dfs['parts'],
+                                 merged_construct_dfs['suffixes']))
+        clips_df = pd.DataFrame(list(clip_count.keys()),
+                                columns=['prefixes', 'parts', 'suffixes'])
 
         # Error
-        if len(unique_clips_df.index) > MAX_CLIPS:
+        if len(clips_df.index) > MAX_CLIPS:
             raise ValueError(
                 'Number of CLIP reactions exceeds 48. Reduce number of constructs in construct.csv.')
 
-        # Count number of each CLIP reaction
-        clip_count = np.zeros(len(clips_df.index))
-        for i, unique_clip in unique_clips_df.iterrows():
-            for _, clip in merged_construct_dfs.iterrows():
-                if unique_clip.equals(clip):
-                    clip_count[i] = clip_count[i] + 1
-        clip_count = clip_count // FINAL_ASSEMBLIES_PER_CLIP + 1
-        clips_df['number'] = [int(i) for i in clip_count.tolist()]
-
-        # Associate well/s for each CLIP reaction
-        clips_df['mag_well'] = pd.Series(['0'] * len(clips_df.index),
-                                        index=clips_df.index)
-        for index, number in clips_df['number'].iteritems():
-            if index == 0:
-                mag_wells = []
-                for x in range(number):
-                    mag_wells.append(final_well(x + 1 + 48))
-                clips_df.at[index, 'mag_well'] = tuple(mag_wells)
-            else:
-                mag_wells = []
-                for x in range(number):
-                    well_count = clips_df.loc[
-                        :index - 1, 'number'].sum() + x + 1 + 48
-                    mag_wells.append(final_well(well_count))
-                clips_df.at[index, 'mag_well'] = tuple(mag_wells)
+        clips_df['number'] = [count // FINAL_ASSEMBLIES_PER_CLIP + 1
+                              for count in clip_count.values()]
+
+        # Associate well/s for each CLIP reaction, offset by the wells
+        # taken by earlier CLIPs
+        offsets = clips_df['number'].cumsum() - clips_df['number']
+        clips_df['mag_well'] = [
+            tuple(final_well(int(offset) + x + 1 + 48) for x in range(number))
+            for offset, number in zip(offsets, clips_df['number'])]
         return clips_df
 
     def generate_sources_dict(paths):
@@ -286,18 +275,19 @@ class Subprotocol(Protocol):
         indicating which clip reaction wells are used.
         """
         final_assembly_dict = {}
-        clips_count = np.zeros(len(clips_df.index))
+        # (prefix, part, suffix) -> clips_df row, built once per call
+        clip_index = {clip: row for row, clip in enumerate(zip(
+            clips_df['prefixes'], clips_df['parts'], clips_df['suffixes']))}
+        mag_wells = list(clips_df['mag_well'])
+        clips_count = np.zeros(len(clips_df.index), dtype=int)
         for construct_index, construct_df in enumerate(constructs_list):
             construct_well_list = []
-            for _, clip in construct_df.iterrows():
-                clip_info = clips_df[(clips_df['prefixes'] == clip['prefixes']) &
-                                    (clips_df['parts'] == clip['parts']) &
-                                    (clips_df['suffixes'] == clip['suffixes'])]
-                clip_wells = clip_info.at[clip_info.index[0], 'mag_well']
-                clip_num = int(clip_info.index[0])
-                clip_well = clip_wells[int(clips_count[clip_num] //
-                                        FINAL_ASSEMBLIES_PER_CLIP)]
-                clips_count[clip_num] = clips_count[clip_num] + 1
+            for clip in zip(construct_df['prefixes'], construct_df['parts'],
+                            construct_df['suffixes']):
+                clip_num = clip_index[clip]
+                clip_well = mag_wells[clip_num][clips_count[clip_num] //
+                                                FINAL_ASSEMBLIES_PER_CLIP]
+                clips_count[clip_num] += 1
                 construct_well_list.append(clip_well)
             final_assembly_dict[final_well(
                 construct_index + 1)] = construct_well_list